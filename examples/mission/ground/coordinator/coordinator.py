@@ -50,7 +50,7 @@ class MissionCoordinator(AutonomousTrust):
         if 'silent' not in kwargs:
             kwargs['silent'] = True
         super().__init__(**kwargs)
-        self.cohort = Cohort(self.queue_pool)
+        self.cohort = Cohort(self.queue_broker)
         self.add_worker(CohortTracker, self.system_dependencies, cohort=self.cohort)
         self.add_worker(VideoSimRcvr, self.system_dependencies, cohort=self.cohort)  # TODO add noise?
         self.add_worker(DataRcvr, self.system_dependencies, cohort=self.cohort)
@@ -15,10 +15,9 @@
 # ******************
 
 import os
-from queue import Empty
 
 from autonomous_trust.core import AutonomousTrust, Process, ProcMeta, LogLevel, CfgIds
-from autonomous_trust.core.config import Configuration, to_yaml_string
+from autonomous_trust.core.config import Configuration
 from autonomous_trust.core.config.generate import random_config
 from autonomous_trust.core.system import queue_cadence
 from autonomous_trust.core.network import Network, Message
@@ -35,18 +34,17 @@ class InspectorProcess(Process, metaclass=ProcMeta,
     def __init__(self, configurations, subsystems, log_q, dependencies):
         super().__init__(configurations, subsystems, log_q, dependencies=dependencies)
 
+    def handle_message(self, queues, cmd):
+        if isinstance(cmd, str):
+            if cmd in self.command_deck:
+                obj = self.configs[cmd]
+                msg_str = str(obj)  # FIXME convert to json
+                # send straight to viz server
+                queues['main'].put(msg_str, block=True, timeout=self.q_cadence)
+
     def process(self, queues, signal):
         while self.keep_running(signal):
-            try:
-                cmd = queues[self.name].get(block=True, timeout=self.q_cadence)
-                if isinstance(cmd, str):
-                    if cmd in self.command_deck:
-                        obj = self.configs[cmd]
-                        msg_str = str(obj)  # FIXME convert to json
-                        # send straight to viz server
-                        queues['main'].put(msg_str, block=True, timeout=self.q_cadence)
-            except Empty:
-                pass
+            self.dispatch_messages(queues)
 
 
 class Inspector(AutonomousTrust):
@@ -65,7 +63,7 @@ class Inspector(AutonomousTrust):
         if self.tasking_tick(1):  # every 30 sec
             for peer in self.peers.all:
                 query = Message(CfgIds.reputation, ReputationProtocol.rep_req,
-                                to_yaml_string((peer, self.proc_name)), self.identity)
+                                (peer, self.proc_name), self.identity)
                 queues[CfgIds.reputation].put(query, block=True, timeout=queue_cadence)
                 ping = Message(CfgIds.network, Network.ping, 5, peer, return_to=self.name)
                 queues[CfgIds.network].put(ping, block=True, timeout=queue_cadence)
@@ -18,11 +18,12 @@ import logging
 import sys
 from collections import deque
 from datetime import datetime, timedelta
-from queue import Empty, Queue
+from queue import Queue
 from typing import Callable, Union
 
-from autonomous_trust.core import Process, ProcMeta, CfgIds, from_yaml_string, QueueType
-from autonomous_trust.core.automate import QueuePool
+from autonomous_trust.core import Process, ProcMeta, CfgIds, from_payload, QueueType
+from autonomous_trust.core.queue_broker import QueueBroker
+from autonomous_trust.core.metrics import Metrics
 from autonomous_trust.core.identity import Peers, Identity
 from autonomous_trust.core.network import Message
 from autonomous_trust.core.protocol import Protocol
@@ -91,6 +92,7 @@ class CohortInterface(object):
     def __init__(self, log_level: int = logging.INFO, logfile: str = None):
         self.paused = True  # always start in paused state
         self.peers: dict[str, PeerDataAcq] = {}
+        self.metrics: dict[str, dict] = {}  # process name -> metrics snapshot, for this node
         self._time: datetime = datetime.now()
         self._center = GeoPosition(0, 0)
 
@@ -145,9 +147,9 @@ class CohortInterface(object):
 class Cohort(CohortInterface):
     epoch = datetime(1970, 1, 1)
 
-    def __init__(self, queue_pool: QueuePool, **kwargs):
+    def __init__(self, queue_broker: QueueBroker, **kwargs):
         super().__init__(**kwargs)
-        self.queue_pool = queue_pool
+        self.queue_broker = queue_broker
 
     def start(self):
         pass
@@ -159,11 +161,12 @@ class Cohort(CohortInterface):
         for idx, uuid in enumerate(group_ids):
             if uuid not in self.peers:
                 self.peers[uuid] = PeerDataAcq(uuid, idx, group_ids[uuid], NullPeerData(), self,
-                                               self.queue_pool.next(), self.queue_pool.next())
-                # FIXME dynamically creating queues is a problem: "Pickling an AuthenticationString object is disallowed for security reasons"
-        for uuid in self.peers:
+                                               self.queue_broker.acquire(), self.queue_broker.acquire())
+        for uuid in list(self.peers):
             if uuid not in group_ids:
-                del self.peers[uuid]
+                peer = self.peers.pop(uuid)
+                self.queue_broker.release(peer.video_stream)
+                self.queue_broker.release(peer.data_stream)
 
     @property
     def center(self) -> Position:
@@ -185,6 +188,7 @@ class Cohort(CohortInterface):
 class CohortProtocol(Protocol):
     meta = 'meta'
     stats = 'stats'
+    metrics = Metrics.response
 
 
 class CohortTracker(Process, metaclass=ProcMeta,
@@ -195,11 +199,13 @@ class CohortTracker(Process, metaclass=ProcMeta,
         self.protocol = CohortProtocol(self.name, self.logger, configurations)
         self.protocol.register_handler(CohortProtocol.meta, self.handle_metadata)
         self.protocol.register_handler(CohortProtocol.stats, self.handle_stats)
+        self.protocol.register_handler(CohortProtocol.metrics, self.handle_metrics)
         self.servicers = []
+        self._metrics_requested = None
 
     def handle_metadata(self, _, message):
         if message.function == CohortProtocol.meta:
-            metadata = from_yaml_string(message.obj)
+            metadata = from_payload(message.obj)
             uuid = message.from_whom.uuid
             if uuid in self.cohort.peers:
                 peer = self.cohort.peers[uuid]
@@ -209,7 +215,7 @@ class CohortTracker(Process, metaclass=ProcMeta,
 
     def handle_stats(self, _, message):
         if message.function == CohortProtocol.stats:
-            data = from_yaml_string(message.obj)  # FIXME 'total' also
+            data = from_payload(message.obj)  # FIXME 'total' also
             uuid = message.from_whom.uuid
             if uuid in self.cohort.peers:
                 peer = self.cohort.peers[uuid]
@@ -218,6 +224,31 @@ class CohortTracker(Process, metaclass=ProcMeta,
             return True
         return False
 
+    def handle_metrics(self, _, message):
+        if message.function == CohortProtocol.metrics:
+            self.cohort.metrics = message.obj
+            return True
+        return False
+
+    def request_metrics(self, queues):
+        if self._metrics_requested is None or \
+                (datetime.now() - self._metrics_requested).total_seconds() >= self.metrics_interval:
+            self._metrics_requested = datetime.now()
+            msg = Message(CfgIds.main, Metrics.request, None, return_to=self.name)
+            queues[CfgIds.main].put(msg, block=True, timeout=self.q_cadence)
+
+    def handle_message(self, queues, message):
+        if isinstance(message, Message) and message.function == ReputationProtocol.rep_resp:
+            rep = message.obj
+            if rep.peer_id in self.cohort.peers:
+                peer = self.cohort.peers[rep.peer_id]
+                peer.reputation = rep.score
+        elif isinstance(message, Peers):
+            peer_idents = {p.uuid: p for p in message.listing.values()}
+            self.cohort.update_group(peer_idents)
+        elif not self.protocol.run_message_handlers(queues, message):
+            self.unhandled(message)
+
     def process(self, queues, signal):
         while self.keep_running(signal):
             if 'peer-metadata' in self.protocol.peer_capabilities:
@@ -228,24 +259,6 @@ class CohortTracker(Process, metaclass=ProcMeta,
                         queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                         msg = Message(NetStatsSource.name, NetStatsProtocol.request, True, peer)
                         queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
+            self.request_metrics(queues)
 
-            try:
-                message = queues[self.name].get(block=True, timeout=self.q_cadence)
-            except Empty:
-                message = None
-            if message:
-                if isinstance(message, Message) and message.function == ReputationProtocol.rep_resp:
-                    rep = message.obj
-                    if rep.peer_id in self.cohort.peers:
-                        peer = self.cohort.peers[rep.peer_id]
-                        peer.reputation = rep.score
-                elif isinstance(message, Peers):
-                    peer_idents = {p.uuid: p for p in message.listing.values()}
-                    self.cohort.update_group(peer_idents)
-                elif not self.protocol.run_message_handlers(queues, message):
-                    if isinstance(message, Message):
-                        self.logger.error('Unhandled message %s' % message.function)
-                    else:
-                        self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
-
-            self.sleep_until(self.cadence)
+            self.dispatch_messages(queues)
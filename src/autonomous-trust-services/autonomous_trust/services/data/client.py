@@ -17,7 +17,7 @@
 import struct
 from queue import Empty, Full
 
-from autonomous_trust.core import Process, ProcMeta, CfgIds, from_yaml_string
+from autonomous_trust.core import Process, ProcMeta, CfgIds, from_payload
 from autonomous_trust.core.network import Message
 from .server import DataProcess, DataProtocol
 
@@ -38,7 +38,7 @@ class DataRcvr(Process, metaclass=ProcMeta,
         if message.function == DataProtocol.data:
             try:
                 uuid = message.from_whom.uuid
-                data = from_yaml_string(message.obj)
+                data = from_payload(message.obj)
                 if uuid in self.cohort.peers:
                     self.cohort.peers[uuid].data_stream.put(data, block=True, timeout=self.q_cadence)
             except (Full, Empty):
@@ -54,13 +54,4 @@ class DataRcvr(Process, metaclass=ProcMeta,
                         msg = Message(DataProcess.name, DataProtocol.request, msg_obj, peer)
                         queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
 
-            try:
-                message = queues[self.name].get(block=True, timeout=self.q_cadence)
-            except Empty:
-                message = None
-            if message:
-                if not self.protocol.run_message_handlers(queues, message):
-                    if isinstance(message, Message):
-                        self.logger.error('Unhandled message %s' % message.function)
-                    else:
-                        self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
+            self.dispatch_messages(queues)
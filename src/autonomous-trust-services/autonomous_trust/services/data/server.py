@@ -15,9 +15,9 @@
 # ******************
 
 import warnings
-from queue import Empty, Full
+from queue import Full
 
-from autonomous_trust.core import Process, ProcMeta, CfgIds, to_yaml_string, InitializableConfig
+from autonomous_trust.core import Process, ProcMeta, CfgIds, InitializableConfig
 from autonomous_trust.core.identity import Identity
 from autonomous_trust.core.network import Message
 from autonomous_trust.core.protocol import Protocol
@@ -67,32 +67,17 @@ class DataProcess(Process, metaclass=ProcMeta,
             return True
         return False
 
-    def process_messages(self, queues):
-        try:
-            message = queues[self.name].get(block=True, timeout=self.q_cadence)
-        except Empty:
-            message = None
-        if message:
-            if not self.protocol.run_message_handlers(queues, message):
-                if isinstance(message, Message):
-                    self.logger.error('Unhandled message %s' % message.function)
-                else:
-                    self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
-
     def process(self, queues, signal):
         while self.keep_running(signal):
-            self.process_messages(queues)
-
             if self.active:
                 data = self.acquire()
                 if data is not None:
                     for client_id in self.clients:
                         proc_name, peer = self.clients[client_id]
-                        msg_obj = to_yaml_string(data)
-                        msg = Message(proc_name, DataProtocol.data, msg_obj, peer)
+                        msg = Message(proc_name, DataProtocol.data, data, peer)
                         try:
                             queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                         except Full:
                             pass
 
-            self.sleep_until(self.cadence)
+            self.dispatch_messages(queues)
@@ -15,11 +15,11 @@
 # ******************
 
 from datetime import datetime, timedelta
-from queue import Full, Empty
+from queue import Full
 
 import psutil
 
-from autonomous_trust.core import Process, ProcMeta, Configuration, CfgIds, to_yaml_string
+from autonomous_trust.core import Process, ProcMeta, Configuration, CfgIds
 from autonomous_trust.core.identity import Identity
 from autonomous_trust.core.network import Message, Network
 from autonomous_trust.core.protocol import Protocol
@@ -95,23 +95,16 @@ class NetStatsSource(Process, metaclass=ProcMeta,
             return True
         return False
 
+    def handle_message(self, queues, message):
+        if not self.protocol.run_message_handlers(queues, message):
+            if isinstance(message, Message) and message.function == Network.stats_resp:
+                self.network_source.recv(message.obj)
+            else:
+                self.unhandled(message)
+
     def process(self, queues, signal):
         self.network_source.net_queue = queues[CfgIds.network]
         while self.keep_running(signal):
-            try:
-                message = queues[self.name].get(block=True, timeout=self.q_cadence)
-            except Empty:
-                message = None
-            if message:
-                if not self.protocol.run_message_handlers(queues, message):
-                    if isinstance(message, Message):
-                        if message.function == Network.stats_resp:
-                            self.network_source.recv(message.obj)
-                        else:
-                            self.logger.error('Unhandled message %s' % message.function)
-                    else:
-                        self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
-
             statistics = {'total': NetworkStats(*self.compute_rate(), *(self.latest[1:]))}
             try:
                 for peer in self.clients:
@@ -120,12 +113,11 @@ class NetStatsSource(Process, metaclass=ProcMeta,
                 pass
 
             # ship it to consumer UI
-            obj = to_yaml_string(statistics)
             for peer in self.clients:
-                msg = Message(self.name, NetStatsProtocol.stats, obj, peer)
+                msg = Message(self.name, NetStatsProtocol.stats, statistics, peer)
                 try:
                     queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                 except Full:
                     pass
 
-            self.sleep_until(self.cadence)
+            self.dispatch_messages(queues)
@@ -17,7 +17,7 @@
 import os
 import sys
 from datetime import datetime
-from queue import Empty, Full
+from queue import Full
 
 from autonomous_trust.core import Process, ProcMeta, CfgIds, Configuration, InitializableConfig
 from autonomous_trust.core.identity import Identity
@@ -115,17 +115,6 @@ class MetadataSource(Process, metaclass=ProcMeta,
 
     def process(self, queues, signal):
         while self.keep_running(signal):
-            try:
-                message = queues[self.name].get(block=True, timeout=self.q_cadence)
-            except Empty:
-                message = None
-            if message:
-                if not self.protocol.run_message_handlers(queues, message):
-                    if isinstance(message, Message):
-                        self.logger.error('Unhandled message %s' % message.function)
-                    else:
-                        self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
-
             time = self.cfg.time_source.acquire()
             position, speed = self.cfg.position_source.acquire()
             obj = PeerData(time, position, speed, self.cfg.peer_kind,
@@ -137,4 +126,4 @@ class MetadataSource(Process, metaclass=ProcMeta,
                 except Full:
                     pass
 
-            self.sleep_until(self.cadence)
+            self.dispatch_messages(queues)
@@ -78,13 +78,4 @@ class VideoRcvr(Process, metaclass=ProcMeta,
                         msg = Message(VideoProcess.name, VideoProtocol.request, msg_obj, peer)
                         queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
 
-            try:
-                message = queues[self.name].get(block=True, timeout=self.q_cadence)
-            except Empty:
-                message = None
-            if message:
-                if not self.protocol.run_message_handlers(queues, message):
-                    if isinstance(message, Message):
-                        self.logger.error('Unhandled message %s' % message.function)
-                    else:
-                        self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
+            self.dispatch_messages(queues)
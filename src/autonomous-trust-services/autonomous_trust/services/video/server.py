@@ -125,8 +125,6 @@ class VideoProcess(DataProcess, metaclass=ProcMeta,
 
     def process(self, queues, signal):
         while self.keep_running(signal):
-            self.process_messages(queues)
-
             if self.active:
                 frame, index = self.acquire()
                 if frame is not None:
@@ -147,4 +145,4 @@ class VideoProcess(DataProcess, metaclass=ProcMeta,
                         except Full:
                             pass  # skip this frame
 
-            self.sleep_until(self.cadence)
+            self.dispatch_messages(queues)
@@ -22,7 +22,7 @@ import sys
 from autonomous_trust.core import Configuration, ProcessTracker, Process
 from autonomous_trust.core.automate import ConfigMap
 from autonomous_trust.core.config.discover import load_configs
-from autonomous_trust.core.queue_pool import QueuePool
+from autonomous_trust.core.queue_broker import BrokerManager
 from autonomous_trust.inspector.peer.daq import Cohort, CohortTracker
 from autonomous_trust.services.data.client import DataRcvr
 from autonomous_trust.services.network_statistics import NetStatsSource
@@ -46,12 +46,12 @@ if __name__ == '__main__':
                                              '..', '..', 'examples', 'mission', 'coordinator'))
     os.environ[Configuration.ROOT_VARIABLE_NAME] = coord_cfg
     ctx = multiprocessing.get_context('forkserver')
-    manager = ctx.Manager()
+    manager = BrokerManager(ctx=ctx)
+    manager.start()
     with multiprocessing.Pool(5) as pool:
         # pool.apply_async(target=Simulator(config, max_time_steps=steps, log_level=log_level).run, args=(sim_port,))
 
-        queue_pool = QueuePool(manager.Queue)
-        cohort = Cohort(queue_pool, log_level=log_level)
+        cohort = Cohort(manager.QueueBroker(), log_level=log_level)
         subsystems = ProcessTracker()
         configurations: ConfigMap = load_configs()
         log_queue = manager.Queue()
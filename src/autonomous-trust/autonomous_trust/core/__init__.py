@@ -14,14 +14,41 @@
 #   limitations under the License.
 # ******************
 
-try:
-    import importlib.metadata  # noqa
-    __version__ = importlib.metadata.version("autonomous_trust")
-except ImportError:
-    __version__ = 0
+from importlib import import_module
 
-from .automate import AutonomousTrust  # noqa
+# public names -> submodule; imported on first use, so that importing the package stays cheap
+_lazy = {
+    'AutonomousTrust': '.automate',
+    'yaml': '.processes', 'ProcessTracker': '.processes', 'Process': '.processes', 'ProcMeta': '.processes',
+    'LogLevel': '.processes',
+    'Configuration': '.config', 'InitializableConfig': '.config', 'EmptyObject': '.config',
+    'to_yaml_string': '.config', 'from_yaml_string': '.config', 'to_wire': '.config', 'from_wire': '.config',
+    'from_payload': '.config',
+    'CfgIds': '.system', 'QueueType': '.system',
+    'RingQueue': '.ring_queue',
+    'QueueBroker': '.queue_broker', 'BrokerManager': '.queue_broker',
+    'Metrics': '.metrics', 'MetricsRegistry': '.metrics', 'MetricsCollector': '.metrics', 'MetricsServer': '.metrics',
+}
 
-from .processes import yaml, ProcessTracker, Process, ProcMeta, LogLevel
-from .config import Configuration, InitializableConfig, EmptyObject, to_yaml_string, from_yaml_string
-from .system import CfgIds, QueueType
+
+def _version():
+    try:
+        import importlib.metadata  # noqa
+        return importlib.metadata.version("autonomous_trust")
+    except ImportError:
+        return 0
+
+
+def __getattr__(name):
+    if name == '__version__':
+        value = _version()
+    elif name in _lazy:
+        value = getattr(import_module(_lazy[name], __name__), name)
+    else:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy) + ['__version__'])
@@ -36,6 +36,8 @@ def main():
                         help='run limited testing application')
     parser.add_argument('--live', action='store_true',
                         help='run in production environ')
+    parser.add_argument('--shared-memory', action='store_true',
+                        help='use shared memory queues between subsystems')
     args = parser.parse_args()
 
     if args.remote_debug is not None:
@@ -52,7 +54,7 @@ def main():
     if args.exclude_logs is not None:
         to_log = [cls for cls in list(CfgIds) if cls not in args.exclude_logs]
     AutonomousTrust(multiproc=True, log_level=LogLevel.DEBUG, logfile=Configuration.log_stdout,
-                    log_classes=to_log, testing=args.test).run_forever()
+                    log_classes=to_log, testing=args.test, shared_memory=args.shared_memory).run_forever()
 
 
 if __name__ == '__main__':
@@ -62,6 +62,14 @@ class AgreementVoter(ABC):
         """
         return False
 
+    def verify_votes(self, votes: list[tuple['AgreementVoter', AgreementProof, bytes]]) -> list[bool]:
+        """
+        Check the signatures on a round of votes from any voters, derived classes may batch
+        :param votes: list of (AgreementVoter, AgreementProof, sig)
+        :return: list of bool, in vote order
+        """
+        return [voter.verify(proof, sig) for voter, proof, sig in votes]
+
 
 class VoterTracker(ABC):
     def __init__(self, myself: AgreementVoter):
@@ -74,7 +82,7 @@ class AgreementProtocol(VoterTracker):
     """
     def __init__(self, myself: AgreementVoter, others: list[AgreementVoter]):
         VoterTracker.__init__(self, myself)
-        self.voters = others + [myself]
+        self.voters = list(others) + [myself]
         self._votes = {}
 
     def prove(self, blob: SimplestBlob) -> AgreementProof:
@@ -127,14 +135,11 @@ class AgreementProtocol(VoterTracker):
 
         self._prep_vote()
         voters = {peer.uuid: peer for peer in self.voters}
-        approvals = []
         if blob.uuid not in self._votes:
             return False
-        for id_obj, proof, sig in self._votes[blob.uuid]:
-            if proof.uuid not in voters:
-                continue
-            voter = voters[proof.uuid]
-            #if voter.verify(proof, sig):  # properly signed proof  # FIXME The signature must be exactly 64 bytes long
-            approvals.append(self._count_vote(id_obj, proof, voter))
-        del self._votes[blob.uuid]
+        votes = [(id_obj, proof, voters[proof.uuid], sig)
+                 for id_obj, proof, sig in self._votes.pop(blob.uuid) if proof.uuid in voters]
+        signed = self.myself.verify_votes([(voter, proof, sig) for _, proof, voter, sig in votes])  # whole round
+        approvals = [self._count_vote(id_obj, proof, voter)
+                     for (id_obj, proof, voter, _), valid in zip(votes, signed) if valid]
         return self._accumulate_votes(approvals)
@@ -34,4 +34,4 @@ class AgreementByAuthority(AgreementProtocol, ABC):
 
     def _accumulate_votes(self, votes):
         leader = max([voter.rank for voter in self.voters])
-        return dict(votes)[leader]
+        return dict(votes).get(leader, False)  # a leader without a valid vote does not approve
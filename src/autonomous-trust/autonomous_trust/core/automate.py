@@ -18,15 +18,19 @@ from __future__ import annotations
 
 import os
 import random
+import sched
 import sys
+import threading
 import time
 import logging
 from datetime import datetime
 from logging.handlers import TimedRotatingFileHandler, SysLogHandler
 import traceback
 import queue
+from contextlib import ExitStack
 from enum import Enum
-from typing import Any, Union
+from functools import partial
+from typing import Any, Callable, Optional, Union
 import multiprocessing as mp
 from multiprocessing import Pool as ProcessPool
 from multiprocessing.dummy import Pool as ThreadPool
@@ -36,21 +40,19 @@ from decimal import Decimal, getcontext
 
 import psutil
 
-try:
-    from . import __version__ as version
-except ImportError:
-    version = '?.?.?'
-from .config import Configuration, to_yaml_string, ConfigMap
+from .config import Configuration, ConfigMap
 from .config.discover import get_cfg_type, load_configs
-from .processes import Process, LogLevel, ProcessTracker
+from .processes import Process, LogLevel, ProcessTracker, SchedulingPolicy, apply_policy
 from .identity import Peers
 from .capabilities import Capabilities, Capability, PeerCapabilities
-from .system import CfgIds, PackageHash, queue_cadence, max_concurrency, now, preferred_proto_ver, QueueType
+from .system import CfgIds, PackageHash, cadence, queue_cadence, max_concurrency, now, preferred_proto_ver, \
+    QueueType
 from .protocol import Protocol
 from .negotiation import Task, TaskParameters, TaskStatus, Status, TaskResult, NegotiationProtocol
 from .network import Message
 from .reputation import TransactionScore, ReputationProtocol
-from .queue_pool import QueuePool
+from .queue_broker import QueueBroker, BrokerManager
+from .metrics import Metrics, MetricsCollector, MetricsRegistry, MetricsReport, MetricsServer
 
 PoolType = Union[ProcessPool, ThreadPool]
 
@@ -64,6 +66,20 @@ def pi(precision):  # intentionally non-trivial, arbitrary precision
                 Decimal(1) / (8 * k + 6)) for k in range(precision))
 
 
+def run_placed(proc: Process, policy: SchedulingPolicy, queues: dict[str, QueueType], signal: QueueType):
+    """
+    Pool target for subsystems: apply the scheduling policy, then run
+    :param proc: subsystem
+    :param policy: SchedulingPolicy, or None when threaded
+    :param queues: Interprocess communication queues to each process
+    :param signal: queue listening for a quit signal
+    :return: result of proc.process()
+    """
+    if policy is not None:
+        apply_policy(policy, proc.name, proc.log_queue)
+    return proc.process(queues, signal)
+
+
 class Ctx(str, Enum):
     FORK = 'fork'
     SPAWN = 'spawn'
@@ -82,23 +98,37 @@ class AutonomousTrust(Protocol):
     """
     external_control = 'extern_out'
     external_feedback = 'extern_in'
+    tasking_period = cadence  # seconds between autonomous_tasking() calls
+    batch_size = 64  # events handled per wakeup, before timers get another chance
+    _log_source = 'log'
+    _done_source = 'done'
+    _pid_source = 'pid'
 
     # default to production values
     def __init__(self, multiproc: bool = True, log_level: int = LogLevel.WARNING,
                  logfile: str = None, log_classes: list[str] = None, syslog: bool = False,
-                 context: str = Ctx.DEFAULT, testing: bool = False, silent: bool = False):
+                 context: str = Ctx.DEFAULT, testing: bool = False, silent: bool = False,
+                 shared_memory: bool = False, metrics_port: int = None):
         self._stopped_procs: list[str] = []
+        self._ring_type = None
         if multiproc:
             # Multiprocessing
             self._pool_type = ProcessPool
             ctx = mp.get_context(context)
-            manager = ctx.Manager()
-            self._queue_type = manager.Queue  # noqa
+            self._manager = BrokerManager(ctx=ctx)
+            self._manager.start()
+            self.queue_broker: QueueBroker = self._manager.QueueBroker()  # noqa
+            self._queue_type = self._manager.Queue  # noqa
+            if shared_memory:  # subsystem queues only, others are created after the processes start
+                from .ring_queue import RingQueue
+                self._ring_type = RingQueue
+                self._queue_type = partial(RingQueue, ctx=ctx)
         else:
             # Threading
             self._pool_type = ThreadPool
+            self._manager = None
+            self.queue_broker: QueueBroker = QueueBroker()
             self._queue_type = queue.Queue
-        self.queue_pool: QueuePool = QueuePool(self._queue_type)
 
         self._log_level: int = log_level
         self.name: str = self.__class__.__name__
@@ -134,11 +164,21 @@ class AutonomousTrust(Protocol):
         self.silent = silent
         self.active_tasks: dict[str, Task] = {}
         self.active_pids: dict[str, int] = {}
+        self._pid_queue: Optional[QueueType] = None  # (task uuid, pid) from tasks as they start
         self.last_tick: dict[int, int] = {}
         self.tasking_start: datetime = now()
         self.latest_reputation: dict[str, Any] = {}
         self.unhandled_messages: list[Message] = []
         self.peer_count = 0
+        self._events: queue.Queue = queue.Queue()  # (source, item) from pumps and completion callbacks
+        self._timers: sched.scheduler = sched.scheduler(time.monotonic)
+        self.metrics_port = metrics_port  # local HTTP (Prometheus) endpoint, if any
+        self.metrics_collector: MetricsCollector = MetricsCollector()
+        self.metrics: MetricsRegistry = MetricsRegistry()
+        self._event_depth = self.metrics.gauge('queue_depth')
+        self._events_handled = self.metrics.counter('messages_handled')
+        self.metrics_collector.attach(self.proc_name, self.metrics)
+        self.register_handler(Metrics.request, self._handle_metrics_request)
 
     def print(self, string):
         if not self.silent:
@@ -146,6 +186,7 @@ class AutonomousTrust(Protocol):
 
     @property
     def queue_type(self):
+        """Queues created before the subsystem processes start"""
         return self._queue_type
 
     @property
@@ -211,13 +252,27 @@ class AutonomousTrust(Protocol):
                     self._random_task(queues)
                     # check my own reputation
                     query = Message(CfgIds.reputation, ReputationProtocol.rep_req,
-                                    to_yaml_string((self.identity, self.proc_name)), self.identity)
+                                    (self.identity, self.proc_name), self.identity)
                     queues[CfgIds.reputation].put(query, block=True, timeout=queue_cadence)
         self._report_unhandled()
 
     def cleanup(self):
         pass
 
+    def schedule(self, period: float, action: Callable, *args) -> None:
+        """
+        Run an action periodically in the main loop, e.g. from init_tasking()
+        :param period: seconds between runs
+        :param action: callable
+        :param args: arguments for action
+        :return: None
+        """
+        def periodic():
+            self._timers.enter(period, 0, periodic)
+            action(*args)
+
+        self._timers.enter(period, 0, periodic)
+
     def autonomous_loop(self, results: dict[str, AsyncResult], queues: dict[str, QueueType],
                         signals: dict[str, QueueType]) -> None:
         """
@@ -230,15 +285,13 @@ class AutonomousTrust(Protocol):
         """
         self.autonomous_ability(queues)
         self.init_tasking(queues)
-        with self._pool_type(max_concurrency) as pool:
+        self.schedule(self.tasking_period, self.autonomous_tasking, queues)
+        stop = self._start_pumps(queues)
+        with self._task_pool() as pool:
             while True:
                 try:
-                    self._monitor_processes(results)
-                    if not self._handle_messages(queues, pool, results):
+                    if not self._handle_events(self._next_events(), queues, pool, results):
                         break
-                    self._handle_results(queues, results)
-                    self.autonomous_tasking(queues)
-                    time.sleep(Process.cadence)
                 except KeyboardInterrupt:
                     for sig in signals.values():
                         sig.put_nowait(Process.sig_quit)
@@ -246,6 +299,7 @@ class AutonomousTrust(Protocol):
                 except Exception as err:
                     self.logger.error(self.name + ':  ' +
                                       ''.join(traceback.TracebackException.from_exception(err).format()))
+        stop.set()
         self.cleanup()
 
     def run_forever(self, q_in: QueueType = None, q_out: QueueType = None):
@@ -269,30 +323,70 @@ class AutonomousTrust(Protocol):
         queues = dict(zip(list(map(lambda x: x.name, procs)),
                           [self.queue_type() for _ in range(len(procs))]))
         queues[self.proc_name] = self._my_queue
-        signals: dict[str, QueueType] = {}
+        signals: dict[str, QueueType] = {proc.name: self.queue_type() for proc in procs}
         results: dict[str, AsyncResult] = {}
-        with self._pool_type(len(procs)) as pool:
+        rings = []
+        if self._ring_type is not None:
+            rings = [q for q in [self._output, *queues.values(), *signals.values()] if isinstance(q, self._ring_type)]
+        inherit = {}
+        if rings:
+            inherit = dict(initializer=self._ring_type.inherit, initargs=tuple(rings))
+        multiproc = self._pool_type is ProcessPool
+        policies = {proc.name: self._subsystems.policy(proc.cfg_name) for proc in procs}
+        self.logger.info(self.name + ':  Placement: %s' % SchedulingPolicy.placement())
+        if not multiproc and any(policies.values()):
+            self.logger.warning(self.name + ':  Scheduling policies are ignored when threaded')
+        shared = [proc for proc in procs if not (multiproc and policies[proc.name].dedicated)]
+        with ExitStack() as stack:
+            pools = []
+            if shared:
+                pools.append(stack.enter_context(self._pool_type(len(shared), **inherit)))
             for proc in procs:  # FIXME split system procs from additional
                 self.logger.info(self.name + ':  Starting %s ...' % proc.name)
                 self.process_names.append(proc.name)
-                signals[proc.name] = self.queue_type()
-                results[proc.name] = pool.apply_async(proc.process, (queues, signals[proc.name]))
+                if proc in shared:
+                    pool = pools[0]
+                else:
+                    pool = stack.enter_context(self._pool_type(1, **inherit))
+                    pools.append(pool)
+                policy = policies[proc.name] if multiproc else None
+                done = self._on_completion(proc.name)
+                results[proc.name] = pool.apply_async(run_placed, (proc, policy, queues, signals[proc.name]),
+                                                      callback=done, error_callback=done)
             if q_in is not None:
                 queues[self.external_control] = q_in  # main loop must watch/process
             if q_out is not None:
                 queues[self.external_feedback] = q_out  # main loop must upload to this
-            pool.close()  # no more system tasks (use separate pool for dynamic tasks)
+            for pool in pools:
+                pool.close()  # no more system tasks (use separate pool for dynamic tasks)
+            if self.metrics_port is not None:
+                server = MetricsServer(self.metrics_collector, self.metrics_port)
+                server.start()
+                stack.callback(server.stop)
+                self.logger.info(self.name + ':  Metrics at http://%s:%d/metrics' % (server.address, server.port))
             self.logger.info(self.name + ':                                          Ready.')  # FIXME not really ready
 
             self.autonomous_loop(results, queues, signals)
 
+        for ring in rings:
+            ring.close()
+            ring.unlink()
         self.logger.info(self.name + ':  Shutdown')
 
     ####################
     # Protected methods
 
+    def _task_pool(self) -> PoolType:
+        if self._pool_type is ProcessPool:
+            policy = self._subsystems.policy(ProcessTracker.tasks)
+            if policy:
+                return self._pool_type(max_concurrency, initializer=apply_policy,
+                                       initargs=(policy, ProcessTracker.tasks, self._output))
+        return self._pool_type(max_concurrency)
+
     def _banner(self):
         self.print("")
+        version = getattr(sys.modules[__package__], '__version__', '?.?.?')
         self.print("You are using\033[94m AutonomousTrust\033[00m v%s from\033[96m TekFive\033[00m." % version)
         self.print("")
 
@@ -319,7 +413,7 @@ class AutonomousTrust(Protocol):
         # load configs
         configs = load_configs()
 
-        package_hash = PackageHash()
+        package_hash = PackageHash(cache_file=os.path.join(Configuration.get_data_dir(), PackageHash.cache_name))
         configs[PackageHash.key] = package_hash.digest
         configs[Process.level] = self._log_level
 
@@ -367,14 +461,23 @@ class AutonomousTrust(Protocol):
                     self._stopped_procs.append(name)
 
         if show_output:
-            # record subprocess outputs, if any
+            # record all pending subprocess outputs
             try:
-                level, name, msg = self._output.get_nowait()
-                self.logger.log(level, '%s: %s' % (name, msg))
+                while True:
+                    self._log_records(self._output.get_nowait())
             except queue.Empty:
                 pass
         return True
 
+    def _log_records(self, batch: list[tuple[int, str, str]]):
+        """
+        Log a batch shipped by a subsystem ProcessLogger
+        :param batch: list of (level, name, msg)
+        :return: None
+        """
+        for level, name, msg in batch:
+            self.logger.log(level, '%s: %s' % (name, msg))
+
     def _failed_task_cb(self, task: Task):
         def report_error(err: Exception):
             self.logger.error('Task %s failed: %s' %
@@ -382,70 +485,181 @@ class AutonomousTrust(Protocol):
 
         return report_error
 
-    def _handle_messages(self, queues: dict[str, QueueType], pool: PoolType, results: dict[str, AsyncResult]):
+    def _start_pumps(self, queues: dict[str, QueueType]) -> threading.Event:
+        """
+        Forward the main, external control and log queues into the local event queue
+        :param queues: Interprocess communication queues to each process
+        :return: Event that stops the pumps
+        """
+        stop = threading.Event()
+        sources = {self.proc_name: queues[self.proc_name], self._log_source: self._output,
+                   self._pid_source: self.pid_queue}
         if self.external_control in queues:
+            sources[self.external_control] = queues[self.external_control]
+        for source, q in sources.items():
+            threading.Thread(target=self._pump, args=(source, q, stop), name='%s-pump' % source, daemon=True).start()
+        return stop
+
+    def _pump(self, source: str, q: QueueType, stop: threading.Event):
+        while not stop.is_set():
             try:
-                cmd = queues[self.external_control].get_nowait()
-                if isinstance(cmd, Task):
-                    message = Message(CfgIds.negotiation, NegotiationProtocol.start, cmd)
-                    queues[CfgIds.negotiation].put(message, block=True, timeout=queue_cadence)
-                elif cmd == Process.sig_quit:
-                    self.logger.debug(self.name + ": External signal to quit")
-                    return False
+                self._events.put((source, q.get(block=True, timeout=cadence)))
             except queue.Empty:
                 pass
-            except queue.Full:
-                self.logger.error(self.name + ': Negotiation queue full')
+            except (EOFError, OSError):  # manager went away during shutdown
+                break
 
-        message = None
+    @property
+    def pid_queue(self) -> QueueType:
+        """Where running tasks report their pid; a brokered queue, so that it can be passed to the task pool"""
+        if self._pid_queue is None:
+            self._pid_queue = self.queue_broker.acquire()
+        return self._pid_queue
+
+    def _record_pid(self, item: tuple[str, int]):
+        key, pid = item
+        if key in self.active_tasks:  # otherwise already done
+            self.active_pids[key] = pid
+
+    def _on_completion(self, key: str) -> Callable:
+        """
+        AsyncResult callback that wakes the main loop
+        :param key: results key
+        :return: callable
+        """
+        def completed(_):
+            self._events.put((self._done_source, key))
+
+        return completed
+
+    def _next_events(self) -> list[tuple[str, Any]]:
+        """
+        Run due timers, then wait for events until the next timer is due
+        :return: up to batch_size (source, item) tuples
+        """
+        delay = self._timers.run(blocking=False)
+        events = []
         try:
-            message = queues[self.proc_name].get(block=True, timeout=queue_cadence)
+            events.append(self._events.get(block=True, timeout=delay))
+            while len(events) < self.batch_size:
+                events.append(self._events.get_nowait())
         except queue.Empty:
             pass
+        return events
 
-        if message is not None:
-            if not self.run_message_handlers(queues, message):
-                if isinstance(message, TaskStatus):
-                    if message.uuid in self.active_pids:
-                        pid = self.active_pids[message.uuid]
-                        message.status = Status.from_ps(psutil.Process(pid).status())
-                    else:
-                        message.status = Status.unknown
-                    queues[CfgIds.negotiation].put(message, block=True, timeout=queue_cadence)
-                    self.logger.debug('Handled status: %s' % message.status)
-                elif isinstance(message, TaskResult):
-                    task = message
-                    self.logger.debug(self.name + ': Task result recvd: %s' % task.result)
-                    tx = TransactionScore(task.uuid, 0.5)  # FIXME relevant evaluation
-                    queues[CfgIds.reputation].put(tx, block=True, timeout=queue_cadence)
-                    if self.external_feedback in queues:
-                        queues[self.external_feedback].put(task, block=True, timeout=queue_cadence)
-                elif isinstance(message, Task):
-                    task = message
-                    if task.capability in self.capabilities:
-                        capability = self.capabilities[task.capability.name]
-                        pq = self.queue_type()
-                        self.logger.debug(self.name + ': Running task')
-                        self.active_tasks[str(task.uuid)] = task
-                        results[task.uuid] = pool.apply_async(capability.execute, (task, pq))
-                        try:
-                            pid = pq.get(block=True, timeout=1)
-                            self.active_pids[str(task.uuid)] = pid
-                        except queue.Empty:
-                            self.logger.error(self.name + ': Process failed')  # FIXME more info
-                elif isinstance(message, Message) and message.function == ReputationProtocol.rep_resp:
-                    rep = message.obj
-                    if rep.peer_id == self.identity.uuid:
-                        self.print('My current reputation score:\033[31m %s\033[00m' % rep.score)
-                    else:
-                        peer = self.peers.find_by_uuid(rep.peer_id)
-                        if peer:
-                            self.print("%s's current reputation score:\033[31m %s\033[00m" % (peer.nickname, rep.score))
-                    self.latest_reputation[str(rep.peer_id)] = rep
+    def _handle_events(self, events: list[tuple[str, Any]], queues: dict[str, QueueType], pool: PoolType,
+                       results: dict[str, AsyncResult]) -> bool:
+        """
+        Handle a batch of events from _next_events()
+        :return: whether to keep going or not
+        """
+        completed = []
+        self._event_depth.set(len(events))
+        self._events_handled.inc(len(events))
+        for source, item in events:
+            try:
+                if source == self.proc_name:
+                    self._handle_message(queues, pool, results, item)
+                elif source == self.external_control:
+                    if not self._handle_command(queues, item):
+                        return False
+                elif source == self._log_source:
+                    self._log_records(item)
+                elif source == self._pid_source:
+                    self._record_pid(item)
                 else:
-                    self.unhandled_messages.append(message)
+                    completed.append(item)
+            except Exception as err:  # one bad message must not drop the rest of the batch
+                self.logger.error(self.name + ':  ' +
+                                  ''.join(traceback.TracebackException.from_exception(err).format()))
+        if completed:
+            for key in completed:  # callbacks run just before the result is marked ready
+                if key in results:
+                    results[key].wait(cadence)
+            self._monitor_processes(results, show_output=False)
+            self._handle_results(queues, results)
+        return True
+
+    def _handle_messages(self, queues: dict[str, QueueType], pool: PoolType, results: dict[str, AsyncResult]):
+        """
+        Poll for one external command and one message, for main-loop overrides
+        :return: whether to keep going or not
+        """
+        try:
+            while True:
+                self._record_pid(self.pid_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if self.external_control in queues:
+            try:
+                if not self._handle_command(queues, queues[self.external_control].get_nowait()):
+                    return False
+            except queue.Empty:
+                pass
+        try:
+            self._handle_message(queues, pool, results, queues[self.proc_name].get(block=True, timeout=queue_cadence))
+        except queue.Empty:
+            pass
+        return True
+
+    def _handle_metrics_request(self, queues: dict[str, QueueType], message: Message) -> bool:
+        reply = Message(message.return_to, Metrics.response, self.metrics_collector.snapshot())
+        queues[message.return_to].put(reply, block=True, timeout=queue_cadence)
         return True
 
+    def _handle_command(self, queues: dict[str, QueueType], cmd) -> bool:
+        try:
+            if isinstance(cmd, Task):
+                message = Message(CfgIds.negotiation, NegotiationProtocol.start, cmd)
+                queues[CfgIds.negotiation].put(message, block=True, timeout=queue_cadence)
+            elif cmd == Process.sig_quit:
+                self.logger.debug(self.name + ": External signal to quit")
+                return False
+        except queue.Full:
+            self.logger.error(self.name + ': Negotiation queue full')
+        return True
+
+    def _handle_message(self, queues: dict[str, QueueType], pool: PoolType, results: dict[str, AsyncResult],
+                        message):
+        if not self.run_message_handlers(queues, message):
+            if isinstance(message, MetricsReport):
+                self.metrics_collector.update(message)
+            elif isinstance(message, TaskStatus):
+                if message.uuid in self.active_pids:
+                    pid = self.active_pids[message.uuid]
+                    message.status = Status.from_ps(psutil.Process(pid).status())
+                else:
+                    message.status = Status.unknown
+                queues[CfgIds.negotiation].put(message, block=True, timeout=queue_cadence)
+                self.logger.debug('Handled status: %s' % message.status)
+            elif isinstance(message, TaskResult):
+                task = message
+                self.logger.debug(self.name + ': Task result recvd: %s' % task.result)
+                tx = TransactionScore(task.uuid, 0.5)  # FIXME relevant evaluation
+                queues[CfgIds.reputation].put(tx, block=True, timeout=queue_cadence)
+                if self.external_feedback in queues:
+                    queues[self.external_feedback].put(task, block=True, timeout=queue_cadence)
+            elif isinstance(message, Task):
+                task = message
+                if task.capability in self.capabilities:
+                    capability = self.capabilities[task.capability.name]
+                    self.logger.debug(self.name + ': Running task')
+                    self.active_tasks[str(task.uuid)] = task
+                    done = self._on_completion(str(task.uuid))
+                    results[str(task.uuid)] = pool.apply_async(capability.execute, (task, self.pid_queue),
+                                                               callback=done, error_callback=done)
+            elif isinstance(message, Message) and message.function == ReputationProtocol.rep_resp:
+                rep = message.obj
+                if rep.peer_id == self.identity.uuid:
+                    self.print('My current reputation score:\033[31m %s\033[00m' % rep.score)
+                else:
+                    peer = self.peers.find_by_uuid(rep.peer_id)
+                    if peer:
+                        self.print("%s's current reputation score:\033[31m %s\033[00m" % (peer.nickname, rep.score))
+                self.latest_reputation[str(rep.peer_id)] = rep
+            else:
+                self.unhandled_messages.append(message)
+
     def _report_unhandled(self):
         while len(self.unhandled_messages) > 0:
             message = self.unhandled_messages.pop()
@@ -464,7 +678,8 @@ class AutonomousTrust(Protocol):
                     self.logger.debug(self.name + ': %s Task' % key)
                     result = results[key].get()
                     self.logger.debug(self.name + ': %s Task completed %s' % (key, result))
-                    tr = TaskResult(self.active_tasks[key], result)
+                    self.active_pids.pop(key, None)
+                    tr = TaskResult(self.active_tasks.pop(key), result)
                     queues[CfgIds.negotiation].put(tr, block=True, timeout=queue_cadence)
                     tx = TransactionScore(tr.uuid, 0.6)  # FIXME relevant evaluation
                     queues[CfgIds.reputation].put(tx, block=True, timeout=queue_cadence)
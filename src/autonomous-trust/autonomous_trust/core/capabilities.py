@@ -23,15 +23,17 @@ from .protobuf.processes import capabilities_pb2
 
 class Capability(Configuration):
     """Name and function"""
+    message_class = capabilities_pb2.Capability
+
     def __init__(self, name, function=None, arg_names=None, keywords=None):
-        super().__init__(capabilities_pb2.Capability)
+        super().__init__()
         self.name = name
         self.function = function  # this will be None for remote handling
         self.arg_names = arg_names
         self.keywords = keywords
 
     def execute(self, task, pid_q):
-        pid_q.put_nowait(multiprocessing.current_process().pid)
+        pid_q.put_nowait((str(task.uuid), multiprocessing.current_process().pid))
         # FIXME handle errors
         return self.function(*task.parameters.args, **task.parameters.kwargs)
 
@@ -41,6 +43,12 @@ class Capability(Configuration):
     def to_dict(self):
         return dict(name=self.name)  # TODO more info
 
+    def sync_to_message(self):
+        self.message.name = self.name
+
+    def sync_from_message(self):
+        self.__init__(self.message.name)
+
 
 class Capabilities(Mapping):
     """Mapping of name to Capability"""
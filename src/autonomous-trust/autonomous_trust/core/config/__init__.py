@@ -17,5 +17,6 @@
 from typing import Any
 
 from .configuration import Configuration, InitializableConfig, EmptyObject, to_yaml_string, from_yaml_string
+from .wire import to_wire, from_wire, from_payload, WireFormatError
 
 ConfigMap = dict[str, Any]
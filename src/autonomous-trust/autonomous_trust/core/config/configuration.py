@@ -39,20 +39,12 @@ class SerializeMode(Enum):
 
 def to_yaml_string(item):
     sio = StringIO()
-    if Configuration.mode == SerializeMode.YAML:
-        yaml.dump(item, sio)
-    else:
-        # assumes Message type
-        sio.write(item.SerializeToString())
+    yaml.dump(item, sio)
     return sio.getvalue()
 
 
 def from_yaml_string(string):
-    sio = StringIO(string)
-    if Configuration.mode == SerializeMode.YAML:
-        return yaml.load(sio)
-    #else: #FIXME remove both?
-
+    return yaml.load(StringIO(string))
 
 
 class Configuration(object):
@@ -60,14 +52,27 @@ class Configuration(object):
     CFG_PATH = os.path.join('etc', 'at')
     DATA_PATH = os.path.join('var', 'at')
     YAML_PREFIX = u'!Cfg'
-    mode = SerializeMode.PROTO
+    mode = SerializeMode.YAML  # files
     file_ext = '.cfg.yaml' if mode == SerializeMode.YAML else '.cfg.pb'  # FIXME protobuf file_ext
+    wire_mode = SerializeMode.PROTO  # messages, for classes that define a message_class
+    message_class = None
+    wire_types = {}  # class name to class, for classes with their own message type
     log_stdout = hex(sum([ord(x) for x in 'stdout']))
 
     def __init__(self, msg_class=None):
         if msg_class:
             self.message = msg_class()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get('message_class') is not None:
+            Configuration.wire_types[cls.__name__] = cls
+
+    @classmethod
+    def proto_wire(cls):
+        """Whether this class (not merely a base class) is transmitted as its own protobuf message"""
+        return cls.wire_mode == SerializeMode.PROTO and Configuration.wire_types.get(cls.__name__) is cls
+
     @classmethod
     def get_cfg_dir(cls):
         root = os.environ.get(cls.ROOT_VARIABLE_NAME, os.path.abspath(os.sep))
@@ -103,23 +108,31 @@ class Configuration(object):
         return dumper.represent_mapping(data.yaml_tag, data.to_dict())
 
     def sync_to_message(self):
+        """Copy attributes into self.message"""
         raise NotImplementedError
 
+    def to_message(self):
+        self.message = self.message_class()
+        self.sync_to_message()
+        return self.message
+
+    def to_bytes(self):
+        return self.to_message().SerializeToString()
+
     def to_stream(self, stream):
         if self.mode == SerializeMode.YAML:
             yaml.dump(self, stream)
         else:
-            if not self.message.IsInitialized:
-                self.sync_to_message()
-            stream.write(self.message.SerializeToString())
+            stream.write(self.to_bytes())
 
     def to_string(self):
         return str(self)
 
+    def to_yaml_string(self):
+        return to_yaml_string(self)
+
     def __str__(self):
-        sio = StringIO()
-        self.to_stream(sio)
-        return sio.getvalue()
+        return to_yaml_string(self)
 
     def to_file(self, filepath):
         mode = 'w'
@@ -135,20 +148,30 @@ class Configuration(object):
         return cls(**loader.construct_mapping(node, deep=True))
 
     def sync_from_message(self):
+        """Restore attributes from self.message, on an instance that was not initialized"""
         raise NotImplementedError
 
+    @classmethod
+    def from_message(cls, message):
+        obj = cls.__new__(cls)
+        obj.message = message
+        obj.sync_from_message()
+        return obj
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls.from_message(cls.message_class.FromString(data))
+
     @classmethod
     def from_stream(cls, stream):
         if cls.mode == SerializeMode.YAML:
             return yaml.load(stream)
         else:
-            obj = cls()
-            obj.message.ParseFromString(stream.read())
-            obj.sync_from_message()
+            return cls.from_bytes(stream.read())
 
     @classmethod
     def from_yaml_string(cls, string):
-        return cls.from_string(string)
+        return from_yaml_string(string)
 
     @classmethod
     def from_string(cls, string):
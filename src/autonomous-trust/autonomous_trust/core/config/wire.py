@@ -0,0 +1,252 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from google.protobuf.message import DecodeError
+
+from .configuration import Configuration, to_yaml_string, from_yaml_string
+from ..protobuf.structures import value_pb2
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+def encode_uuid(uuid):
+    if not isinstance(uuid, UUID):
+        uuid = UUID(str(uuid))
+    return uuid.bytes
+
+
+def decode_uuid(data):
+    if not data:
+        return None
+    return UUID(bytes=data)
+
+
+def encode_datetime(when, message):
+    """
+    Fill a DateTime message
+    :param when: datetime
+    :param message: DateTime
+    :return: None
+    """
+    message.nanosecond = when.microsecond * 1000
+    message.second = when.second
+    message.minute = when.minute
+    message.hour = when.hour
+    message.day = when.day
+    message.month = when.month
+    message.year = when.year
+    message.weekday = when.isoweekday() % 7
+    message.day_of_year = when.timetuple().tm_yday - 1
+    offset = when.utcoffset()
+    if offset is None:
+        message.naive = True
+    else:
+        message.utc_offset = offset.total_seconds()
+
+
+def decode_datetime(message):
+    tz = None
+    if not message.naive:
+        tz = timezone(timedelta(seconds=message.utc_offset))
+    return datetime(message.year, message.month, message.day, message.hour, message.minute, message.second,
+                    message.nanosecond // 1000, tzinfo=tz)
+
+
+def encode_timedelta(delta, message):
+    message.SetInParent()  # zero is still a value
+    message.days = delta.days
+    message.seconds = delta.seconds
+    message.nanoseconds = delta.microseconds * 1000
+
+
+def decode_timedelta(message):
+    return timedelta(days=message.days, seconds=message.seconds, microseconds=message.nanoseconds // 1000)
+
+
+def _encode_none(_, value):
+    value.none = True
+
+
+def _encode_bool(item, value):
+    value.bl = item
+
+
+def _encode_int(item, value):
+    if -(1 << 63) <= item < (1 << 63):
+        value.intgr = item
+    else:
+        _encode_yaml(item, value)
+
+
+def _encode_float(item, value):
+    value.flt_pt = item
+
+
+def _encode_str(item, value):
+    value.str = item
+
+
+def _encode_bytes(item, value):
+    value.byt = bytes(item)
+
+
+def _encode_uuid(item, value):
+    value.uuid = item.bytes
+
+
+def _encode_datetime(item, value):
+    encode_datetime(item, value.datetime)
+
+
+def _encode_timedelta(item, value):
+    encode_timedelta(item, value.timedelta)
+
+
+def _encode_decimal(item, value):
+    value.decimal = str(item)
+
+
+def _encode_sequence(item, value):
+    seq = value.seq
+    seq.SetInParent()
+    seq.mutable = isinstance(item, list)
+    for elt in item:
+        encode_value(elt, seq.items.add())
+
+
+def _encode_mapping(item, value):
+    mapping = value.map
+    mapping.SetInParent()
+    for key, val in item.items():
+        entry = mapping.entries.add()
+        encode_value(key, entry.key)
+        encode_value(val, entry.value)
+
+
+def _encode_configuration(item, value):
+    if item.proto_wire():
+        value.typed.type = item.__class__.__name__
+        value.typed.body = item.to_bytes()
+    else:
+        _encode_yaml(item, value)
+
+
+def _encode_yaml(item, value):
+    value.yaml = to_yaml_string(item)
+
+
+_encoders = {type(None): _encode_none, bool: _encode_bool, int: _encode_int, float: _encode_float,
+             str: _encode_str, bytes: _encode_bytes, bytearray: _encode_bytes, memoryview: _encode_bytes,
+             UUID: _encode_uuid, datetime: _encode_datetime, timedelta: _encode_timedelta,
+             Decimal: _encode_decimal, tuple: _encode_sequence, list: _encode_sequence, dict: _encode_mapping}
+_base_encoders = tuple(_encoders.items())  # for subclasses, in order
+
+
+def _find_encoder(item):
+    if isinstance(item, Configuration):
+        return _encode_configuration  # before Mapping, for configurations that are also mappings
+    for cls, encoder in _base_encoders:
+        if isinstance(item, cls):
+            return encoder
+    return _encode_yaml
+
+
+def encode_value(item, value):
+    """
+    Fill a Value message
+    Configurations with their own message type are embedded as such, other objects as YAML
+    :param item: object
+    :param value: Value
+    :return: None
+    """
+    encoder = _encoders.get(type(item))
+    if encoder is None:
+        encoder = _find_encoder(item)
+        if not isinstance(item, Configuration):
+            _encoders[type(item)] = encoder
+    encoder(item, value)
+
+
+def _decode_sequence(seq):
+    items = [decode_value(elt) for elt in seq.items]
+    if seq.mutable:
+        return items
+    return tuple(items)
+
+
+def _decode_mapping(mapping):
+    return {decode_value(entry.key): decode_value(entry.value) for entry in mapping.entries}
+
+
+def _decode_typed(typed):
+    cls = Configuration.wire_types.get(typed.type)
+    if cls is None:
+        raise WireFormatError('Unknown message type %s' % typed.type)
+    return cls.from_bytes(typed.body)
+
+
+_decoders = {'bl': bool, 'intgr': int, 'flt_pt': float, 'str': str, 'byt': bytes,
+             'uuid': decode_uuid, 'datetime': decode_datetime, 'timedelta': decode_timedelta, 'decimal': Decimal,
+             'seq': _decode_sequence, 'map': _decode_mapping, 'typed': _decode_typed, 'yaml': from_yaml_string}
+
+
+def decode_value(value):
+    field = value.WhichOneof('val')
+    if field is None or field == 'none':
+        return None
+    return _decoders[field](getattr(value, field))
+
+
+def to_wire(item):
+    """
+    Serialize an object (or tuple of objects) for transmission
+    :param item: object
+    :return: bytes
+    """
+    value = value_pb2.Value()
+    encode_value(item, value)
+    return value.SerializeToString()
+
+
+def from_wire(data):
+    """
+    Deserialize a transmitted object
+    :param data: bytes from to_wire(), or YAML text
+    :return: object
+    """
+    if isinstance(data, str):
+        return from_yaml_string(data)
+    try:
+        return decode_value(value_pb2.Value.FromString(bytes(data)))
+    except DecodeError as err:
+        raise WireFormatError(str(err))
+
+
+def from_payload(obj):
+    """
+    Message object as it was sent; Message decodes protobuf, but older peers send YAML text
+    :param obj: Message.obj
+    :return: object
+    """
+    if isinstance(obj, str):
+        return from_yaml_string(obj)
+    return obj
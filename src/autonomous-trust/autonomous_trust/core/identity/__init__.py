@@ -17,6 +17,12 @@
 from .identity import Identity
 from .peers import Peers
 from .group import Group
-from .idprocess import IdentityProcess
-from .sign import Signature
-from .encrypt import Encryptor
+from .sign import Signature, BatchVerifier, verifier
+from .encrypt import Encryptor, BoxCache, boxes
+
+
+def __getattr__(name):
+    if name == 'IdentityProcess':  # idprocess imports network, which imports this package for Identity and Group
+        from .idprocess import IdentityProcess
+        return IdentityProcess
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
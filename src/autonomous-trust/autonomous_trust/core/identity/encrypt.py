@@ -14,15 +14,79 @@
 #   limitations under the License.
 # ******************
 
-from nacl.public import PrivateKey, PublicKey
+import threading
+from collections import OrderedDict
+
+from nacl.public import Box, PrivateKey, PublicKey
 from nacl.encoding import HexEncoder
 
 from ..config.configuration import Configuration
 from ..protobuf.identity import identity_pb2
 
+
+class BoxCache(object):
+    """
+    Bounded LRU of precomputed shared keys, indexed by (own public key, peer public key)
+    Building a Box is a Curve25519 key agreement; encrypting with an existing Box is not
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._boxes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def get(self, mine, theirs):
+        """
+        Box for a key pair, built on first use
+        :param mine: Encryptor with a private key
+        :param theirs: peer Encryptor
+        :return: Box
+        """
+        key = bytes(mine.public), bytes(theirs.public)
+        with self._lock:
+            box = self._boxes.get(key)
+            if box is not None:
+                self.hits += 1
+                self._boxes.move_to_end(key)
+                return box
+            self.misses += 1
+        box = Box(mine.private, theirs.public)  # outside the lock, it is the expensive part
+        with self._lock:
+            self._boxes[key] = box
+            while len(self._boxes) > self.max_size:
+                self._boxes.popitem(last=False)
+        return box
+
+    def invalidate(self, encryptor=None):
+        """
+        Forget shared keys involving a (rotated or removed) key, or all of them
+        :param encryptor: Encryptor or None
+        :return: None
+        """
+        with self._lock:
+            if encryptor is None:
+                self._boxes.clear()
+                return
+            public = bytes(encryptor.public)
+            for key in [key for key in self._boxes if public in key]:
+                del self._boxes[key]
+
+    def to_tuple(self):
+        return self.hits, self.misses, len(self._boxes)
+
+
+boxes = BoxCache()
+
+
 class Encryptor(Configuration):
+    message_class = identity_pb2.Encryptor
+
     def __init__(self, hex_seed, public_only=True):
-        super().__init__(identity_pb2.Encryptor)
+        super().__init__()
         self.public_only = public_only
         if public_only:
             self.private = None
@@ -53,3 +117,11 @@ class Encryptor(Configuration):
 
     def serialize(self):  # WARNING: serialization of signature keys is insecure if physically breached
         return self.private.encode(encoder=HexEncoder)
+
+    def sync_to_message(self):
+        seeds = self.to_dict()
+        self.message.hex_seed = seeds['hex_seed']
+        self.message.public_only = seeds['public_only']
+
+    def sync_from_message(self):
+        self.__init__(self.message.hex_seed, self.message.public_only)
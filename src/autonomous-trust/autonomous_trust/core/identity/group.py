@@ -18,10 +18,8 @@ import random
 import time
 import uuid as uuid_mod
 
-from nacl.public import Box
-
 from ..config import InitializableConfig
-from .encrypt import Encryptor
+from .encrypt import Encryptor, boxes
 from ..protobuf.identity import identity_pb2
 
 
@@ -29,8 +27,10 @@ class Group(InitializableConfig):
     """
     Group identity details that can be saved to file or transmitted
     """
+    message_class = identity_pb2.Group
+
     def __init__(self, _uuid, _address_map, _nickname, _encryptor, _public_only=True):
-        super().__init__(identity_pb2.Group)
+        super().__init__()
         self._uuid = str(_uuid)
         self._address_map = _address_map
         self._nickname = _nickname
@@ -76,7 +76,7 @@ class Group(InitializableConfig):
             raise RuntimeError('Cannot encrypt a message for another group (you are not part of %s)' % self.nickname)
         if isinstance(msg, str):
             msg = msg.encode()
-        return Box(self.encryptor.private, whom.encryptor.public).encrypt(msg, nonce)
+        return boxes.get(self.encryptor, whom.encryptor).encrypt(msg, nonce)
 
     def decrypt(self, msg, whom, nonce=None):
         """
@@ -86,10 +86,24 @@ class Group(InitializableConfig):
         :param nonce: bytes
         :return: bytes
         """
-        return Box(self.encryptor.private, whom.encryptor.public).decrypt(msg, nonce)  # TODO decode?
+        return boxes.get(self.encryptor, whom.encryptor).decrypt(msg, nonce)  # TODO decode?
 
     def publish(self):
-        return Group(self.uuid, self.addresses, self.nickname, Encryptor(self.encryptor.publish(), True), True)
+        return Group(self.uuid, dict(self._address_map), self.nickname, Encryptor(self.encryptor.publish(), True), True)
+
+    def sync_to_message(self):
+        msg = self.message
+        msg.uuid = uuid_mod.UUID(self.uuid).bytes
+        for uuid, address in self._address_map.items():
+            msg.address_map[str(uuid)] = address
+        msg.nickname = self.nickname
+        msg.public_only = self._public_only
+        msg.encryptor.CopyFrom(self.encryptor.to_message())
+
+    def sync_from_message(self):
+        msg = self.message
+        self.__init__(uuid_mod.UUID(bytes=msg.uuid), dict(msg.address_map), msg.nickname,
+                      Encryptor.from_message(msg.encryptor), msg.public_only)
 
     @staticmethod
     def initialize(address_map, our_nickname):
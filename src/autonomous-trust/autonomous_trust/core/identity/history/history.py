@@ -19,7 +19,9 @@ from uuid import UUID
 from ...algorithms.agreement import VoterTracker
 from ...structures.merkle import MerkleTree, SimplestBlob
 from ...structures.dag import StepDAG, LinkedStep
-from ...config import Configuration, from_yaml_string
+from ...config import Configuration, to_wire, from_wire
+from ...config.wire import encode_value, decode_value
+from ...protobuf.identity import history_pb2
 from ...processes import ProcessLogger
 from ...system import encoding
 from ..identity import Identity
@@ -48,6 +50,8 @@ class IdentityObj(SimplestBlob, Configuration):
     """
     Identity encapsulation for transmission
     """
+    message_class = history_pb2.IdBlob
+
     def __init__(self, identity, originator: UUID):
         super().__init__(originator, identity.uuid)
         self.identity = identity
@@ -63,6 +67,13 @@ class IdentityObj(SimplestBlob, Configuration):
     def to_dict(self):
         return dict(identity=self.identity, originator=self.originator)
 
+    def sync_to_message(self):
+        encode_value(self.originator, self.message.originator)
+        self.message.identity.CopyFrom(self.identity.to_message())
+
+    def sync_from_message(self):
+        self.__init__(Identity.from_message(self.message.identity), decode_value(self.message.originator))
+
 
 class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
     """
@@ -70,6 +81,8 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
     A StepDAG of MerkleTree root_hash history, the Merkle leaf-blobs are Identities or Groups
     Essentially an efficient, long-memory identity recognizer
     """
+    log_name = 'identity-history.log'  # StepLog, in the data directory
+
     def __init__(self, myself, peers, log_queue, timeout=0, blacklist=None):
         StepDAG.__init__(self)
         VoterTracker.__init__(self, myself)
@@ -85,12 +98,15 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
         self.add_step(LinkedStep(self._merkle.root_digest))  # history tracking
 
     def to_dict(self):
+        if self.log is not None:  # steps are already on disk
+            return {'blacklist': self.blacklist}
         return {'step_dag': self.recite(), 'blacklist': self.blacklist} #, 'merkletree': self._merkle}
 
     def populate(self, dictionary):
         self.blacklist = dictionary['blacklist']
         #self._merkle = dictionary['merkle_tree']
-        self.merge(self.ingest_branch(dictionary['step_dag']))
+        if 'step_dag' in dictionary:  # saved before the StepLog
+            self.merge(self.ingest_branch(dictionary['step_dag']))
 
     @property
     def timeout(self):
@@ -98,7 +114,7 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
 
     def insert_peer(self, who, level=None):
         # FIXME confirm eligibility i.e. uuid, fullname, signature all unique
-        if who not in self._peers.all:
+        if who not in self._peers:
             self._merkle.insert(IdentityObj(who, self._merkle.root_digest))
             self.add_step(LinkedStep(self._merkle.root_digest))
         self._peers.add(who, level)
@@ -126,7 +142,7 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
         return True
         # FIXME better validation
         flag = True
-        blobs = self.__branch_lists[branch]  # root to head
+        blobs = self.recite(branch)[::-1]  # root to head
         for i in range(1, len(blobs)):
             if not blobs[i].validate():
                 flag = False
@@ -158,9 +174,7 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
         Transmit main branch to another
         :return: tuple of steps list, signature
         """
-        steps = self.recite()
-        # FIXME to serialization
-        steps_msg = b''
+        steps_msg = to_wire(self.recite())
         sig = self.myself.sign(steps_msg)  # noqa
         return steps_msg, sig
 
@@ -170,10 +184,10 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
         :return: list of steps
         """
         if sig is None:  # FIXME remove this, need sig
-            steps = from_yaml_string(steps_msg)
+            steps = from_wire(steps_msg)
             return steps
         if self.myself.verify(steps_msg, sig):
-            steps = from_yaml_string(steps_msg)
+            steps = from_wire(steps_msg)
             return steps
         return None
 
@@ -186,7 +200,7 @@ class IdentityHistory(StepDAG, VoterTracker):  # FIXME config repr
             self.logger.error(f'Duplicate of existing peer.')
             return False
         peer = self._peers.find_by_uuid(proof.uuid)
-        if peer is not None and proof != peer.verify(sig):
+        if peer is not None and not self.myself.verify_votes([(peer, proof, sig)])[0]:
             self.logger.error(f'Invalid proof signature.')
             return False
         # previous_hash = self.main.root.digest
@@ -18,14 +18,13 @@ import random
 import time
 import uuid as uuid_mod
 
-from nacl.public import Box
 from nacl.encoding import HexEncoder
 
 from ..config import Configuration, InitializableConfig
 from ..system import encoding, agreement_impl
 from ..algorithms.agreement import AgreementVoter
-from .sign import Signature
-from .encrypt import Encryptor
+from .sign import Signature, verifier
+from .encrypt import Encryptor, boxes
 from ..protobuf.identity import identity_pb2
 
 class Identity(InitializableConfig, AgreementVoter):
@@ -33,10 +32,11 @@ class Identity(InitializableConfig, AgreementVoter):
     Identity details that can be saved to file or transmitted
     """
     enc = encoding
+    message_class = identity_pb2.Identity
 
     def __init__(self, _uuid, address, _fullname, _nickname, _signature, _encryptor, petname='',
                  _public_only=True, _rank=0, _block_impl=agreement_impl):
-        Configuration.__init__(self, identity_pb2.Identity)
+        Configuration.__init__(self)
         AgreementVoter.__init__(self, str(_uuid), _rank)
         self.address = address  # corresponds to one address in Network config
         self._fullname = _fullname
@@ -105,6 +105,35 @@ class Identity(InitializableConfig, AgreementVoter):
             return self.signature.public.verify(msg, encoder=HexEncoder)
         return self.signature.public.verify(msg, signature, encoder=HexEncoder)
 
+    def verify_votes(self, votes):
+        """
+        Check a round of votes together; each signed message must be the proof, signed by the voter it names
+        :param votes: list of (Identity, AgreementProof, (hex message, hex signature))
+        :return: list of bool, in vote order
+        """
+        valid = [False] * len(votes)
+        jobs = []
+        indices = []
+        for idx, (voter, proof, sig) in enumerate(votes):
+            try:
+                message = HexEncoder.decode(sig[0])
+                if not self._is_proof(message, proof):
+                    continue
+                jobs.append((voter.signature.public, message, HexEncoder.decode(sig[1])))
+                indices.append(idx)
+            except (AttributeError, IndexError, TypeError, ValueError):
+                continue  # malformed, so not validly signed
+        for idx, signed in zip(indices, verifier.verify_batch(jobs)):
+            valid[idx] = signed
+        return valid
+
+    def _is_proof(self, message, proof):
+        try:
+            signed = Configuration.from_string(message.decode(self.enc))
+        except Exception:  # noqa, not a serialized Configuration
+            return False
+        return type(signed) is type(proof) and signed.to_dict() == proof.to_dict()
+
     def encrypt(self, msg, whom, nonce=None):
         """
         Encrypt my own message
@@ -117,7 +146,7 @@ class Identity(InitializableConfig, AgreementVoter):
             raise RuntimeError('Cannot encrypt a message with another identity (%s is not you)' % self.nickname)
         if isinstance(msg, str):
             msg = msg.encode()
-        return Box(self.encryptor.private, whom.encryptor.public).encrypt(msg, nonce)
+        return boxes.get(self.encryptor, whom.encryptor).encrypt(msg, nonce)
 
     def decrypt(self, msg, whom, nonce=None):
         """
@@ -127,13 +156,35 @@ class Identity(InitializableConfig, AgreementVoter):
         :param nonce: bytes
         :return: bytes
         """
-        return Box(self.encryptor.private, whom.encryptor.public).decrypt(msg, nonce)  # TODO decode?
+        return boxes.get(self.encryptor, whom.encryptor).decrypt(msg, nonce)  # TODO decode?
 
     def publish(self):
         return Identity(self.uuid, self.address, self.fullname, self.nickname,
                         Signature(self.signature.publish(), True), Encryptor(self.encryptor.publish(), True),
                         self.petname, True)
 
+    def sync_to_message(self):
+        msg = self.message
+        msg.uuid = uuid_mod.UUID(self.uuid).bytes
+        msg.address = self.address
+        msg.fullname = self.fullname
+        msg.nickname = self.nickname
+        msg.petname = self.petname
+        msg.public_only = self._public_only
+        msg.rank = self.rank
+        msg.block_impl = self.block_impl
+        if self.signature is not None:
+            msg.signature.CopyFrom(self.signature.to_message())
+        if self.encryptor is not None:
+            msg.encryptor.CopyFrom(self.encryptor.to_message())
+
+    def sync_from_message(self):
+        msg = self.message
+        signature = Signature.from_message(msg.signature) if msg.HasField('signature') else None
+        encryptor = Encryptor.from_message(msg.encryptor) if msg.HasField('encryptor') else None
+        self.__init__(uuid_mod.UUID(bytes=msg.uuid), msg.address, msg.fullname, msg.nickname, signature, encryptor,
+                      msg.petname, msg.public_only, msg.rank, msg.block_impl)
+
     @staticmethod
     def initialize(my_name, my_nickname, my_address):
         if '/' in my_address:
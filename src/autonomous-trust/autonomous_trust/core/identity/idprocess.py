@@ -21,22 +21,20 @@ from queue import Empty, Full
 import threading
 from typing import Optional, Union
 
-from nacl.exceptions import BadSignatureError
-from nacl.signing import SignedMessage
-
 from . import Peers
 from .group import Group
 from .history.history import IdentityHistory
 from ..algorithms.agreement import AgreementProof
 from ..algorithms.impl import AgreementImpl
 from ..capabilities import PeerCapabilities
-from ..config import Configuration, to_yaml_string, from_yaml_string, names
+from ..config import Configuration, to_yaml_string, from_yaml_string, from_payload, names
 from ..processes import Process, ProcMeta
 from ..network import Message, Network
 from .history import IdentityByWork, IdentityByStake, IdentityByAuthority
 from .history import IdentityObj
 from .protocol import IdentityProtocol
 from ..structures.dag import LinkedStep
+from ..structures.steplog import StepLog
 from ..system import CfgIds, encoding, PackageHash, now
 
 
@@ -160,9 +158,9 @@ class IdentityProcess(Process, metaclass=ProcMeta,
         try:
             self.logger.debug('Announce myself')
             # to self.welcoming_committee()
-            msg_str = to_yaml_string((self.identity.publish(), self.package_hash, self.capabilities.to_list()))
+            msg_obj = self.identity.publish(), self.package_hash, self.capabilities.to_list()
             message = Message(self.name, IdentityProtocol.announce,
-                              msg_str, to_whom=Network.broadcast, encrypt=False)
+                              msg_obj, to_whom=Network.broadcast, encrypt=False)
             queues[CfgIds.network].put(message, block=True, timeout=self.q_cadence)
         except Full:
             self.logger.error('announce_identity: Network queue full')
@@ -204,8 +202,8 @@ class IdentityProcess(Process, metaclass=ProcMeta,
                     # FIXME dag has digests, not peer data, need peers - use history to verify
 
                     self.logger.debug('Diff %s' % diff)  # FIXME remove
-                    msg_str = to_yaml_string(diff)  # to self.handle_history_diff()
-                    message = Message(self.name, IdentityProtocol.diff, msg_str, to_whom=self.group)
+                    # to self.handle_history_diff()
+                    message = Message(self.name, IdentityProtocol.diff, diff, to_whom=self.group)
                     self.logger.debug('Send history diff')
                     queues[CfgIds.network].put(message, block=True, timeout=self.q_cadence)
                 else:
@@ -242,7 +240,7 @@ class IdentityProcess(Process, metaclass=ProcMeta,
         """
         if message.function == IdentityProtocol.history:
             self.logger.debug('Received existing history')
-            hist_tpl = from_yaml_string(message.obj)  # from self._peer_accepted()
+            hist_tpl = from_payload(message.obj)  # from self._peer_accepted()
             self.histories.append(hist_tpl)  # see choose_group
             if not self.choosing:
                 threading.Thread(target=self.choose_group, args=(queues,), daemon=True).start()
@@ -259,16 +257,8 @@ class IdentityProcess(Process, metaclass=ProcMeta,
         if self.phase != 3:
             return False
         if message.function == IdentityProtocol.vote:
-            obj = message.obj
-            if isinstance(obj, str):
-                obj = from_yaml_string(obj)  # from self.vote_response()
-            blob, proof, (msg, sig) = obj
-            sig_msg = SignedMessage(sig + msg)
-            try:
-                message.from_whom.verify(sig_msg)
-                self._history.verify(blob, proof, sig_msg)
-            except BadSignatureError:
-                self.logger.error('Vote had a bad signature')
+            blob, proof, sig = from_payload(message.obj)  # from self.vote_response()
+            self._history.verify(blob, proof, tuple(sig))  # signatures are checked per round, in finalize
             return True
         return False
 
@@ -310,13 +300,13 @@ class IdentityProcess(Process, metaclass=ProcMeta,
             self._add_peer(queues, blob.identity, amnesia)
 
         # send my identity in the open to enable encryption;  to self.handle_acceptance()
-        msg_str = to_yaml_string((self.identity.publish(), self.package_hash, self.capabilities.to_list()))
-        message = Message(self.name, IdentityProtocol.accept, msg_str, to_whom=blob.identity, encrypt=False)
+        msg_obj = self.identity.publish(), self.package_hash, self.capabilities.to_list()
+        message = Message(self.name, IdentityProtocol.accept, msg_obj, to_whom=blob.identity, encrypt=False)
         queues[CfgIds.network].put(message, block=True, timeout=self.q_cadence)
 
         # now send encrypted history (peer identities);  to self.receive_history()  # FIXME this should contain all peer identities
-        msg_str = to_yaml_string((self.group, self._history.recite()))
-        message = Message(self.name, IdentityProtocol.history, msg_str, to_whom=blob.identity)
+        msg_obj = self.group, self._history.recite()
+        message = Message(self.name, IdentityProtocol.history, msg_obj, to_whom=blob.identity)
         self.logger.debug('Send full history')
         queues[CfgIds.network].put(message, block=True, timeout=self.q_cadence)
 
@@ -331,7 +321,7 @@ class IdentityProcess(Process, metaclass=ProcMeta,
             return False
         if message.function == IdentityProtocol.announce:
             try:
-                new_id, ph, caps = from_yaml_string(message.obj)  # from self.announce_identity()
+                new_id, ph, caps = from_payload(message.obj)  # from self.announce_identity()
                 if new_id == self.identity:
                     self.logger.debug('Should not have received my own announcement')
                     return
@@ -352,9 +342,9 @@ class IdentityProcess(Process, metaclass=ProcMeta,
                 # time.sleep(self.cadence) # FIXME invalid
                 threading.Thread(target=self._vote_collection,
                                  args=(queues, id_obj), daemon=True).start()
-                msg_str = id_obj.to_string()  # to self.handle_vote_on_peer()
+                # to self.handle_vote_on_peer()
                 # FIXME validate
-                message = Message(self.name, IdentityProtocol.propose, msg_str, to_whom=self.group)
+                message = Message(self.name, IdentityProtocol.propose, id_obj, to_whom=self.group)
                 queues[CfgIds.network].put(message, block=True, timeout=self.q_cadence)
             except Full:
                 self.logger.error('welcoming_committee: Network queue full')
@@ -389,7 +379,7 @@ class IdentityProcess(Process, metaclass=ProcMeta,
 
     def _process_id(self, blob):
         try:
-            for peer in self.peers.all:
+            for peer in list(self.peers.all):  # other threads may add peers
                 if blob.identity.uuid == peer.uuid or \
                         blob.identity.signature == peer.signature or \
                         blob.identity.encryptor == peer.signature:
@@ -441,8 +431,8 @@ class IdentityProcess(Process, metaclass=ProcMeta,
             if vote[0].uuid == vote[1].uuid:
                 return  # no voting for yourself
             # FIXME handle if I proposed the vote
-            msg_str = to_yaml_string(vote)  # to self.count_vote()
-            message = Message(self.name, IdentityProtocol.vote, msg_str, to_whom=self.group)
+            # to self.count_vote()
+            message = Message(self.name, IdentityProtocol.vote, vote, to_whom=self.group)
             self.logger.debug("Send vote")
             queues[CfgIds.network].put(message, block=True, timeout=self.q_cadence)
         except Full:
@@ -453,7 +443,7 @@ class IdentityProcess(Process, metaclass=ProcMeta,
             return False
         if message.function == IdentityProtocol.accept:
             self.logger.debug('Received peer acceptance')
-            ident, pkh, caps = from_yaml_string(message.obj)  # from self._peer_accepted()
+            ident, pkh, caps = from_payload(message.obj)  # from self._peer_accepted()
             if pkh != self.package_hash:
                 self.logger.error("Counterfeit 'peer'")
                 return True
@@ -492,7 +482,7 @@ class IdentityProcess(Process, metaclass=ProcMeta,
             return False
         if message.function == IdentityProtocol.diff:
             self.logger.debug('Received history diff')
-            steps = from_yaml_string(message.obj)  # from self.choose_group()
+            steps = from_payload(message.obj)  # from self.choose_group()
             self._record_group(queues)
             branch = self._history.ingest_branch(steps, message.from_whom.nickname)
             # FIXME validate
@@ -522,6 +512,29 @@ class IdentityProcess(Process, metaclass=ProcMeta,
             return True
         return False
 
+    def handle_message(self, queues, message):
+        """
+        Keep messages that the handlers refuse for now (e.g. before their phase), to retry on later loops
+        :param queues: IPC queues
+        :param message: from this process's queue
+        :return: None
+        """
+        if not self.protocol.run_message_handlers(queues, message):
+            self.messages.append(message)
+
+    def retry_messages(self, queues):
+        """
+        Run the handlers again on kept messages, in order of arrival
+        :param queues: IPC queues
+        :return: None
+        """
+        untouched = []
+        while len(self.messages) > 0:
+            message = self.messages.pop(0)
+            if not self.protocol.run_message_handlers(queues, message):
+                untouched.append(message)
+        self.messages += untouched
+
     def process(self, queues, signal):
         """
         Identity/Peer processing main loop
@@ -530,6 +543,7 @@ class IdentityProcess(Process, metaclass=ProcMeta,
         :return: None
         """
         self.lock = threading.Lock()  # initialize here to get past pickling
+        self._history.attach(StepLog(os.path.join(Configuration.get_data_dir(), IdentityHistory.log_name)))
         phase = self.phase
         self.logger.debug('Phase %s' % self.phase)
         self.acquire_capabilities(queues)
@@ -543,19 +557,8 @@ class IdentityProcess(Process, metaclass=ProcMeta,
                     self.logger.debug('Phase %s' % self.phase)
                     phase = self.phase
                 self.vote_response(queues)
-
-                untouched = []
-                while len(self.messages) > 0:
-                    message = self.messages.pop(0)
-                    if not self.protocol.run_message_handlers(queues, message):
-                        untouched.append(message)
-                try:
-                    message = queues[self.name].get(block=True, timeout=self.q_cadence)
-                    if message and not self.protocol.run_message_handlers(queues, message):
-                        untouched.append(message)
-                except Empty:
-                    pass
-                self.messages += untouched
-                self.sleep_until(self.cadence)
+                self.retry_messages(queues)
+                self.dispatch_messages(queues)
             except Exception as err:
                 self.report_exception(err, 'process')
+        self._history.log.close()
@@ -14,7 +14,12 @@
 #   limitations under the License.
 # ******************
 
+import threading
+
 from ..config.configuration import Configuration
+from ..protobuf.identity import peers_pb2
+from .identity import Identity
+from .encrypt import boxes
 
 
 class Peers(Configuration):
@@ -23,28 +28,100 @@ class Peers(Configuration):
     The level this node is in is always the middle (all group messages are at this level,
     otherwise messaging is point-to-point). The number of levels is therefore always odd.
     Node valuation is a separate trust hierarchy that implements automatic de-prioritization and eventual disconnection.
+    Lookups by index (nickname), uuid and address are constant time; indexes change together, under a lock.
     """
     LEVELS = 3
     VALUES = 10
+    message_class = peers_pb2.Peers
 
     def __init__(self, hierarchy=None, valuation=None):
-        #super().__init__(peers_pb2.Peers)
         self.hierarchy = hierarchy
         if hierarchy is None:
             self.hierarchy = [dict({}) for _ in range(self.LEVELS)]
         self.valuation = valuation
         if valuation is None:
             self.valuation = [dict({}) for _ in range(self.VALUES)]
-        self.all = []
+        self._lock = threading.RLock()
+        self._reindex()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._by_index)
+
+    def __contains__(self, who):
+        return self._by_index.get(self._index_by(who)) == who
+
+    @property
+    def all(self):
+        """Every peer, as a live read-only view"""
+        return self._by_index.values()
+
+    def _reindex(self):
         self.listing = {}
-        for idx in range(len(self.hierarchy)):
-            for peer in self.hierarchy[idx].values():
-                self.listing[peer.address] = peer
-                self.all.append(peer)
+        self._by_index = {}
+        self._by_uuid = {}
+        self._positions = {}  # index -> [hierarchy level, valuation level]
+        for level in range(len(self.hierarchy)):
+            for index, peer in self.hierarchy[level].items():
+                self._enter(index, peer)
+                self._positions[index] = [level, None]
+        for value in range(len(self.valuation)):
+            for index in self.valuation[value]:
+                if index in self._positions:
+                    self._positions[index][1] = value
+
+    def _enter(self, index, who):
+        self._by_index[index] = who
+        self._by_uuid[str(who.uuid)] = who
+        self.listing[self._address(who.address)] = who
+
+    def _forget(self, index):
+        who = self._by_index.pop(index)
+        level, value = self._positions.pop(index)
+        if level is not None:
+            del self.hierarchy[level][index]
+        if value is not None:
+            del self.valuation[value][index]
+        if self._by_uuid.get(str(who.uuid)) is who:
+            del self._by_uuid[str(who.uuid)]
+        address = self._address(who.address)
+        if self.listing.get(address) is who:
+            del self.listing[address]
+        return who, level, value
 
     def to_dict(self):
         return dict(hierarchy=self.hierarchy, valuation=self.valuation)
 
+    def sync_to_message(self):
+        for level in self.hierarchy:
+            msg_level = self.message.hierarchy.add()
+            for peer in level.values():
+                msg_level.peers.add().CopyFrom(peer.to_message())
+        for level in self.valuation:
+            self.message.valuation.add().index.extend(level.keys())
+
+    def sync_from_message(self):
+        hierarchy = []
+        indexed = {}
+        for msg_level in self.message.hierarchy:
+            level = {}
+            for msg_peer in msg_level.peers:
+                peer = Identity.from_message(msg_peer)
+                level[self._index_by(peer)] = peer
+            indexed.update(level)
+            hierarchy.append(level)
+        valuation = [{index: indexed[index] for index in ranking.index if index in indexed}
+                     for ranking in self.message.valuation]
+        self.__init__(hierarchy, valuation)
+
     @property
     def mid_level(self):
         return self.LEVELS // 2
@@ -57,39 +134,34 @@ class Peers(Configuration):
     def _index_by(who):
         return who.nickname
 
+    @staticmethod
+    def _address(address):
+        if '/' in address:
+            return address.split('/')[0]
+        return address
+
     def _find(self, index):
-        for idx in range(len(self.hierarchy)):
-            if index in self.hierarchy[idx]:
-                return idx
-        return
+        position = self._positions.get(index)
+        if position is not None:
+            return position[0]
 
     def _find_v(self, index):
-        for idx in range(len(self.valuation)):
-            if index in self.valuation[idx]:
-                return idx
-        return
+        position = self._positions.get(index)
+        if position is not None:
+            return position[1]
 
     def find_by_index(self, index):
-        idx = self._find(index)
-        if idx is not None:
-            return self.hierarchy[idx][index]
+        return self._by_index.get(index)
 
     def find_by_uuid(self, uuid):
-        ids = {p.uuid: p for p in self.listing.values()}
-        if uuid in ids:
-            return ids[uuid]
-        return None
+        return self._by_uuid.get(str(uuid))
 
     def find_by_address(self, address):
-        if '/' in address:
-            address = address.split('/')[0]
-        if address in self.listing:
-            return self.listing[address]
-        return None
+        return self.listing.get(self._address(address))
 
     def find_top_n(self, n):
         if n >= len(self.all):
-            return self.all
+            return list(self.all)
         p_list = []
         for idx in range(len(self.valuation)):
             for peer in self.valuation[idx].values():
@@ -98,52 +170,78 @@ class Peers(Configuration):
                 p_list.append(peer)
             if len(p_list) >= n:
                 break
+        return p_list
 
     def add(self, who, level=None):
+        """
+        Add a peer at the bottom of the valuation, or replace one (e.g. new address or key) keeping its valuation
+        :param who: Identity
+        :param level: hierarchy level, default mid_level
+        :return: None
+        """
         if level is None:
             level = self.mid_level
-        if who.address not in self.listing:
-            self.listing[who.address] = who
-        if who not in self.all:
-            self.all.append(who)
         index = self._index_by(who)
-        self.hierarchy[level][index] = who
-        self.valuation[-1][index] = who
+        value = len(self.valuation) - 1
+        with self._lock:
+            if index in self._by_index:
+                previous, _, previous_value = self._forget(index)
+                if previous.encryptor != who.encryptor:
+                    boxes.invalidate(previous.encryptor)  # key rotation
+                if previous_value is not None:
+                    value = previous_value
+            self._enter(index, who)
+            self._positions[index] = [level, value]
+            self.hierarchy[level][index] = who
+            self.valuation[value][index] = who
 
     def delete(self, who):
         index = self._index_by(who)
-        idx = self._find(index)
-        v_idx = self._find_v(index)
-        if idx is not None:
-            del self.hierarchy[idx][index]
-            del self.valuation[v_idx][index]
+        with self._lock:
+            if index in self._by_index:
+                self._forget(index)
+                boxes.invalidate(who.encryptor)
 
     def move(self, who, level):
-        if who in self.all:
-            index = self._index_by(who)
-            idx = self._find_v(index)
-            if idx is not None and idx > 0:
-                self.hierarchy[level][index] = who
-                del self.hierarchy[idx][index]
+        index = self._index_by(who)
+        with self._lock:
+            if who in self:
+                position = self._positions[index]
+                if position[0] is not None and position[0] != level:
+                    del self.hierarchy[position[0]][index]
+                self.hierarchy[level][index] = self._by_index[index]
+                position[0] = level
+
+    def _revalue(self, index, value):
+        position = self._positions[index]
+        if position[1] is not None:
+            del self.valuation[position[1]][index]
+        self.valuation[value][index] = self._by_index[index]
+        position[1] = value
 
     def promote(self, who):
-        if who in self.all:
-            index = self._index_by(who)
-            idx = self._find_v(index)
-            if idx is not None:
-                if idx > 0:
-                    self.valuation[idx - 1][index] = who
-                    del self.valuation[idx][index]
-            else:
-                self.valuation[-1][index] = who
+        index = self._index_by(who)
+        with self._lock:
+            if who in self:
+                idx = self._find_v(index)
+                if idx is None:
+                    self._revalue(index, len(self.valuation) - 1)
+                elif idx > 0:
+                    self._revalue(index, idx - 1)
 
     def demote(self, who):
+        """
+        Lower a peer's valuation; demoting from the bottom disconnects it
+        :param who: Identity
+        :return: None
+        """
         index = self._index_by(who)
-        idx = self._find_v(index)
-        if idx is not None:
-            if idx < len(self.hierarchy):
-                self.valuation[idx + 1][index] = who
+        with self._lock:
+            idx = self._find_v(index)
+            if idx is None:
+                return
+            if idx < len(self.valuation) - 1:
+                self._revalue(index, idx + 1)
             else:
-                del self.listing[who.address]
-                self.all.remove(who)
-            del self.valuation[idx][index]
+                self._forget(index)
+                boxes.invalidate(who.encryptor)
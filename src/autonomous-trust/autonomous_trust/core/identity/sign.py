@@ -14,6 +14,12 @@
 #   limitations under the License.
 # ******************
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from nacl.signing import SigningKey, VerifyKey
 from nacl.encoding import HexEncoder
 
@@ -21,8 +27,10 @@ from ..config.configuration import Configuration
 from ..protobuf.identity import identity_pb2
 
 class Signature(Configuration):
+    message_class = identity_pb2.Signature
+
     def __init__(self, hex_seed, public_only=True):
-        super().__init__(identity_pb2.Signature)
+        super().__init__()
         self.public_only = public_only
         if public_only:
             self.private = None
@@ -53,3 +61,113 @@ class Signature(Configuration):
 
     def serialize(self):  # WARNING: serialization of signature keys is insecure if physically breached
         return self.private.encode(encoder=HexEncoder)
+
+    def sync_to_message(self):
+        seeds = self.to_dict()
+        self.message.hex_seed = seeds['hex_seed']
+        self.message.public_only = seeds['public_only']
+
+    def sync_from_message(self):
+        self.__init__(self.message.hex_seed, self.message.public_only)
+
+
+class BatchVerifier(object):
+    """
+    Verifies a round of signatures at once on worker threads (libsodium releases the GIL)
+    Successful verifications are remembered in a bounded LRU indexed by (verify key, digest of signed message)
+    """
+    def __init__(self, workers=None, max_size=4096):
+        self.workers = workers
+        if workers is None:
+            self.workers = min(4, os.cpu_count() or 1)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._verified)
+
+    @staticmethod
+    def _key(key: VerifyKey, message: bytes, signature: bytes):
+        return bytes(key), hashlib.blake2b(signature + message, digest_size=32).digest()
+
+    @staticmethod
+    def _check(key: VerifyKey, message: bytes, signature: bytes) -> bool:
+        try:
+            key.verify(message, signature)
+            return True
+        except Exception:  # BadSignatureError, or a malformed signature
+            return False
+
+    def _check_chunk(self, chunk):
+        return [self._check(*job) for job in chunk]
+
+    def _executor(self):
+        if self._pid != os.getpid():  # worker threads do not survive a fork
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='verify')
+            self._pid = os.getpid()
+        return self._pool
+
+    def verify(self, key: VerifyKey, message: bytes, signature: bytes) -> bool:
+        """
+        Verify a single raw signature
+        :param key: VerifyKey
+        :param message: bytes
+        :param signature: bytes (64)
+        :return: bool
+        """
+        return self.verify_batch([(key, message, signature)])[0]
+
+    def verify_batch(self, jobs: list[tuple[VerifyKey, bytes, bytes]]) -> list[bool]:
+        """
+        Verify many raw signatures, in parallel for any not seen before
+        :param jobs: list of (VerifyKey, message, signature)
+        :return: list of bool, in job order
+        """
+        results = [False] * len(jobs)
+        pending = []
+        with self._lock:
+            for idx, job in enumerate(jobs):
+                key = self._key(*job)
+                if key in self._verified:
+                    self.hits += 1
+                    self._verified.move_to_end(key)
+                    results[idx] = True
+                else:
+                    self.misses += 1
+                    pending.append((idx, key, job))
+        if not pending:
+            return results
+        if self.workers < 2 or len(pending) < 2:
+            checked = self._check_chunk([job for _, _, job in pending])
+        else:
+            chunks = [[job for _, _, job in pending[start::self.workers]] for start in range(self.workers)]
+            checked = [None] * len(pending)
+            for start, chunk in enumerate(self._executor().map(self._check_chunk, chunks)):
+                checked[start::self.workers] = chunk
+        with self._lock:
+            for (idx, key, _), valid in zip(pending, checked):
+                results[idx] = valid
+                if valid:
+                    self._verified[key] = None
+            while len(self._verified) > self.max_size:
+                self._verified.popitem(last=False)
+        return results
+
+    def clear(self):
+        """
+        Forget all remembered verifications, e.g. after a key is revoked
+        :return: None
+        """
+        with self._lock:
+            self._verified.clear()
+
+    def to_tuple(self):
+        return self.hits, self.misses, len(self._verified)
+
+
+verifier = BatchVerifier()
@@ -0,0 +1,248 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import threading
+import time
+from contextlib import contextmanager
+from bisect import bisect_left
+from typing import Any
+
+Snapshot = dict[str, tuple[str, Any]]  # metric name -> (kind, sample)
+
+
+class Metrics(object):
+    """Message functions for the main process's aggregate metrics"""
+    request = 'metrics_req'  # return_to gets a Message(return_to, response, {source: Snapshot})
+    response = 'metrics_resp'
+    namespace = 'autonomous_trust'  # Prometheus metric name prefix
+
+
+class Counter(object):
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def sample(self):
+        return self.value
+
+
+class Gauge(object):
+    """Latest value, and the peak seen"""
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+        self.peak = 0
+
+    def set(self, value):
+        self.value = value
+        if value > self.peak:
+            self.peak = value
+
+    def sample(self):
+        return self.value, self.peak
+
+
+class LatencyHistogram(object):
+    """Counts of durations, in buckets bounded by seconds"""
+    kind = 'histogram'
+    bounds = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.
+
+    def clear(self):
+        for idx in range(len(self.counts)):
+            self.counts[idx] = 0
+        self.total = 0.
+
+    def add(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+
+    def merge(self, other):
+        for idx, count in enumerate(other.counts):
+            self.counts[idx] += count
+        self.total += other.total
+
+    def to_tuple(self):
+        return tuple(self.counts)
+
+    def sample(self):
+        return tuple(self.counts), self.total
+
+
+class MetricsRegistry(object):
+    """
+    One process's metrics, by name
+    Not locked: create metrics up front, then give each a single writer thread. Sampling only reads.
+    """
+    def __init__(self):
+        self.metrics = {}
+
+    def _get(self, name, metric_type):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = metric_type()
+        return metric
+
+    def counter(self, name: str) -> Counter:
+        return self._get(name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        return self._get(name, Gauge)
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        return self._get(name, LatencyHistogram)
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Add the duration of a with-block to a histogram
+        :param name: histogram name
+        """
+        histogram = self.histogram(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.add(time.perf_counter() - start)
+
+    def snapshot(self) -> Snapshot:
+        return {name: (metric.kind, metric.sample()) for name, metric in list(self.metrics.items())}
+
+
+class MetricsReport(object):
+    """A process's metrics snapshot, on its way to the main process"""
+    def __init__(self, source: str, snapshot: Snapshot):
+        self.source = source
+        self.snapshot = snapshot
+
+
+class MetricsCollector(object):
+    """
+    Latest snapshot from every process, kept by the main process
+    Reports replace earlier ones, since each holds running totals. Registries of the main process itself
+    are attached instead, and sampled on demand.
+    """
+    def __init__(self):
+        self.reports: dict[str, Snapshot] = {}
+        self.registries: dict[str, MetricsRegistry] = {}
+        self._lock = threading.Lock()  # for HTTP server threads
+
+    def attach(self, source: str, registry: MetricsRegistry):
+        self.registries[source] = registry
+
+    def update(self, report: MetricsReport):
+        with self._lock:
+            self.reports[report.source] = report.snapshot
+
+    def snapshot(self) -> dict[str, Snapshot]:
+        with self._lock:
+            snapshots = dict(self.reports)
+        for source, registry in list(self.registries.items()):
+            snapshots[source] = registry.snapshot()
+        return snapshots
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus text exposition format, with the process name as a label
+        :return: str
+        """
+        families: dict[str, tuple[str, list[str]]] = {}
+
+        def add(name, kind, labels, value):
+            families.setdefault(name, (kind, []))[1].append('%s{%s} %s' % (name, labels, value))
+
+        for source, snapshot in sorted(self.snapshot().items()):
+            label = 'process="%s"' % source
+            for name, (kind, sample) in sorted(snapshot.items()):
+                name = '%s_%s' % (Metrics.namespace, name)
+                if kind == Counter.kind:
+                    add(name + '_total', kind, label, sample)
+                elif kind == Gauge.kind:
+                    add(name, kind, label, sample[0])
+                    add(name + '_peak', kind, label, sample[1])
+                else:
+                    counts, total = sample
+                    cumulative = 0
+                    for bound, count in zip(LatencyHistogram.bounds + (float('inf'),), counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        add(name + '_bucket', kind, '%s,le="%s"' % (label, le), cumulative)
+                    families[name + '_bucket'][1].extend(['%s_sum{%s} %r' % (name, label, total),
+                                                          '%s_count{%s} %d' % (name, label, cumulative)])
+        lines = []
+        for name, (kind, samples) in families.items():
+            lines.append('# TYPE %s %s' % (name.removesuffix('_bucket'), kind))
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _handler_type():
+    from http.server import BaseHTTPRequestHandler  # slow to import, and only the main process serves
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = self.server.collector.to_prometheus().encode()  # noqa
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsServer(object):
+    """Serves a MetricsCollector at http://<address>:<port>/metrics, in a daemon thread"""
+    def __init__(self, collector: MetricsCollector, port: int, address: str = '127.0.0.1'):
+        self.collector = collector
+        self.address = address
+        self._port = port
+        self._server = None
+
+    @property
+    def port(self):
+        """Bound port, useful when constructed with 0"""
+        if self._server is None:
+            return self._port
+        return self._server.server_address[1]
+
+    def start(self):
+        from http.server import ThreadingHTTPServer
+
+        self._server = ThreadingHTTPServer((self.address, self._port), _handler_type())
+        self._server.daemon_threads = True
+        self._server.collector = self.collector  # noqa
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
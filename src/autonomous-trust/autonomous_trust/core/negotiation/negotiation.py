@@ -25,6 +25,10 @@ import psutil
 
 from ..system import max_concurrency, now
 from ..config import Configuration
+from ..config.wire import encode_value, decode_value, encode_uuid, decode_uuid, \
+    encode_datetime, decode_datetime, encode_timedelta, decode_timedelta
+from ..capabilities import Capability
+from ..protobuf.negotiation import task_pb2
 
 
 # TODO NTP synchronization using ntplib and tied to reputation
@@ -58,6 +62,7 @@ class TaskParameters(Configuration):
     default_timeout = 30
     timeout_extension = 120  # seconds
     duration_fraction = 10  # percent
+    message_class = task_pb2.TaskParameters
 
     def __init__(self, _capability, _flexible=True, when: datetime = None, duration: timedelta = None,
                  timeout: timedelta = None, args=None, kwargs=None):
@@ -89,6 +94,25 @@ class TaskParameters(Configuration):
     def capability(self):
         return self._capability
 
+    def sync_to_message(self):
+        msg = self.message
+        msg.capability.CopyFrom(self._capability.to_message())
+        msg.flexible = self._flexible
+        encode_datetime(self.when, msg.when)
+        encode_timedelta(self.duration, msg.duration)
+        encode_timedelta(self.timeout, msg.timeout)
+        for arg in self.args:
+            encode_value(arg, msg.args.add())
+        for key, arg in self.kwargs.items():
+            encode_value(arg, msg.kwargs[key])
+
+    def sync_from_message(self):
+        msg = self.message
+        self.__init__(Capability.from_message(msg.capability), msg.flexible, decode_datetime(msg.when),
+                      decode_timedelta(msg.duration), decode_timedelta(msg.timeout),
+                      tuple(decode_value(arg) for arg in msg.args),
+                      {key: decode_value(arg) for key, arg in msg.kwargs.items()})
+
 
 class TaskInfo(Configuration):
     def __init__(self, requestor, uuid: UUID = None, size=1, **kwargs):
@@ -101,6 +125,8 @@ class TaskInfo(Configuration):
 
 
 class Task(TaskInfo):
+    message_class = task_pb2.Task
+
     def __init__(self, parameters: TaskParameters, requestor, **kwargs):
         super().__init__(requestor, **kwargs)
         self.parameters = parameters
@@ -110,6 +136,18 @@ class Task(TaskInfo):
     def capability(self):
         return self.parameters.capability
 
+    def sync_to_message(self):
+        msg = self.message
+        msg.uuid = encode_uuid(self.uuid)
+        encode_value(self.requestor, msg.requestor)
+        msg.size = self.size
+        msg.parameters.CopyFrom(self.parameters.to_message())
+
+    def sync_from_message(self):
+        msg = self.message
+        self.__init__(TaskParameters.from_message(msg.parameters), decode_value(msg.requestor),
+                      uuid=decode_uuid(msg.uuid), size=msg.size)
+
 
 class TaskStatus(Task):
     def __init__(self, task=None, status=None, **kwargs):
@@ -122,6 +160,8 @@ class TaskStatus(Task):
 
 
 class TaskResult(TaskInfo):
+    message_class = task_pb2.TaskResult
+
     def __init__(self, task=None, result=None, **kwargs):
         if task is None:
             task_args = {}
@@ -130,6 +170,18 @@ class TaskResult(TaskInfo):
         super().__init__(**task_args, **kwargs)
         self.result = result
 
+    def sync_to_message(self):
+        msg = self.message
+        msg.uuid = encode_uuid(self.uuid)
+        encode_value(self.requestor, msg.requestor)
+        msg.size = self.size
+        encode_value(self.result, msg.result)
+
+    def sync_from_message(self):
+        msg = self.message
+        self.__init__(result=decode_value(msg.result), requestor=decode_value(msg.requestor),
+                      uuid=decode_uuid(msg.uuid), size=msg.size)
+
 
 class TaskCounter(Task):
     def __init__(self, task):
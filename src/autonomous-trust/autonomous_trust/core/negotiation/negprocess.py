@@ -15,7 +15,7 @@
 # ******************
 
 import traceback
-from queue import Empty, Full
+from queue import Full
 from datetime import timedelta
 
 from ..capabilities import Capability
@@ -101,7 +101,7 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
             try:
                 for peer in participants:
                     tracker.results[peer.uuid] = None
-                    msg = Message(self.name, NegotiationProtocol.announce, task.to_yaml_string(), peer)
+                    msg = Message(self.name, NegotiationProtocol.announce, task, peer)
                     queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                     self.logger.debug('Sent task to %s' % peer.nickname)
             except Full:
@@ -119,7 +119,7 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
                 self.peers.demote(message.from_whom)
             try:
                 if task.capability not in self.capabilities:
-                    msg = Message(self.name, NegotiationProtocol.refusal, task.to_yaml_string(), message.from_whom)
+                    msg = Message(self.name, NegotiationProtocol.refusal, task, message.from_whom)
                     queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                     self.logger.debug('Remote task refused: not capable')
                 else:
@@ -127,19 +127,19 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
                     if task.parameters.acceptable():
                         if self._add_task(task):
                             msg = Message(self.name, NegotiationProtocol.acceptance,
-                                          task.to_yaml_string(), message.from_whom)
+                                          task, message.from_whom)
                             queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                             self.logger.debug('Remote task accepted')
                         else:
                             task.parameters.when = self.task_stack.find_nearest_slot(task)
                             msg = Message(self.name, NegotiationProtocol.response,
-                                          task.to_yaml_string(), message.from_whom)
+                                          task, message.from_whom)
                             queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                             self.logger.debug('Haggle over remote task timing')
                     else:
                         task.adjust()
                         msg = Message(self.name, NegotiationProtocol.response,
-                                      task.to_yaml_string(), message.from_whom)
+                                      task, message.from_whom)
                         queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                         self.logger.debug('Haggle over remote task content')
             except Full:
@@ -161,7 +161,7 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
             if task.parameters.flexible:
                 try:
                     alt_task = task  # FIXME address any conflicts in parameters
-                    msg = Message(self.name, NegotiationProtocol.announce, alt_task.to_yaml_string(), message.from_whom)
+                    msg = Message(self.name, NegotiationProtocol.announce, alt_task, message.from_whom)
                     queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                     self.logger.debug('Attempt to resolve haggling')
                 except Full:
@@ -214,7 +214,7 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
             if message.status is not None:
                 try:
                     msg = Message(self.name, NegotiationProtocol.status_resp,
-                                  message.to_yaml_string(), message.requestor)
+                                  message, message.requestor)
                     queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                     self.logger.debug('Local status for forwarding')
                 except Full:
@@ -250,7 +250,7 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
     def forward_result(self, queues, message):
         if isinstance(message, TaskResult):
             try:
-                msg = Message(self.name, NegotiationProtocol.result, message.to_yaml_string(), message.requestor)
+                msg = Message(self.name, NegotiationProtocol.result, message, message.requestor)
                 queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                 self.logger.debug('Local result for forwarding')
             except Full:
@@ -274,26 +274,18 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
             return True
         return False
 
+    def handle_message(self, queues, message):
+        if not self.protocol.run_message_handlers(queues, message):
+            if not self.forward_status(queues, message):
+                if not self.forward_result(queues, message):
+                    if isinstance(message, tuple) and len(message) > 1 and isinstance(message[1], Capability):
+                        self.peer_capabilities[message[0]] = message[1]
+                    else:
+                        self.unhandled(message)
+
     def process(self, queues, signal):
         while self.keep_running(signal):
             try:
-                try:
-                    message = queues[self.name].get(block=True, timeout=self.q_cadence)
-                except Empty:
-                    message = None
-                if message:
-                    if not self.protocol.run_message_handlers(queues, message):
-                        if not self.forward_status(queues, message):
-                            if not self.forward_result(queues, message):
-                                if isinstance(message, tuple) and len(message) > 1 and \
-                                        isinstance(message[1], Capability):
-                                    self.peer_capabilities[message[0]] = message[1]
-                                else:
-                                    if isinstance(message, Message):
-                                        self.logger.error('Unhandled message %s' % message.function)
-                                    else:
-                                        self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
-
                 for job in self._get_jobs():  # local jobs
                     try:
                         queues[CfgIds.main].put(job.task, block=True, timeout=self.q_cadence)
@@ -310,14 +302,14 @@ class NegotiationProcess(Process, metaclass=ProcMeta,
                                 present > params.when + params.duration + params.timeout:
                             tx_task = Task(**task.to_dict())
                             msg = Message(self.name, NegotiationProtocol.status_req,
-                                          tx_task.to_yaml_string(), task.requestor)
+                                          tx_task, task.requestor)
                             queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                             self.logger.debug('Request remote execution status from %s' % task.requestor.nickname)
                             self.status_pending.append(task)
                     except Full:
                         self.logger.error('process: Network queue full')
 
-                self.sleep_until(self.cadence)
+                self.dispatch_messages(queues)
             except Exception as err:
                 self.logger.error(err)
                 self.logger.error(traceback.format_exc())
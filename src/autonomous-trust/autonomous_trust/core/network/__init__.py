@@ -14,9 +14,24 @@
 #   limitations under the License.
 # ******************
 
+from importlib import import_module
+
 from .network import Network
 from .message import Message
-from .netprocess import NetworkProcess, NetworkProtocol
-from .tcp import TCPNetworkProcess
-from .udp import UDPNetworkProcess
 from .ping import ping
+
+# process implementations, imported on first use: they depend on protocol, which depends on Message
+_lazy = {
+    'NetworkProcess': '.netprocess', 'NetworkProtocol': '.netprocess',
+    'TCPNetworkProcess': '.tcp',
+    'UDPNetworkProcess': '.udp',
+    'AsyncUDPNetworkProcess': '.async_udp',  # asyncio is slow to import, and only this implementation needs it
+}
+
+
+def __getattr__(name):
+    if name not in _lazy:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    value = getattr(import_module(_lazy[name], __name__), name)
+    globals()[name] = value
+    return value
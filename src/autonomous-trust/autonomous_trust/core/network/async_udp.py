@@ -0,0 +1,183 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import asyncio
+import threading
+import traceback
+
+from ..system import cadence
+from .network import Network
+from .message import Message
+from .udp import UDPNetworkProcess
+from .async_ping import AsyncPingServer, async_ping
+
+
+class DatagramChannel(asyncio.DatagramProtocol):
+    """
+    Datagram endpoint that hands every datagram to a callback as soon as it arrives
+    """
+    def __init__(self, on_datagram, on_error=None):
+        """
+        :param on_datagram: callable(data, (addr, port))
+        :param on_error: callable(exception)
+        """
+        self.on_datagram = on_datagram
+        self.on_error = on_error
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.on_datagram(data, addr[:2])
+
+    def error_received(self, exc):
+        if self.on_error is not None:
+            self.on_error(exc)
+
+
+class AsyncUDPNetworkProcess(UDPNetworkProcess, cadence=cadence):
+    """
+    Implementation of UDPNetworkProcess on a single asyncio event loop
+    Each receive socket is a datagram endpoint that routes straight into the subsystem queues
+    (via the crypto workers, if any), so there are no receive threads, no intermediate lists, and no busy polling.
+    One helper thread blocks on the IPC queue (the queue is not awaitable) and wakes the loop.
+    """
+    def process(self, queues, signal):
+        """
+        Network processing main loop, see NetworkProcess.process
+        :param queues: Interprocess communication queues
+        :param signal: IPC queue for signalling halt
+        :return:
+        """
+        self._start_crypto()
+        try:
+            asyncio.run(self._main(queues, signal))
+        finally:
+            self.stop = True
+            self._stop_crypto()
+            self.shutdown()
+
+    async def _main(self, queues, signal):
+        loop = asyncio.get_running_loop()
+        outgoing = asyncio.Queue()
+        transports = []
+        channels = ((self.recv_ptp_sock, self._receive_peer, True),
+                    (self.recv_grp_sock, self._receive_group, True),
+                    (self.recv_cast_sock, self._handle_unknown, False))
+        for sock, handler, encrypted in channels:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda h=handler, e=encrypted: DatagramChannel(self._on_datagram(queues, h, e),
+                                                               self._on_recv_error),
+                sock=sock)
+            transports.append(transport)
+        reader = threading.Thread(target=self._queue_reader, args=(loop, outgoing, queues, signal), daemon=True)
+        reader.start()
+        maintenance = asyncio.create_task(self._maintain(queues))
+        try:
+            while True:
+                messages = await outgoing.get()
+                if messages is None:
+                    break
+                self._dispatch(queues, messages)
+        finally:
+            maintenance.cancel()
+            for transport in transports:
+                transport.close()
+            if self.ping is not None:
+                self.ping.close()
+                self.ping = None
+
+    def _on_datagram(self, queues, handler, encrypted):
+        def on_datagram(data, addr):
+            try:
+                for raw_msg, from_addr, _ in self._unpack_datagram(data, *addr):
+                    if encrypted:
+                        if self._screen(raw_msg, from_addr):
+                            handler(queues, raw_msg, from_addr)
+                    elif raw_msg is not None:
+                        handler(queues, raw_msg, from_addr)
+            except Exception as err:
+                self.logger.error(err)
+                self.logger.error(traceback.format_exc())
+        return on_datagram
+
+    def _on_recv_error(self, err):
+        self.logger.error('Network: %s' % err)
+        self.track_recv_error()
+
+    def _queue_reader(self, loop, outgoing, queues, signal):
+        """
+        Thread blocking on the IPC queue (at most cadence, to notice the halt signal)
+        :return: None
+        """
+        try:
+            while self.keep_running(signal):
+                messages = self._next_messages(queues, self.cadence)
+                if messages:
+                    loop.call_soon_threadsafe(outgoing.put_nowait, messages)
+        finally:
+            loop.call_soon_threadsafe(outgoing.put_nowait, None)
+
+    def _dispatch(self, queues, messages):
+        self.begin_batch()
+        for message in messages:
+            try:
+                if self.protocol.run_message_handlers(queues, message):
+                    continue
+                if isinstance(message, Message) and message.function == Network.ping:
+                    asyncio.create_task(self._ping(queues, message))
+                else:
+                    self._send_message(queues, message)
+            except Exception as err:
+                self.logger.error(err)
+                self.logger.error(traceback.format_exc())
+        for address, count in self.flush():
+            who = self.peers.find_by_address(address)
+            for _ in range(count):
+                self.track_send_error(who.uuid if who is not None else self.unknown_peer)
+
+    async def _ping(self, queues, message):
+        try:
+            stats = await async_ping(message.to_whom.address, count=message.obj)  # noqa
+            msg = Message(self.name, Network.ping, stats)  # noqa
+            self._route(queues, message.return_to, msg)
+        except OSError as err:
+            self.logger.error('Network: %s' % err)
+
+    async def _maintain(self, queues):
+        """
+        Timer for work that is not driven by traffic: ping service, out-of-order and early group messages
+        :param queues: Interprocess communication queues
+        :return: None
+        """
+        try_count = {}
+        while True:
+            try:
+                if self.diplomat:
+                    if self.ping is None:
+                        self.ping = await AsyncPingServer(self.net_cfg.ip4)
+                elif self.ping is not None:
+                    self.ping.close()
+                    self.ping = None
+                self._retry_encrypted(queues, try_count)
+                self.report_metrics(queues)
+                while self.group_messages and self.group is not None:
+                    self._receive_group(queues, *self.group_messages.popleft())
+            except Exception as err:
+                self.logger.error(err)
+                self.logger.error(traceback.format_exc())
+            await asyncio.sleep(self.cadence)
@@ -0,0 +1,137 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import struct
+from collections import OrderedDict
+
+# Python exposes neither sendmmsg nor recvmmsg, so batching is done by coalescing datagrams
+# and by draining a readable socket without blocking
+
+
+class BatchFrame(object):
+    """
+    Several datagrams coalesced into one
+
+    Line protocol:
+    ===========================================================
+    | magic | count | size_1 | data_1 | ... | size_n | data_n |
+    ===========================================================
+    """
+    magic = b'ATb\x01'
+    header = struct.Struct('!4sH')
+    entry = struct.Struct('!I')
+
+    @classmethod
+    def pack(cls, msgs: list[bytes]) -> bytes:
+        parts = [cls.header.pack(cls.magic, len(msgs))]
+        for msg in msgs:
+            parts.append(cls.entry.pack(len(msg)))
+            parts.append(msg)
+        return b''.join(parts)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> list[bytes]:
+        """
+        Split a coalesced datagram; anything that is not a well-formed frame is a single datagram
+        :param data: bytes
+        :return: list of bytes
+        """
+        if len(data) < cls.header.size or not data.startswith(cls.magic):
+            return [data]
+        _, count = cls.header.unpack_from(data)
+        view = memoryview(data)
+        offset = cls.header.size
+        msgs = []
+        for _ in range(count):
+            if offset + cls.entry.size > len(data):
+                return [data]
+            size, = cls.entry.unpack_from(data, offset)
+            offset += cls.entry.size
+            if offset + size > len(data):
+                return [data]
+            msgs.append(bytes(view[offset:offset + size]))
+            offset += size
+        if offset != len(data):
+            return [data]
+        return msgs
+
+
+class Outbox(object):
+    """
+    Outgoing datagrams collected per destination during a cadence tick
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.active = False
+        self.pending = OrderedDict()
+
+    def __len__(self):
+        return sum(map(len, self.pending.values()))
+
+    def add(self, destination, msg: bytes):
+        if destination not in self.pending:
+            self.pending[destination] = []
+        self.pending[destination].append(msg)
+
+    def drain(self):
+        """
+        Coalesce pending messages into as few datagrams as possible, per destination
+        :return: generator of destination, datagram, message count
+        """
+        pending = self.pending
+        self.pending = OrderedDict()
+        for destination, msgs in pending.items():
+            group = []
+            size = 0
+            for msg in msgs:
+                needed = BatchFrame.entry.size + len(msg)
+                if group and BatchFrame.header.size + size + needed > self.max_size:
+                    yield destination, self._frame(group), len(group)
+                    group = []
+                    size = 0
+                group.append(msg)
+                size += needed
+            if group:
+                yield destination, self._frame(group), len(group)
+
+    @staticmethod
+    def _frame(group):
+        if len(group) == 1 and not group[0].startswith(BatchFrame.magic):
+            return group[0]
+        return BatchFrame.pack(group)
+
+
+def recv_all(sock, packet_size, max_count):
+    """
+    Receive every datagram ready on the socket, blocking (up to the socket timeout) only for the first
+    :param sock: bound UDP socket
+    :param packet_size: maximum datagram size
+    :param max_count: maximum number of datagrams per call
+    :return: list of (data, (addr, port))
+    """
+    packets = [sock.recvfrom(packet_size)]
+    if max_count <= 1:
+        return packets
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        while len(packets) < max_count:
+            packets.append(sock.recvfrom(packet_size))
+    except (BlockingIOError, InterruptedError):
+        pass
+    finally:
+        sock.settimeout(timeout)
+    return packets
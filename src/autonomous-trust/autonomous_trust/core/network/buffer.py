@@ -0,0 +1,116 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import threading
+from collections import OrderedDict, defaultdict, deque
+
+
+class MessageBuffer(object):
+    """
+    Bounded buffer of (raw_msg, from_addr) between the receive threads and the main loop
+    Policies, for when it is full:
+        oldest: one FIFO, the oldest message is dropped
+        fair: one FIFO per sender, served round robin; the oldest message of the sender with the most waiting
+              is dropped, so a flooding sender cannot crowd out the others
+    Senders are also bucketed by how many messages they have waiting, so every operation is O(1).
+    """
+    DROP_OLDEST = 'oldest'
+    FAIR_SHARE = 'fair'
+
+    def __init__(self, capacity: int, policy: str = DROP_OLDEST):
+        if policy not in (self.DROP_OLDEST, self.FAIR_SHARE):
+            raise ValueError('Unknown drop policy %s' % policy)
+        self.capacity = capacity
+        self.policy = policy
+        self.dropped = 0
+        self._senders: OrderedDict[object, deque] = OrderedDict()  # in service order
+        self._by_length: defaultdict[int, dict] = defaultdict(dict)  # messages waiting -> senders, as ordered set
+        self._longest = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def append(self, item: tuple[bytes, str]) -> bool:
+        """
+        Add a message, dropping one if full
+        :param item: (raw_msg, from_addr)
+        :return: whether a message was dropped to make room
+        """
+        key = item[1] if self.policy == self.FAIR_SHARE else None
+        dropped = False
+        with self._lock:
+            if self._size >= self.capacity:
+                self._take(next(iter(self._by_length[self._longest])))
+                self.dropped += 1
+                dropped = True
+            if key not in self._senders:
+                self._senders[key] = deque()
+            pending = self._senders[key]
+            pending.append(item)
+            self._rebucket(key, len(pending) - 1, len(pending))
+            self._size += 1
+        return dropped
+
+    def popleft(self) -> tuple[bytes, str]:
+        """
+        Next message, in turn by sender
+        :return: (raw_msg, from_addr)
+        :raise IndexError: if empty
+        """
+        with self._lock:
+            if not self._senders:
+                raise IndexError('pop from an empty MessageBuffer')
+            key = next(iter(self._senders))
+            item = self._take(key)
+            if key in self._senders:
+                self._senders.move_to_end(key)
+            return item
+
+    def _take(self, key):
+        pending = self._senders[key]
+        item = pending.popleft()
+        self._rebucket(key, len(pending) + 1, len(pending))
+        if not pending:
+            del self._senders[key]
+        self._size -= 1
+        return item
+
+    def _rebucket(self, key, old, new):  # lengths only ever change by one, so the longest is tracked exactly
+        if old:
+            bucket = self._by_length[old]
+            del bucket[key]
+            if not bucket:
+                del self._by_length[old]
+                if old == self._longest and new < old:
+                    self._longest = new
+        if new:
+            self._by_length[new][key] = None
+            if new > self._longest:
+                self._longest = new
@@ -0,0 +1,118 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import threading
+import time
+import traceback
+from queue import Queue, Full
+
+from ..metrics import LatencyHistogram
+
+
+class CryptoPool(object):
+    """
+    Worker threads for decryption (libsodium releases the GIL) and routing of the plaintext
+    Jobs from the same sender always go to the same worker, so each sender's messages stay in order
+    """
+    def __init__(self, workers, logger, max_depth=1024):
+        self.logger = logger
+        self.queues = [Queue(max_depth) for _ in range(workers)]
+        self.waiting = [{} for _ in range(workers)]  # per worker: stage -> LatencyHistogram, no locking
+        self.working = [{} for _ in range(workers)]
+        self.dropped = 0
+        self.threads = []
+
+    def __len__(self):
+        return sum([queue.qsize() for queue in self.queues])
+
+    def start(self):
+        for idx in range(len(self.queues)):
+            thread = threading.Thread(target=self._work, args=(idx,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        for queue in self.queues:
+            queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def submit(self, sender, stage, func, *args):
+        """
+        Queue a job behind any earlier ones from the same sender
+        :param sender: sender address
+        :param stage: name for latency statistics
+        :param func: callable(*args)
+        :return: bool, False if the worker is backed up and the job was dropped
+        """
+        try:
+            self.queues[hash(sender) % len(self.queues)].put_nowait((stage, func, args, time.perf_counter()))
+            return True
+        except Full:
+            self.dropped += 1
+            return False
+
+    def _work(self, idx):
+        queue = self.queues[idx]
+        while True:
+            job = queue.get()
+            if job is None:
+                break
+            stage, func, args, queued = job
+            start = time.perf_counter()
+            try:
+                func(*args)
+            except Exception as err:
+                self.logger.error(err)
+                self.logger.error(traceback.format_exc())
+            self._histogram(self.waiting[idx], stage).add(start - queued)
+            self._histogram(self.working[idx], stage).add(time.perf_counter() - start)
+
+    @staticmethod
+    def _histogram(histograms, stage):
+        if stage not in histograms:
+            histograms[stage] = LatencyHistogram()
+        return histograms[stage]
+
+    def _merged(self, per_worker):
+        merged = {}
+        for histograms in per_worker:
+            for stage, histogram in list(histograms.items()):
+                self._histogram(merged, stage).merge(histogram)
+        return merged
+
+    def histograms(self):
+        """
+        Per-stage histograms of queue wait and processing time, merged across workers
+        :return: dict of name to LatencyHistogram
+        """
+        histograms = {}
+        for prefix, per_worker in (('crypto_wait', self.waiting), ('crypto_work', self.working)):
+            for stage, histogram in self._merged(per_worker).items():
+                histograms['%s_%s' % (prefix, stage)] = histogram
+        return histograms
+
+    @property
+    def stats(self):
+        """
+        Queue depth, dropped jobs, and per-stage histograms of queue wait and processing time
+        :return: dict of name to tuple
+        """
+        stats = {'crypto_queue': (len(self), self.dropped)}
+        for name, histogram in self.histograms().items():
+            stats[name] = histogram.to_tuple()
+        return stats
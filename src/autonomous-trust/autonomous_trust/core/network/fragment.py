@@ -0,0 +1,188 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+
+class Fragment(object):
+    """
+    One piece of a message too large for a single datagram
+
+    Line protocol:
+    =============================================
+    | magic | message id | index | total | data |
+    =============================================
+    """
+    magic = b'ATf\x01'
+    header = struct.Struct('!4sIHH')
+    max_count = 0xFFFF
+    max_bytes = 16 * 1024 * 1024  # largest message, both to split and to reassemble
+
+    @classmethod
+    def is_fragment(cls, data) -> bool:
+        return len(data) >= cls.header.size and data.startswith(cls.magic)
+
+
+class FragmentStats(object):
+    """Counters for fragmentation and reassembly"""
+    def __init__(self):
+        self.split = 0
+        self.sent = 0
+        self.received = 0
+        self.reassembled = 0
+        self.expired = 0
+        self.evicted = 0
+        self.malformed = 0
+
+    def to_tuple(self):
+        return self.split, self.sent, self.received, self.reassembled, self.expired, self.evicted, self.malformed
+
+
+class Fragmenter(object):
+    """
+    Split messages into datagrams of at most fragment_size bytes
+    Messages larger than the receiving Reassembler's max_bytes are refused, since they could never be completed
+    """
+    def __init__(self, fragment_size, stats=None, max_bytes=Fragment.max_bytes):
+        self.payload_size = fragment_size - Fragment.header.size
+        self.max_bytes = max_bytes
+        self.stats = stats
+        if stats is None:
+            self.stats = FragmentStats()
+        self.next_id = 0
+
+    def split(self, msg: bytes) -> list[bytes]:
+        if len(msg) > self.max_bytes:
+            raise ValueError('Message of %d bytes exceeds the reassembly limit of %d' % (len(msg), self.max_bytes))
+        total = max(-(-len(msg) // self.payload_size), 1)
+        if total > Fragment.max_count:
+            raise ValueError('Message of %d bytes needs too many fragments' % len(msg))
+        msg_id = self.next_id
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        view = memoryview(msg)
+        fragments = []
+        for index in range(total):
+            offset = index * self.payload_size
+            fragments.append(Fragment.header.pack(Fragment.magic, msg_id, index, total) +
+                             view[offset:offset + self.payload_size])
+        self.stats.split += 1
+        self.stats.sent += total
+        return fragments
+
+
+class _Partial(object):
+    def __init__(self, total, started):
+        self.parts = [None] * total
+        self.count = 0
+        self.size = 0
+        self.started = started
+
+
+class Reassembler(object):
+    """
+    Bounded buffer of partially received messages
+    Incomplete messages are dropped after timeout seconds, or oldest first when max_messages or max_bytes is exceeded
+    """
+    def __init__(self, timeout=5.0, max_messages=256, max_bytes=Fragment.max_bytes, stats=None):
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.stats = stats
+        if stats is None:
+            self.stats = FragmentStats()
+        self.pending = OrderedDict()
+        self.size = 0
+        self.last_expiry = 0.
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def _discard(self, key):
+        partial = self.pending.pop(key)
+        self.size -= partial.size
+
+    def expire(self, when=None):
+        """
+        Drop incomplete messages older than timeout
+        :param when: monotonic time (default now)
+        :return: None
+        """
+        if when is None:
+            when = time.monotonic()
+        with self._lock:
+            self.last_expiry = when
+            for key in [key for key, partial in self.pending.items() if when - partial.started > self.timeout]:
+                self._discard(key)
+                self.stats.expired += 1
+
+    def add(self, sender, data, when=None):
+        """
+        Accept a fragment
+        :param sender: source of the fragment, e.g. address
+        :param data: fragment bytes
+        :param when: monotonic time (default now)
+        :return: the complete message, or None if still incomplete
+        """
+        if when is None:
+            when = time.monotonic()
+        if when - self.last_expiry > self.timeout / 2:
+            self.expire(when)
+        try:
+            magic, msg_id, index, total = Fragment.header.unpack_from(data)
+        except struct.error:
+            magic, index, total = None, 0, 0
+        if magic != Fragment.magic or index >= total:
+            self.stats.malformed += 1
+            return None
+        self.stats.received += 1
+        payload = bytes(memoryview(data)[Fragment.header.size:])
+        if total == 1:
+            self.stats.reassembled += 1
+            return payload
+        key = (sender, msg_id)
+        with self._lock:
+            partial = self.pending.get(key)
+            if partial is None:
+                partial = self.pending[key] = _Partial(total, when)
+            elif len(partial.parts) != total:
+                self.stats.malformed += 1
+                return None
+            if partial.parts[index] is None:
+                partial.parts[index] = payload
+                partial.count += 1
+                partial.size += len(payload)
+                self.size += len(payload)
+            if partial.count == total:
+                self._discard(key)
+                self.stats.reassembled += 1
+                return b''.join(partial.parts)
+            while len(self.pending) > self.max_messages or self.size > self.max_bytes:
+                self._discard(next(iter(self.pending)))
+                self.stats.evicted += 1
+        return None
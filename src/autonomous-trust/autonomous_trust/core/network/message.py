@@ -14,20 +14,49 @@
 #   limitations under the License.
 # ******************
 
-from ..config import Configuration
+import hashlib
+import struct
+
+from ..config import Configuration, to_yaml_string, to_wire, from_wire
 from ..identity import Identity, Group
+from ..system import CfgIds
 from .network import Network
 
 
+class MessageFormatError(ValueError):
+    pass
+
+
 class Message(object):
     """
-    Wraps message data for IPC use, not for line transmission
+    Wraps message data for IPC use, and encodes it for line transmission
 
     Line protocol:
-    ====================================
-    | size | process | function | data |
-    ====================================
+    ==========================================================================
+    | magic | version | kind | process id | function id | size | [names] | data |
+    ==========================================================================
+    Process and function ids are interned names; an id of zero means the name follows (name size, name)
+    Data is text, raw bytes when the object is bytes-like, or protobuf for configurations and tuples of objects
+
+    Legacy line protocol (still parsed):
+    =============================
+    | process | function | data |
+    =============================
     """
+    binary_wire = True  # otherwise, transmit the legacy protocol
+    magic = b'AM'
+    version = 1
+    prefix = magic + bytes([version])
+    header = struct.Struct('!2sBBIII')
+    name_size = struct.Struct('!H')
+    view_threshold = 4096  # slicing is cheaper than a memoryview for small payloads
+    TEXT = 0
+    BYTES = 1
+    OBJECT = 2
+    object_types = (Configuration, tuple, list, dict)
+    _ids = {}
+    _names = {}
+
     def __init__(self, process, function, obj, to_whom=None, from_whom=None, encrypt=True, return_to=None):
         try:
             self.process = process.value
@@ -60,15 +89,98 @@ class Message(object):
         # FIXME signing
         if isinstance(self.obj, Configuration):
             obj_str = self.obj.to_string()
+        elif isinstance(self.obj, self.object_types):
+            obj_str = to_yaml_string(self.obj)
         return '|'.join([self.process, self.function, obj_str])
 
     def __bytes__(self):
-        return str(self).encode(Network.encoding)
+        if not self.binary_wire:
+            return str(self).encode(Network.encoding)
+        obj = self.obj
+        if isinstance(obj, str):
+            kind = self.TEXT
+            data = obj.encode(Network.encoding)
+        elif isinstance(obj, (bytes, bytearray, memoryview)):
+            kind = self.BYTES
+            data = memoryview(obj).cast('B')
+        elif isinstance(obj, self.object_types):
+            kind = self.OBJECT
+            data = to_wire(obj)
+        else:
+            kind = self.TEXT
+            data = str(obj).encode(Network.encoding)
+        process_id = self._ids.get(self.process, 0)
+        function_id = self._ids.get(self.function, 0)
+        header = self.header.pack(self.magic, self.version, kind, process_id, function_id, len(data))
+        if process_id and function_id:
+            return header + data
+        parts = [header]
+        for name_id, name in ((process_id, self.process), (function_id, self.function)):
+            if name_id == 0:
+                name = name.encode(Network.encoding)
+                parts += [self.name_size.pack(len(name)), name]
+        parts.append(data)
+        return b''.join(parts)
+
+    @classmethod
+    def intern(cls, *names):
+        """
+        Transmit these process or function names as 4-byte ids
+        Ids are derived from the names, so every node computes the same table
+        :param names: str
+        :return: None
+        """
+        for name in names:
+            name_id = int.from_bytes(hashlib.blake2b(name.encode(Network.encoding), digest_size=4).digest(), 'big')
+            if name_id == 0 or cls._names.get(name_id, name) != name:
+                continue  # reserved or colliding, so sent by name
+            cls._ids[name] = name_id
+            cls._names[name_id] = name
+
+    @classmethod
+    def _decode_name(cls, raw_msg, offset, name_id):
+        if name_id != 0:
+            return cls._names.get(name_id) or '#%08x' % name_id, offset  # unknown here, so not routable
+        size, = cls.name_size.unpack_from(raw_msg, offset)
+        offset += cls.name_size.size
+        if offset + size > len(raw_msg):
+            raise MessageFormatError('Truncated name')
+        return str(raw_msg[offset:offset + size], Network.encoding), offset + size
+
+    @classmethod
+    def _parse_binary(cls, raw_msg, sender):
+        try:
+            _, version, kind, process_id, function_id, size = cls.header.unpack_from(raw_msg)
+            if version != cls.version:
+                raise MessageFormatError('Unsupported message version %d' % version)
+            process, offset = cls._decode_name(raw_msg, cls.header.size, process_id)
+            function, offset = cls._decode_name(raw_msg, offset, function_id)
+        except struct.error as err:
+            raise MessageFormatError(str(err))
+        if offset + size != len(raw_msg):
+            raise MessageFormatError('Message size mismatch')
+        if kind == cls.BYTES:
+            obj = bytes(raw_msg[offset:])  # one copy, so that Message pickles
+        elif kind == cls.OBJECT:
+            try:
+                obj = from_wire(raw_msg[offset:])
+            except Exception as err:  # i.e. protobuf or yaml errors
+                raise MessageFormatError('Undecodable object: %s' % err)
+        elif size > cls.view_threshold:
+            obj = str(memoryview(raw_msg)[offset:], Network.encoding)  # decode in place
+        else:
+            obj = str(raw_msg[offset:], Network.encoding)
+        return Message(process, function, obj, from_whom=sender)
 
     @staticmethod
     def parse(raw_msg, sender, validate=True):
         if validate and sender is not None and not isinstance(sender, Identity):
             raise RuntimeError('Sender must be an Identity')
-        if isinstance(raw_msg, bytes):
-            raw_msg = raw_msg.decode(Network.encoding)
+        if not isinstance(raw_msg, str):
+            if raw_msg[:3] == Message.prefix:
+                return Message._parse_binary(raw_msg, sender)
+            raw_msg = bytes(raw_msg).decode(Network.encoding)
         return Message(*raw_msg.split('|', 2), from_whom=sender)
+
+
+Message.intern(*[getattr(CfgIds, attr) for attr in CfgIds], Network.ping, Network.stats_req, Network.stats_resp)
@@ -14,6 +14,7 @@
 #   limitations under the License.
 # ******************
 
+import os
 import threading
 import time
 import traceback
@@ -21,6 +22,7 @@ from collections import deque
 from datetime import datetime
 from queue import Empty, Full
 from enum import Enum
+from functools import partial
 
 import nacl
 
@@ -30,7 +32,9 @@ from ..processes import Process, ProcMeta
 from ..identity import Group
 from ..system import CfgIds, comm_port, net_cadence
 from .network import Network
-from .message import Message
+from .message import Message, MessageFormatError
+from .crypto import CryptoPool
+from .buffer import MessageBuffer
 from .ping import PingServer, ping
 
 
@@ -89,6 +93,14 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
     mystery_max_retries = 60  # 30 seconds
     socket_timeout = 0.1
     unknown_peer = '0'
+    max_batch = 64
+    crypto_workers = min(4, os.cpu_count() or 1)  # 0 decrypts on the main loop
+    crypto_depth = 1024
+    # received messages waiting for the main loop, per channel: (capacity, drop policy)
+    buffers = {'peer': (1024, MessageBuffer.FAIR_SHARE),
+               'group': (1024, MessageBuffer.FAIR_SHARE),
+               'unknown': (256, MessageBuffer.FAIR_SHARE),
+               'encrypted': (256, MessageBuffer.DROP_OLDEST)}  # from senders not yet known as peers
 
     def __init__(self, configurations, subsystems, log_q, acceptance_func=None, **kwargs):
         super().__init__(configurations, subsystems, log_q, **kwargs)
@@ -100,15 +112,24 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
         self.diplomat = True
         self.ping = None
         self.myself = configurations[CfgIds.identity]
-        self.peer_messages = []
-        self.encrypted_messages = []
-        self.group_messages = []
-        self.unknown_messages = []
+        self.peer_messages = MessageBuffer(*self.buffers['peer'])
+        self.encrypted_messages = MessageBuffer(*self.buffers['encrypted'])
+        self.group_messages = MessageBuffer(*self.buffers['group'])
+        self.unknown_messages = MessageBuffer(*self.buffers['unknown'])
         self.acceptance = acceptance_func
         self.pests = {}
         self.protocol = Protocol(self.name, self.logger, configurations)
+        Message.intern(*self.subsystems)
         self.stop = False
         self.statistics = {}
+        self.crypto = None
+        self.route_dropped = 0  # received messages for a subsystem whose queue was full
+        self.serialize_latency = self.metrics.histogram('serialize_seconds')
+        self.encrypt_latency = self.metrics.histogram('encrypt_seconds')
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        Message.intern(*self.subsystems)  # interned names are not pickled
 
     @property
     def peers(self):
@@ -124,6 +145,8 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
         self.statistics[uuid].sent(num_bytes)
 
     def track_send_error(self, uuid):
+        if uuid not in self.statistics:
+            self.statistics[uuid] = NetStat()
         self.statistics[uuid].sent(0, 1)
 
     def track_recv_stats(self, uuid, num_bytes, errors=0):
@@ -132,16 +155,51 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
         self.statistics[uuid].rcvd(num_bytes, errors)
 
     def track_recv_error(self):
+        if self.unknown_peer not in self.statistics:
+            self.statistics[self.unknown_peer] = NetStat()
         self.statistics[self.unknown_peer].rcvd(0, 1)
 
+    @property
+    def io_stats(self):
+        """
+        Implementation-specific counters, merged into net_stats by name
+        :return: dict of name to tuple
+        """
+        stats = {'%s_buffer' % channel: (len(buf), buf.dropped) for channel, buf in self._buffer_channels()}
+        stats['route_dropped'] = (self.route_dropped,)
+        if self.crypto is not None:
+            stats.update(self.crypto.stats)
+        return stats
+
+    def _buffer_channels(self):
+        return (('peer', self.peer_messages), ('group', self.group_messages), ('unknown', self.unknown_messages),
+                ('encrypted', self.encrypted_messages))
+
+    def collect_metrics(self):
+        super().collect_metrics()
+        for channel, buf in self._buffer_channels():
+            self.metrics.gauge('%s_buffer' % channel).set(len(buf))
+            self.metrics.counter('%s_buffer_dropped' % channel).value = buf.dropped
+        self.metrics.counter('route_dropped').value = self.route_dropped
+        if self.crypto is not None:  # decryption happens in the crypto workers, which keep their own
+            self.metrics.gauge('crypto_queue').set(len(self.crypto))
+            self.metrics.counter('crypto_dropped').value = self.crypto.dropped
+            for name, histogram in self.crypto.histograms().items():
+                merged = self.metrics.histogram(name + '_seconds')
+                merged.clear()
+                merged.merge(histogram)
+
     @property
     def net_stats(self):
         cumulative = {}
         for uuid in self.statistics:
-            elapsed = self.statistics[uuid].times[-1] - self.statistics[uuid].times[0]
+            elapsed = (self.statistics[uuid].times[-1] - self.statistics[uuid].times[0]).total_seconds()
+            if elapsed <= 0:
+                elapsed = 1.
             up, down = sum(self.statistics[uuid].send) / elapsed, sum(self.statistics[uuid].recv) / elapsed
             cumulative[uuid] = (up, down, self.statistics[uuid].send_total, self.statistics[uuid].recv_total,
-                                self.statistics[uuid][2], self.statistics[uuid][3])
+                                self.statistics[uuid].err_out, self.statistics[uuid].err_in)
+        cumulative.update(self.io_stats)
         return cumulative
 
     def send_peer(self, msg, whom):
@@ -162,6 +220,40 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
     def recv_any(self):
         raise NotImplementedError
 
+    def recv_peer_batch(self):
+        """
+        Receive all available point-to-point messages; subclasses may override with true batching
+        :return: list of (msg, address, port)
+        """
+        return [self.recv_peer()]
+
+    def recv_group_batch(self):
+        return [self.recv_group()]
+
+    def recv_any_batch(self):
+        return [self.recv_any()]
+
+    def begin_batch(self):
+        """
+        Start collecting sends for this cadence tick; subclasses may coalesce until flush()
+        :return: None
+        """
+        pass
+
+    def flush(self):
+        """
+        Transmit sends collected since begin_batch()
+        :return: list of (address, number of messages) that failed
+        """
+        return []
+
+    def shutdown(self):
+        """
+        Release network resources when the main loop exits
+        :return: None
+        """
+        pass
+
     def accept_peer_message(self, address):
         """
         Accept/reject messages based on sender's address
@@ -187,48 +279,70 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
     def reject_message(self, address):  # FIXME
         return False
 
-    def _encr_recv(self, method, msg_queue):
+    def _screen(self, raw_msg, from_addr):
+        """
+        Track statistics for an incoming encrypted message, or demote a sender that persists after rejection
+        :param raw_msg: message bytes, None if rejected
+        :param from_addr: sender address, None if ignored
+        :return: bool, whether to handle the message
+        """
+        if raw_msg is not None:
+            who = self.peers.find_by_address(from_addr)
+            if who is not None:
+                self.track_recv_stats(who.uuid, len(raw_msg))
+            else:
+                self.track_recv_stats(self.unknown_peer, len(raw_msg))
+            return True
+        if from_addr is not None:
+            who = self.peers.find_by_address(from_addr)
+            if who is not None:
+                if who not in self.pests:
+                    self.pests[who] = 0
+                self.pests[who] += 1
+                if self.pests[who] > self.annoy_limit:
+                    self.peers.demote(who)
+                    del self.pests[who]
+        return False
+
+    def _encr_recv(self, method, msg_queue, deliver=None):
         while not self.stop:
             try:
-                raw_msg, from_addr, from_port = method()
+                batch = method()
             except TransmissionError as err:
                 self.logger.error('Network: %s' % err)
                 self.track_recv_error()
                 continue
             except TimeoutError:
                 continue
-            if raw_msg is not None:
-                msg_queue.append((raw_msg, from_addr))
-                who = self.peers.find_by_address(from_addr)
-                if who is not None:
-                    self.track_recv_stats(who.uuid, len(raw_msg))
-                else:
-                    self.track_recv_stats(self.unknown_peer, len(raw_msg))
-            elif from_addr is not None:
-                who = self.peers.find_by_address(from_addr)
-                if who is not None:
-                    if who not in self.pests:
-                        self.pests[who] = 0
-                    self.pests[who] += 1
-                    if self.pests[who] > self.annoy_limit:
-                        self.peers.demote(who)
-                        del self.pests[who]
-
-    def peer_receiver(self):
+            for raw_msg, from_addr, from_port in batch:
+                if self._screen(raw_msg, from_addr):
+                    if deliver is None:
+                        msg_queue.append((raw_msg, from_addr))
+                    else:
+                        deliver(raw_msg, from_addr)
+
+    def _deliverer(self, queues, receive):
+        if self.crypto is None or queues is None:
+            return None  # main loop picks them up
+        return partial(receive, queues)
+
+    def peer_receiver(self, queues=None):
         """
         Receive thread for point-to-point
         Track peers not on whitelist (accept_peer_message), demote if they persist
+        :param queues: Interprocess communication queues, to hand messages straight to the crypto workers
         :return: None
         """
-        self._encr_recv(self.recv_peer, self.peer_messages)
+        self._encr_recv(self.recv_peer_batch, self.peer_messages, self._deliverer(queues, self._receive_peer))
 
-    def group_receiver(self):
+    def group_receiver(self, queues=None):
         """
         Receive thread for pseudo-multicast with a single encryption key
         Track peers not on whitelist (accept_peer_message), demote if they persist
+        :param queues: Interprocess communication queues, to hand messages straight to the crypto workers
         :return: None
         """
-        self._encr_recv(self.recv_group, self.group_messages)
+        self._encr_recv(self.recv_group_batch, self.group_messages, self._deliverer(queues, self._receive_group))
 
     def unknown_receiver(self):
         """
@@ -237,14 +351,15 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
         """
         while not self.stop:
             try:
-                raw_msg, from_addr, from_port = self.recv_any()
+                batch = self.recv_any_batch()
             except TransmissionError as err:
                 self.logger.error('Network: %s' % err)
                 continue
             except TimeoutError:
                 continue
-            if raw_msg is not None:
-                self.unknown_messages.append((raw_msg, from_addr))
+            for raw_msg, from_addr, from_port in batch:
+                if raw_msg is not None:
+                    self.unknown_messages.append((raw_msg, from_addr))
 
     def mystery_handler(self, queues):
         """
@@ -253,46 +368,250 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
         """
         try_count = {}
         while not self.stop:
-            for raw_msg, from_addr in self.encrypted_messages:
-                peer = self.peers.find_by_address(from_addr)
-                if peer is not None:
-                    decrypt_msg = self.myself.decrypt(raw_msg, peer)
-                    self._msg_to_queue(decrypt_msg, peer, queues, 'point-to-point')
-                    self.logger.debug('Out-of-order message from %s handled' % peer.nickname)
-                    self.encrypted_messages.remove((raw_msg, from_addr))
-                else:
-                    if from_addr not in try_count:
-                        try_count[from_addr] = 0
-                    try_count[from_addr] += 1
-                    if try_count[from_addr] > self.mystery_max_retries:
-                        self.encrypted_messages.remove((raw_msg, from_addr))
-                        self.logger.debug('Spurious encrypted message from %s dropped' % from_addr)
+            self._retry_encrypted(queues, try_count)
             time.sleep(self.cadence + self.q_cadence)  # curiously, does not sleep if exactly cadence
 
+    def _retry_encrypted(self, queues, try_count):
+        """
+        Deliver encrypted messages whose sender has since become a peer, drop them after too many retries
+        :param queues: Interprocess communication queues
+        :param try_count: dict of address to number of retries so far
+        :return: None
+        """
+        for _ in range(len(self.encrypted_messages)):  # each one once, those still waiting go to the back
+            try:
+                raw_msg, from_addr = self.encrypted_messages.popleft()
+            except IndexError:
+                break
+            peer = self.peers.find_by_address(from_addr)
+            if peer is not None:
+                self._decrypt(from_addr, 'retry', self._deliver_peer, queues, raw_msg, peer)
+                self.logger.debug('Out-of-order message from %s handled' % peer.nickname)
+            else:
+                if from_addr not in try_count:
+                    try_count[from_addr] = 0
+                try_count[from_addr] += 1
+                if try_count[from_addr] > self.mystery_max_retries:
+                    self.logger.debug('Spurious encrypted message from %s dropped' % from_addr)
+                else:
+                    self.encrypted_messages.append((raw_msg, from_addr))
+
+    def _start_crypto(self):
+        if self.crypto_workers > 0:
+            self.crypto = CryptoPool(self.crypto_workers, self.logger, self.crypto_depth)
+            self.crypto.start()
+
+    def _stop_crypto(self):
+        if self.crypto is not None:
+            self.crypto.stop()
+
+    def _decrypt(self, sender, stage, handler, *args):
+        """
+        Run a decrypt-and-route handler on the crypto worker for this sender, or right here if there are none
+        :param sender: sender address
+        :param stage: name for latency statistics
+        :param handler: callable(*args)
+        :return: None
+        """
+        if self.crypto is None:
+            handler(*args)
+        elif not self.crypto.submit(sender, stage, handler, *args):
+            self.logger.error('Network: decryption backlog, message from %s dropped' % sender)
+
+    def _receive_peer(self, queues, raw_msg, from_addr):
+        self._decrypt(from_addr, 'peer', self._handle_peer, queues, raw_msg, from_addr)
+
+    def _receive_group(self, queues, raw_msg, from_addr):
+        if self.group is None:
+            self.group_messages.append((raw_msg, from_addr))  # until a group exists
+            return
+        self._decrypt(from_addr, 'group', self._handle_group, queues, raw_msg, from_addr)
+
     def _msg_to_queue(self, msg, from_whom, queues, rcvd_by, validate=True):
         try:
             message = Message.parse(msg, from_whom, validate=validate)
-        except TypeError as err:
+        except (TypeError, MessageFormatError) as err:
             self.logger.error('Error parsing %s: %s' % (msg, err))
             return
         from_addr = from_whom
         if isinstance(from_whom, Identity):
             from_addr = from_whom.address
-        processed = False
-        for sub_sys_proc in self.subsystems:
-            if message.process == sub_sys_proc:
-                try:
-                    processed = True
-                    queues[sub_sys_proc].put(message, block=True, timeout=self.q_cadence)
-                    self.logger.debug('Recvd %s message for %s:%s from %s' %
-                                      (rcvd_by, sub_sys_proc, message.function, from_addr))
-                except Full:
-                    self.logger.error('Network: %s queue is full' % sub_sys_proc)
-        if not processed:
+        if message.process in self.subsystems:
+            if self._route(queues, message.process, message):
+                self.logger.debug('Recvd %s message for %s:%s from %s' %
+                                  (rcvd_by, message.process, message.function, from_addr))
+        else:
             self.logger.error('Recvd message for unknown %s process from %s. Ignoring.' %
                               (message.process, from_addr))
             self.logger.debug('Message: %s' % str(message))
 
+    def _route(self, queues, process, message):
+        """
+        Hand a message to a process without waiting, so a slow subsystem cannot stall receiving
+        :param queues: Interprocess communication queues
+        :param process: name of the destination process
+        :param message: Message
+        :return: bool, whether it was queued (otherwise counted as dropped)
+        """
+        try:
+            queues[process].put_nowait(message)
+            return True
+        except Full:
+            self.route_dropped += 1
+            self.logger.error('Network: %s queue is full' % process)
+            return False
+
+    def _deliver_peer(self, queues, raw_msg, peer):
+        decrypt_msg = self.myself.decrypt(raw_msg, peer)
+        self._msg_to_queue(decrypt_msg, peer, queues, 'point-to-point')
+
+    def _handle_peer(self, queues, raw_msg, from_addr):
+        """
+        Decrypt a point-to-point message and route it to its process
+        :param queues: Interprocess communication queues
+        :param raw_msg: message bytes
+        :param from_addr: sender address
+        :return: None
+        """
+        peers = self.configs[CfgIds.peers]
+        from_whom = peers.find_by_address(from_addr)
+        if len(peers) < 1:
+            # bootstrapping will not (cannot) be encrypted
+            try:
+                self._msg_to_queue(raw_msg, from_addr, queues, 'point-to-point', validate=False)
+            except UnicodeDecodeError:
+                self.logger.debug('Out-of-order message detected, retry later')
+                self.encrypted_messages.append((raw_msg, from_addr))
+        elif from_whom is not None:
+            try:
+                self._deliver_peer(queues, raw_msg, from_whom)
+            except Exception:
+                self.logger.error('Decryption error, msg from %s: %s' % (
+                    from_whom.nickname, traceback.format_exc()))  # FIXME
+        else:
+            self.logger.error(
+                'Recvd transmission from %s - not recognized as a peer. Ignoring.' % from_addr)
+            self.logger.debug('Ignored message: %s' % str(raw_msg))
+
+    def _handle_group(self, queues, raw_msg, from_addr):
+        """
+        Decrypt a group message and route it to its process; requires a group
+        :param queues: Interprocess communication queues
+        :param raw_msg: message bytes
+        :param from_addr: sender address
+        :return: None
+        """
+        if from_addr in self.group.addresses:
+            from_whom = self.peers.find_by_address(from_addr)
+            try:
+                decrypt_msg = self.group.decrypt(raw_msg, self.group)
+                if from_whom is not None:
+                    self._msg_to_queue(decrypt_msg, from_whom, queues, 'group')
+                else:
+                    self.logger.error(
+                        'Recvd transmission from %s - not in peers. Ignoring.' % from_addr)
+                    self.logger.debug('Ignored message: %s' % str(raw_msg))
+            except nacl.exceptions.CryptoError as e:
+                name = from_addr
+                if from_whom is not None:
+                    name = '%s (%s)' % (from_whom.nickname, name)
+                self.logger.error('CryptoError decrypting message from %s' % name)  # FIXME too often
+        else:
+            self.logger.error('Recvd transmission from %s - not in group. Ignoring.' % from_addr)
+            self.logger.debug('Ignored message: %s' % str(raw_msg))
+            # FIXME ask others in group
+
+    def _handle_unknown(self, queues, raw_msg, from_addr):
+        self._msg_to_queue(raw_msg, from_addr, queues, 'multicast', validate=False)
+
+    def _next_messages(self, queues, timeout=None):
+        """
+        Collect up to max_batch outgoing requests, waiting only for the first
+        :param queues: Interprocess communication queues
+        :param timeout: seconds to wait for the first request (default q_cadence)
+        :return: list of messages
+        """
+        if timeout is None:
+            timeout = self.q_cadence
+        messages = []
+        try:
+            messages.append(queues[self.name].get(block=True, timeout=timeout))  # noqa
+            while len(messages) < self.max_batch:
+                messages.append(queues[self.name].get_nowait())  # noqa
+        except Empty:
+            pass
+        return [msg for msg in messages if msg]
+
+    def _serialize(self, message):
+        start = time.perf_counter()
+        msg = bytes(message)
+        self.serialize_latency.add(time.perf_counter() - start)
+        return msg
+
+    def _encrypt(self, encryptor, msg, whom):
+        start = time.perf_counter()
+        msg = encryptor.encrypt(msg, whom)
+        self.encrypt_latency.add(time.perf_counter() - start)
+        return msg
+
+    def _send_message(self, queues, message):
+        if isinstance(message, Message):
+            self.logger.debug('Send network message: %s:%s' % (message.process, message.function))
+            try:
+                if message.function == Network.stats_req:
+                    msg = Message(CfgIds.network, Network.stats_resp, self.net_stats)
+                    self._route(queues, message.process, msg)
+                elif message.function == Network.ping:
+                    try:
+                        stats = ping(message.to_whom.address, count=message.obj)  # noqa
+                        msg = Message(self.name, Network.ping, stats)  # noqa
+                        self._route(queues, message.return_to, msg)
+                    except TransmissionError as err:
+                        self.logger.error('Network: %s' % err)
+                elif message.to_whom == Network.broadcast:
+                    msg = self._serialize(message)
+                    try:
+                        self.send_any(msg)
+                        self.track_send_stats(self.unknown_peer, len(msg))
+                    except TransmissionError as err:
+                        self.logger.error('Network: %s' % err)
+                        self.track_send_error(self.unknown_peer)
+                elif isinstance(message.to_whom, Group):
+                    if message.encrypt:  # FIXME self.group must be non-None
+                        msg = self._encrypt(self.group, self._serialize(message), self.group)
+                    else:
+                        msg = self._serialize(message)
+                    for addr in message.to_whom.addresses:
+                        if addr == self.myself.address:
+                            continue
+                        try:
+                            self.send_group(msg, addr)
+                            self.track_send_stats(self.unknown_peer, len(msg))
+                        except TransmissionError as err:
+                            self.logger.error('Network: %s' % err)
+                            self.track_send_error(self.unknown_peer)
+                else:  # defaults to pseudo-multicast
+                    for who in message.to_whom:  # Message ensures this is list  # noqa
+                        address = who.address
+                        if '/' in address:
+                            address = address.split('/')[0]
+                        if message.encrypt:
+                            msg = self._encrypt(self.myself, self._serialize(message), who)
+                        else:
+                            msg = self._serialize(message)
+                        try:
+                            self.send_peer(msg, address)
+                            self.track_send_stats(who.uuid, len(msg))
+                        except TransmissionError as err:
+                            self.logger.error('Network: %s' % err)
+                            self.track_send_error(who.uuid)
+            except BrokenPipeError as err:
+                self.logger.error('Network: %s' % err)
+        else:
+            self.logger.error('Net process recvd message of type %s - Message required. Ignoring.' %
+                              type(message))
+            self.logger.debug('Ignored message: %s' % str(message))
+
     def process(self, queues, signal):
         """
         Network processing main loop
@@ -303,8 +622,9 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
         :param signal: IPC queue for signalling halt
         :return:
         """
-        threading.Thread(target=self.peer_receiver, daemon=True).start()
-        threading.Thread(target=self.group_receiver, daemon=True).start()
+        self._start_crypto()
+        threading.Thread(target=self.peer_receiver, args=(queues,), daemon=True).start()
+        threading.Thread(target=self.group_receiver, args=(queues,), daemon=True).start()
         threading.Thread(target=self.unknown_receiver, daemon=True).start()
         threading.Thread(target=self.mystery_handler, args=(queues,), daemon=True).start()
         while self.keep_running(signal):
@@ -316,122 +636,32 @@ class NetworkProcess(Process, metaclass=_NetProcMeta):
                 elif self.ping is not None:
                     self.ping.stop()
                     self.ping = None
-                try:
-                    message = queues[self.name].get(block=True, timeout=self.q_cadence)  # noqa
-                except Empty:
-                    message = None
-                if message and not self.protocol.run_message_handlers(queues, message):
-                    if isinstance(message, Message):
-                        self.logger.debug('Send network message: %s:%s' % (message.process, message.function))
-                        try:
-                            if message.function == Network.stats_req:
-                                msg = Message(CfgIds.network, Network.stats_resp, self.net_stats)
-                                queues[message.process].put(msg, block=True, timeout=self.q_cadence)
-                            elif message.function == Network.ping:
-                                try:
-                                    stats = ping(message.to_whom.address, count=message.obj)  # noqa
-                                    msg = Message(self.name, Network.ping, stats)  # noqa
-                                    queues[message.return_to].put(msg, block=True, timeout=self.q_cadence)
-                                except TransmissionError as err:
-                                    self.logger.error('Network: %s' % err)
-                            elif message.to_whom == Network.broadcast:
-                                msg = bytes(message)
-                                try:
-                                    self.send_any(msg)
-                                    self.track_send_stats(self.unknown_peer, len(msg))
-                                except TransmissionError as err:
-                                    self.logger.error('Network: %s' % err)
-                                    self.track_send_error(self.unknown_peer)
-                            elif isinstance(message.to_whom, Group):
-                                if message.encrypt:  # FIXME self.group must be non-None
-                                    msg = self.group.encrypt(bytes(message), self.group)
-                                else:
-                                    msg = bytes(message)
-                                for addr in message.to_whom.addresses:
-                                    if addr == self.myself.address:
-                                        continue
-                                    try:
-                                        self.send_group(msg, addr)
-                                        self.track_send_stats(self.unknown_peer, len(msg))
-                                    except TransmissionError as err:
-                                        self.logger.error('Network: %s' % err)
-                                        self.track_send_error(self.unknown_peer)
-                            else:  # defaults to pseudo-multicast
-                                for who in message.to_whom:  # Message ensures this is list  # noqa
-                                    address = who.address
-                                    if '/' in address:
-                                        address = address.split('/')[0]
-                                    if message.encrypt:
-                                        msg = self.myself.encrypt(bytes(message), who)
-                                    else:
-                                        msg = bytes(message)
-                                    try:
-                                        self.send_peer(msg, address)
-                                        self.track_send_stats(who.uuid, len(msg))
-                                    except TransmissionError as err:
-                                        self.logger.error('Network: %s' % err)
-                                        self.track_send_error(who.uuid)
-                        except BrokenPipeError as err:
-                            self.logger.error('Network: %s' % err)
-                    else:
-                        self.logger.error('Net process recvd message of type %s - Message required. Ignoring.' %
-                                          type(message))
-                        self.logger.debug('Ignored message: %s' % str(message))
+                self.begin_batch()
+                for message in self._next_messages(queues):
+                    if not self.protocol.run_message_handlers(queues, message):
+                        self._send_message(queues, message)
+                for address, count in self.flush():
+                    who = self.peers.find_by_address(address)
+                    for _ in range(count):
+                        self.track_send_error(who.uuid if who is not None else self.unknown_peer)
+                self.report_metrics(queues)
 
                 # async recv point-to-point messages
-                if len(self.peer_messages) > 0:
-                    raw_msg, from_addr = self.peer_messages.pop(0)
-                    peers = self.configs[CfgIds.peers]
-                    from_whom = peers.find_by_address(from_addr)
-                    if len(peers.all) < 1:
-                        # bootstrapping will not (cannot) be encrypted
-                        try:
-                            self._msg_to_queue(raw_msg, from_addr, queues, 'point-to-point', validate=False)
-                        except UnicodeDecodeError:
-                            self.logger.debug('Out-of-order message detected, retry later')
-                            self.encrypted_messages.append((raw_msg, from_addr))
-                    elif from_whom is not None:
-                        try:
-                            decrypt_msg = self.myself.decrypt(raw_msg, from_whom)  # FIXME
-                            self._msg_to_queue(decrypt_msg, from_whom, queues, 'point-to-point')
-                        except Exception:
-                            self.logger.error('Decryption error, msg from %s: %s' % (
-                            from_whom.nickname, traceback.format_exc()))  # FIXME
-                    else:
-                        self.logger.error(
-                            'Recvd transmission from %s - not recognized as a peer. Ignoring.' % from_addr)
-                        self.logger.debug('Ignored message: %s' % str(message))
+                if self.peer_messages:
+                    self._receive_peer(queues, *self.peer_messages.popleft())
 
                 # async recv group messages
-                if len(self.group_messages) > 0:
+                if self.group_messages:
                     if self.group is not None:  # otherwise, skip for now
-                        raw_msg, from_addr = self.group_messages.pop(0)
-                        if from_addr in self.group.addresses:
-                            from_whom = self.peers.find_by_address(from_addr)
-                            try:
-                                decrypt_msg = self.group.decrypt(raw_msg, self.group)
-                                if from_whom is not None:
-                                    self._msg_to_queue(decrypt_msg, from_whom, queues, 'group')
-                                else:
-                                    self.logger.error(
-                                        'Recvd transmission from %s - not in peers. Ignoring.' % from_addr)
-                                    self.logger.debug('Ignored message: %s' % str(message))
-                            except nacl.exceptions.CryptoError as e:
-                                name = from_addr
-                                if from_whom is not None:
-                                    name = '%s (%s)' % (from_whom.nickname, name)
-                                self.logger.error('CryptoError decrypting message from %s' % name)  # FIXME too often
-                        else:
-                            self.logger.error('Recvd transmission from %s - not in group. Ignoring.' % from_addr)
-                            self.logger.debug('Ignored message: %s' % str(message))
-                            # FIXME ask others in group
+                        self._receive_group(queues, *self.group_messages.popleft())
 
                 # async recv stranger messages (separate channel)
-                if len(self.unknown_messages) > 0:
-                    raw_msg, from_addr = self.unknown_messages.pop(0)
-                    self._msg_to_queue(raw_msg, from_addr, queues, 'multicast', validate=False)
+                if self.unknown_messages:
+                    self._handle_unknown(queues, *self.unknown_messages.popleft())
             except Exception as err:
                 self.logger.error(err)
                 self.logger.error(traceback.format_exc())
 
         self.stop = True
+        self._stop_crypto()
+        self.shutdown()
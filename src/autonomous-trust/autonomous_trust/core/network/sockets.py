@@ -0,0 +1,134 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import socket
+import threading
+from enum import Enum
+
+
+class SocketPurpose(Enum):
+    PEER = 'peer'
+    GROUP = 'group'
+    ANY = 'any'
+
+
+class SocketStats(object):
+    """Counters for send socket usage"""
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.sends = 0
+        self.errors = 0
+
+    @property
+    def churn_saved(self):
+        """Number of socket open/close pairs avoided by reuse"""
+        return max(self.sends - self.opened, 0)
+
+    def to_tuple(self):
+        return self.opened, self.closed, self.sends, self.errors, self.churn_saved
+
+
+class SendSocketPool(object):
+    """
+    Long-lived UDP send sockets, one per (address family, purpose)
+    Sockets are created on first use and shared by all threads of the owning process;
+    they are not carried across pickling, but recreated on demand afterward
+    """
+    def __init__(self, bind_address=None, options=None):
+        """
+        :param bind_address: local address to send from (None for any)
+        :param options: dict of SocketPurpose to list of setsockopt argument tuples
+        """
+        self.bind_address = bind_address
+        self.options = options
+        if options is None:
+            self.options = {}
+        self.stats = SocketStats()
+        self._sockets = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_sockets'] = {}
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def set_options(self, purpose, *opts):
+        self.options[purpose] = list(opts)
+
+    def _open(self, family, purpose):
+        sock = socket.socket(family, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        for opt in self.options.get(purpose, []):
+            sock.setsockopt(*opt)
+        if self.bind_address is not None:
+            sock.bind((self.bind_address, 0))
+        self.stats.opened += 1
+        return sock
+
+    def get(self, purpose, family=socket.AF_INET):
+        """
+        Get (or lazily create) the shared send socket
+        :param purpose: SocketPurpose
+        :param family: socket address family
+        :return: socket
+        """
+        key = (family, purpose)
+        sock = self._sockets.get(key)
+        if sock is None:
+            with self._lock:
+                sock = self._sockets.get(key)
+                if sock is None:
+                    sock = self._open(family, purpose)
+                    self._sockets[key] = sock
+        return sock
+
+    def sendto(self, msg, address, purpose, family=socket.AF_INET):
+        """
+        Send a datagram on the shared socket; on failure the socket is discarded and reopened on next use
+        :param msg: bytes
+        :param address: (host, port)
+        :param purpose: SocketPurpose
+        :param family: socket address family
+        :return: number of bytes sent
+        """
+        sock = self.get(purpose, family)
+        try:
+            sent = sock.sendto(msg, address)
+        except OSError:
+            self.stats.errors += 1
+            self.discard(purpose, family)
+            raise
+        self.stats.sends += 1
+        return sent
+
+    def discard(self, purpose, family=socket.AF_INET):
+        with self._lock:
+            sock = self._sockets.pop((family, purpose), None)
+            if sock is not None:
+                sock.close()
+                self.stats.closed += 1
+
+    def close(self):
+        with self._lock:
+            for sock in self._sockets.values():
+                sock.close()
+                self.stats.closed += 1
+            self._sockets = {}
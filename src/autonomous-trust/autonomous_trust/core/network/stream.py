@@ -0,0 +1,299 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class FramingError(ValueError):
+    pass
+
+
+class StreamFrame(object):
+    """
+    Message framing on a persistent stream connection
+
+    Line protocol:
+    =======================
+    | magic | size | data |
+    =======================
+    """
+    magic = b'AT'
+    header = struct.Struct('!2sI')
+    max_size = 64 * 1024 * 1024
+
+    @classmethod
+    def pack_header(cls, size: int) -> bytes:
+        if size > cls.max_size:
+            raise FramingError('Message of %d bytes exceeds %d' % (size, cls.max_size))
+        return cls.header.pack(cls.magic, size)
+
+    @classmethod
+    def unpack_header(cls, data) -> int:
+        magic, size = cls.header.unpack(data)
+        if magic != cls.magic:
+            raise FramingError('Bad frame magic %s' % bytes(magic))
+        if size > cls.max_size:
+            raise FramingError('Frame of %d bytes exceeds %d' % (size, cls.max_size))
+        return size
+
+
+def send_frame(sock, msg: bytes):
+    """
+    Send a framed message, gathering header and data without copying
+    :param sock: connected stream socket
+    :param msg: bytes
+    :return: None
+    """
+    views = [memoryview(StreamFrame.pack_header(len(msg))), memoryview(msg)]
+    while views:
+        sent = sock.sendmsg(views)
+        if sent == 0:
+            raise ConnectionError('Socket connection broken (no bytes sent)')
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views and sent > 0:
+            views[0] = views[0][sent:]
+
+
+class StreamStats(object):
+    """Counters for pooled connection usage"""
+    def __init__(self):
+        self.opened = 0
+        self.reused = 0
+        self.evicted = 0
+        self.errors = 0
+
+    def to_tuple(self):
+        return self.opened, self.reused, self.evicted, self.errors
+
+
+class ConnectionPool(object):
+    """
+    Persistent outgoing stream connections, keyed by (host, port)
+    Connections idle for longer than idle_timeout are closed, as is the least recently used beyond max_connections;
+    they are not carried across pickling, but reopened on demand afterward
+    """
+    def __init__(self, connect_timeout=1.0, idle_timeout=30.0, max_connections=64):
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.stats = StreamStats()
+        self._connections = OrderedDict()  # (host, port) -> [sock, last used]
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connections'] = OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._connections)
+
+    def _open(self, address):
+        sock = socket.create_connection(address, timeout=self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stats.opened += 1
+        return sock
+
+    def _close(self, address):
+        conn = self._connections.pop(address, None)
+        if conn is not None:
+            conn[0].close()
+
+    def evict_idle(self, when=None):
+        """
+        Close connections unused for idle_timeout seconds
+        :param when: monotonic time (default now)
+        :return: number of connections closed
+        """
+        if when is None:
+            when = time.monotonic()
+        with self._lock:
+            stale = [addr for addr, (_, last) in self._connections.items() if when - last > self.idle_timeout]
+            for address in stale:
+                self._close(address)
+            self.stats.evicted += len(stale)
+        return len(stale)
+
+    def send(self, msg: bytes, address):
+        """
+        Send a framed message on the pooled connection, reconnecting once if the pooled one has gone stale
+        :param msg: bytes
+        :param address: (host, port)
+        :return: None
+        """
+        with self._lock:
+            for attempt in range(2):
+                conn = self._connections.get(address)
+                fresh = conn is None
+                if fresh:
+                    try:
+                        conn = [self._open(address), 0]
+                    except OSError:
+                        self.stats.errors += 1
+                        raise
+                    self._connections[address] = conn
+                    while len(self._connections) > self.max_connections:
+                        self._close(next(iter(self._connections)))
+                        self.stats.evicted += 1
+                else:
+                    self.stats.reused += 1
+                self._connections.move_to_end(address)
+                try:
+                    send_frame(conn[0], msg)
+                    conn[1] = time.monotonic()
+                    return
+                except OSError:
+                    self.stats.errors += 1
+                    self._close(address)
+                    if fresh or attempt > 0:
+                        raise
+
+    def close(self):
+        with self._lock:
+            for sock, _ in self._connections.values():
+                sock.close()
+            self._connections = OrderedDict()
+
+
+class _Reader(object):
+    """Receive state of one connection: header, then a body read into a reusable buffer"""
+    def __init__(self, sock, address, buffer_size):
+        self.sock = sock
+        self.address = address
+        self.header = bytearray(StreamFrame.header.size)
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.header)
+        self.size = None
+        self.offset = 0
+        self.closed = False
+
+    def read(self):
+        """
+        Read what is available without blocking, until the peer closes
+        :return: list of complete messages
+        """
+        msgs = []
+        while True:
+            try:
+                count = self.sock.recv_into(self.view[self.offset:])
+            except (BlockingIOError, InterruptedError):
+                return msgs
+            if count == 0:
+                self.closed = True
+                return msgs
+            self.offset += count
+            if self.offset < len(self.view):
+                continue
+            if self.size is None:
+                self.size = StreamFrame.unpack_header(self.header)
+                if self.size > len(self.buffer):
+                    self.buffer = bytearray(self.size)
+                self.view = memoryview(self.buffer)[:self.size]
+                self.offset = 0
+                if self.size > 0:
+                    continue
+            msgs.append(bytes(self.view))
+            self.size = None
+            self.view = memoryview(self.header)
+            self.offset = 0
+
+
+class StreamReceiver(object):
+    """
+    Multiplexed receiver for every connection accepted on a listening socket
+    Connections persist; messages are read into preallocated per-connection buffers
+    """
+    buffer_size = 65536
+
+    def __init__(self, listen_sock):
+        self.listen_sock = listen_sock
+        self.errors = 0
+        self._selector = None
+        self._ready = deque()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_selector'] = None
+        state['_ready'] = deque()
+        return state
+
+    def __len__(self):
+        """Number of accepted connections"""
+        if self._selector is None:
+            return 0
+        return len(self._selector.get_map()) - 1
+
+    def _accept(self):
+        sock, address = self.listen_sock.accept()
+        sock.setblocking(False)
+        self._selector.register(sock, selectors.EVENT_READ, _Reader(sock, address[:2], self.buffer_size))
+
+    def _drop(self, reader):
+        self._selector.unregister(reader.sock)
+        reader.sock.close()
+
+    def poll(self, timeout, max_count=None):
+        """
+        Wait (up to timeout) for complete messages
+        :param timeout: seconds
+        :param max_count: maximum number of messages to return (None for all)
+        :return: list of (msg, address, port)
+        """
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.listen_sock, selectors.EVENT_READ, None)
+        deadline = time.monotonic() + timeout
+        while not self._ready:
+            remaining = deadline - time.monotonic()
+            for key, _ in self._selector.select(max(remaining, 0)):
+                if key.data is None:
+                    self._accept()
+                    continue
+                reader = key.data
+                try:
+                    for msg in reader.read():
+                        self._ready.append((msg, *reader.address))
+                except (OSError, FramingError):
+                    self.errors += 1
+                    reader.closed = True
+                if reader.closed:
+                    self._drop(reader)
+            if remaining <= 0:
+                break
+        batch = []
+        while self._ready and (max_count is None or len(batch) < max_count):
+            batch.append(self._ready.popleft())
+        return batch
+
+    def close(self):
+        if self._selector is not None:
+            for key in list(self._selector.get_map().values()):
+                if key.data is not None:
+                    key.data.sock.close()
+            self._selector.close()
+            self._selector = None
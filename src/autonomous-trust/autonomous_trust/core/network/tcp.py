@@ -18,19 +18,24 @@ import socket
 
 from .netprocess import NetworkProtocol, TransmissionError
 from .udp import UDPNetworkProcess
+from .stream import ConnectionPool, StreamReceiver, FramingError
 
 
 class TCPNetworkProcess(UDPNetworkProcess):
     """
     Implementation of NetworkProcess that uses TCP for point-to-point, and UDP for one-to-many
     Can use either multicast or broadcast for UDP
+    Point-to-point connections persist in a pool (closed when idle), carrying binary length-prefixed frames;
+    each listening socket multiplexes all of its accepted connections
     """
     mcast_ttl = 2
     rcv_backlog = 5
     net_proto = NetworkProtocol.IPV4
+    idle_timeout = 30.0
 
     def __init__(self, configurations, subsystems, log_q, acceptance_func=None, use_mcast=False, **kwargs):
-        super().__init__(configurations, subsystems, log_q, acceptance_func, **kwargs)
+        super().__init__(configurations, subsystems, log_q, acceptance_func, udp=False, use_mcast=use_mcast,
+                         **kwargs)
         bind_address = self.net_cfg.ip4
         self.recv_ptp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.recv_ptp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -56,34 +61,34 @@ class TCPNetworkProcess(UDPNetworkProcess):
         self.logger.info('Bound group recv to %s:%s' % (self.my_address, self.group_port))
         self.recv_grp_sock.listen(self.rcv_backlog)
 
-        self._init_mcast(use_mcast)
+        self.connections = ConnectionPool(self.socket_timeout * 10, self.idle_timeout)
+        self.peer_stream = StreamReceiver(self.recv_ptp_sock)
+        self.group_stream = StreamReceiver(self.recv_grp_sock)
+
+    @property
+    def io_stats(self):
+        stats = super().io_stats
+        stats['connections'] = self.connections.stats.to_tuple()
+        stats['stream_errors'] = (self.peer_stream.errors, self.group_stream.errors)
+        return stats
+
+    def shutdown(self):
+        opened, reused, evicted, errors = self.connections.stats.to_tuple()
+        self.logger.info('Connections: %d opened, %d reused, %d evicted, %d errors' % (opened, reused, evicted, errors))
+        self.connections.close()
+        self.peer_stream.close()
+        self.group_stream.close()
+        super().shutdown()
 
     def _send_tcp(self, msg, host, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            if not isinstance(msg, bytes):
-                msg = msg.encode(self.enc)
-            self.logger.debug('Solo connect to %s:%s' % (host, port))
-            try:
-                sock.connect((host, port))
-            except socket.error as err:
-                raise TransmissionError('Connect - ' + str(err))
-            try:
-                sent = sock.send(('%d|' % len(msg)).encode(self.enc))  # FIXME encoding
-            except socket.error as err:
-                raise TransmissionError('Send - ' + str(err))
-            if sent == 0:
-                raise TransmissionError("Socket connection broken (no bytes sent)")
-            total_sent = 0
-            while total_sent < len(msg):
-                try:
-                    sent = sock.send(msg[total_sent:])
-                except socket.error as err:
-                    raise TransmissionError(str(err))
-                if sent == 0:
-                    raise TransmissionError("Socket connection broken (no bytes sent)")
-                self.logger.debug('sending ...')
-                total_sent = total_sent + sent
-            self.logger.debug('Sent %s bytes' % total_sent)
+        if not isinstance(msg, bytes):
+            msg = msg.encode(self.enc)
+        self.connections.evict_idle()
+        try:
+            self.connections.send(msg, (host, port))
+        except (OSError, FramingError) as err:
+            raise TransmissionError('Send - ' + str(err))
+        self.logger.debug('Sent %s bytes' % len(msg))
 
     def send_peer(self, msg, host):
         self._send_tcp(msg, host, self.port)
@@ -91,35 +96,31 @@ class TCPNetworkProcess(UDPNetworkProcess):
     def send_group(self, msg, host):
         self._send_tcp(msg, host, self.group_port)
 
-    def _recv(self, sock):
-        byte = b''
-        size_bytes = byte
-        while byte != '|'.encode(self.enc):
-            size_bytes += byte
-            byte = sock.recv(1)
-        msg_len = int(size_bytes.decode(self.enc))
-        chunks = []
-        bytes_recvd = 0
-        while bytes_recvd < msg_len:
-            chunk = sock.recv(min(msg_len - bytes_recvd, 2048))
-            if chunk == b'':
-                raise TransmissionError("Socket connection broken (no bytes sent)")
-            chunks.append(chunk)
-            bytes_recvd += len(chunk)
-        return b''.join(chunks).decode(self.enc)
+    def _recv_stream(self, stream, accept, max_count):
+        batch = []
+        for msg, addr, port in stream.poll(self.socket_timeout, max_count):
+            if addr == self.my_address:
+                batch.append((None, None, None))  # my own message
+            elif not accept(addr):
+                batch.append((None, addr, port))  # reject
+            else:
+                batch.append((msg, addr, port))
+        return batch
+
+    def _recv_one(self, stream, accept):
+        batch = self._recv_stream(stream, accept, 1)
+        if not batch:
+            raise TimeoutError
+        return batch[0]
 
     def recv_peer(self):
-        (clientsock, (addr, port)) = self.recv_ptp_sock.accept()
-        if addr == self.my_address:
-            return None, None, None  # my own message
-        if not self.accept_peer_message(addr):
-            return None, addr, port  # reject
-        return self._recv(clientsock), addr, port
+        return self._recv_one(self.peer_stream, self.accept_peer_message)
 
     def recv_group(self):
-        (clientsock, (addr, port)) = self.recv_grp_sock.accept()
-        if addr == self.my_address:
-            return None, None, None  # my own message
-        if not self.accept_group_message(addr):
-            return None, addr, port  # reject
-        return self._recv(clientsock), addr, port
+        return self._recv_one(self.group_stream, self.accept_group_message)
+
+    def recv_peer_batch(self):
+        return self._recv_stream(self.peer_stream, self.accept_peer_message, self.max_batch)
+
+    def recv_group_batch(self):
+        return self._recv_stream(self.group_stream, self.accept_group_message, self.max_batch)
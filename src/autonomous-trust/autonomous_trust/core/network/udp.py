@@ -16,8 +16,12 @@
 
 import socket
 import struct
+from collections import defaultdict, deque
 
 from .netprocess import NetworkProcess, NetworkProtocol, TransmissionError
+from .sockets import SendSocketPool, SocketPurpose
+from .batch import BatchFrame, Outbox, recv_all
+from .fragment import Fragment, Fragmenter, Reassembler, FragmentStats
 
 
 class UDPNetworkProcess(NetworkProcess):
@@ -27,6 +31,8 @@ class UDPNetworkProcess(NetworkProcess):
     """
     mcast_ttl = 2
     net_proto = NetworkProtocol.IPV4
+    batch_io = True  # otherwise, one datagram per recv and no coalescing
+    fragment_size = 1472  # largest payload in a 1500 byte Ethernet frame
 
     def __init__(self, configurations, subsystems, log_q, acceptance_func=None, udp=True, use_mcast=False, **kwargs):
         super().__init__(configurations, subsystems, log_q, acceptance_func, **kwargs)
@@ -34,6 +40,12 @@ class UDPNetworkProcess(NetworkProcess):
         self.packet_size = 65507
         self.my_address = self.net_cfg.ip4
         self.group_port = self.port + 1
+        self.send_sockets = SendSocketPool(self.my_address)
+        self.outbox = Outbox(self.fragment_size)
+        self.fragment_stats = FragmentStats()
+        self.fragmenter = Fragmenter(self.fragment_size, self.fragment_stats)
+        self.reassembler = Reassembler(stats=self.fragment_stats)
+        self._unread = defaultdict(deque)  # socket fileno -> messages already unpacked, for recv_peer() etc.
         if udp:
             self._init_udp_ptp()
             self._init_udp_grp()
@@ -55,6 +67,7 @@ class UDPNetworkProcess(NetworkProcess):
         if use_mcast:
             self.manycast_packet_size = 65527
             self.sock_options = (socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.mcast_ttl)
+            self.send_sockets.set_options(SocketPurpose.ANY, self.sock_options)
             self.manycast_addr = self.net_cfg.multicast_v4_address
             self.recv_cast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
             self.recv_cast_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -68,44 +81,88 @@ class UDPNetworkProcess(NetworkProcess):
         else:
             self.manycast_packet_size = 65507
             self.sock_options = (socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self.send_sockets.set_options(SocketPurpose.ANY, self.sock_options)
             self.manycast_addr = self.net_cfg.ip4_broadcast
             self.recv_cast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
             self.recv_cast_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.recv_cast_sock.bind((self.manycast_addr, self.port))
             self.logger.info('Bound any recv to %s:%s' % self.recv_cast_sock.getsockname())
 
-    def _send_udp(self, msg, host, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as sock:
-            if not isinstance(msg, bytes):
-                msg = msg.encode(self.enc)
-            sent = sock.sendto(msg, (host, port))
-            if sent == 0:
-                raise TransmissionError("Socket connection broken (no bytes sent)")
+    @property
+    def socket_stats(self):
+        """Send socket counters: opened, closed, sends, errors, churn saved"""
+        return self.send_sockets.stats.to_tuple()
+
+    @property
+    def io_stats(self):
+        stats = super().io_stats
+        stats.update({'sockets': self.socket_stats, 'fragments': self.fragment_stats.to_tuple()})
+        return stats
+
+    def shutdown(self):
+        self.logger.info('Send sockets: %d opened, %d closed, %d sends, %d errors, %d reopens avoided' %
+                         self.socket_stats)
+        self.send_sockets.close()
+
+    def _send_udp(self, msg, host, port, purpose=SocketPurpose.PEER):
+        if not isinstance(msg, bytes):
+            msg = msg.encode(self.enc)
+        if len(msg) > self.fragment_size or Fragment.is_fragment(msg):
+            try:
+                fragments = self.fragmenter.split(msg)
+            except ValueError as err:
+                raise TransmissionError('Send - ' + str(err))
+            for fragment in fragments:  # never coalesced, so that none exceeds the MTU
+                self._transmit(fragment, host, port, purpose)
+            return
+        if self.outbox.active:
+            self.outbox.add((host, port, purpose), msg)
+            return
+        self._transmit(msg, host, port, purpose)
+
+    def _transmit(self, msg, host, port, purpose):
+        try:
+            sent = self.send_sockets.sendto(msg, (host, port), purpose)
+        except OSError as err:
+            raise TransmissionError('Send - ' + str(err))
+        if sent == 0:
+            raise TransmissionError("Socket connection broken (no bytes sent)")
 
     def send_peer(self, msg, host):
-        if len(msg) > self.packet_size:
-            msg = msg[:self.packet_size-1]
         self._send_udp(msg, host, self.port)
 
     def send_group(self, msg, host):
-        self._send_udp(msg, host, self.group_port)
+        self._send_udp(msg, host, self.group_port, SocketPurpose.GROUP)
 
     def send_any(self, msg):
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as sock:
-            if not isinstance(msg, bytes):
-                msg = msg.encode(self.enc)
-            sock.setsockopt(*self.sock_options)
-            sent = sock.sendto(msg, (self.manycast_addr, self.port))
-            if sent == 0:
-                raise TransmissionError("Socket connection broken (no bytes sent)")
+        self._send_udp(msg, self.manycast_addr, self.port, SocketPurpose.ANY)
+
+    def begin_batch(self):
+        self.outbox.active = self.batch_io
+
+    def flush(self):
+        self.outbox.active = False
+        failures = []
+        for (host, port, purpose), datagram, count in self.outbox.drain():
+            try:
+                self._transmit(datagram, host, port, purpose)
+            except TransmissionError as err:
+                self.logger.error('Network: %s' % err)
+                failures.append((host, count))
+        return failures
 
     def _recv_udp(self, sock, packet_size):
-        msg, (addr, port) = sock.recvfrom(packet_size)
-        if addr == self.my_address:
-            return None, None, None  # my own message
-        if self.reject_message(addr):
-            return None, addr, port  # reject
-        return msg, addr, port
+        """
+        One message, reassembled and unbatched as by the recv_*_batch methods
+        Others from the same datagram are kept for the next calls.
+        """
+        unread = self._unread[sock.fileno()]
+        while not unread:
+            msg, (addr, port) = sock.recvfrom(packet_size)
+            if addr == self.my_address:
+                return None, None, None  # my own message
+            unread.extend(self._unpack_datagram(msg, addr, port))
+        return unread.popleft()
 
     def recv_peer(self):
         return self._recv_udp(self.recv_ptp_sock, self.packet_size)
@@ -115,3 +172,40 @@ class UDPNetworkProcess(NetworkProcess):
 
     def recv_any(self):
         return self._recv_udp(self.recv_cast_sock, self.manycast_packet_size)
+
+    def _unpack_datagram(self, msg, addr, port):
+        """
+        Filter a received datagram and split it into messages
+        :param msg: datagram bytes
+        :param addr: sender address
+        :param port: sender port
+        :return: list of (msg, address, port), msg is None if rejected
+        """
+        if addr == self.my_address:
+            return []  # my own message
+        if self.reject_message(addr):
+            return [(None, addr, port)]  # reject
+        batch = []
+        for part in BatchFrame.unpack(msg):
+            if Fragment.is_fragment(part):
+                part = self.reassembler.add(addr, part)
+                if part is None:
+                    continue  # incomplete
+            batch.append((part, addr, port))
+        return batch
+
+    def _recv_udp_batch(self, sock, packet_size):
+        batch = []
+        max_count = self.max_batch if self.batch_io else 1
+        for msg, (addr, port) in recv_all(sock, packet_size, max_count):
+            batch += self._unpack_datagram(msg, addr, port)
+        return batch
+
+    def recv_peer_batch(self):
+        return self._recv_udp_batch(self.recv_ptp_sock, self.packet_size)
+
+    def recv_group_batch(self):
+        return self._recv_udp_batch(self.recv_grp_sock, self.packet_size)
+
+    def recv_any_batch(self):
+        return self._recv_udp_batch(self.recv_cast_sock, self.manycast_packet_size)
@@ -17,6 +17,7 @@
 import os
 import queue
 import sys
+import threading
 import logging
 import time
 import traceback
@@ -26,32 +27,135 @@ from collections.abc import Mapping
 from collections import OrderedDict
 
 from enum import IntEnum
-from typing import Any
+from typing import Any, Callable, Optional
 
+import psutil
 from ruamel.yaml import YAML
 
 from .config import Configuration
-from .system import cadence, queue_cadence, now, QueueType
+from .system import CfgIds, cadence, queue_cadence, now, QueueType
+from .metrics import MetricsRegistry, MetricsReport
 
 yaml = YAML(typ='safe')
 
 
+class SchedulingPolicy(object):
+    """
+    Where a subsystem (or the task pool) runs: CPU affinity, niceness, and whether it gets a pool of its own
+    In subsystems.yaml, in place of the class name: {class: <class name>, cpus: [0, 1], nice: 5, pool: dedicated}
+    """
+    SHARED = 'shared'
+    DEDICATED = 'dedicated'
+
+    def __init__(self, cpus: Optional[list[int]] = None, nice: Optional[int] = None, pool: str = SHARED):
+        self.cpus = cpus
+        self.nice = nice
+        if pool not in (self.SHARED, self.DEDICATED):
+            raise ValueError('Unknown pool type %s' % pool)
+        self.pool = pool
+
+    @property
+    def dedicated(self):
+        return self.pool == self.DEDICATED
+
+    def __bool__(self):
+        return self.cpus is not None or self.nice is not None or self.dedicated
+
+    def to_dict(self):
+        d = {}
+        if self.cpus is not None:
+            d['cpus'] = list(self.cpus)
+        if self.nice is not None:
+            d['nice'] = self.nice
+        if self.dedicated:
+            d['pool'] = self.pool
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get('cpus'), d.get('nice'), d.get('pool', cls.SHARED))
+
+    def apply(self) -> list[str]:
+        """
+        Apply to the calling process
+        :return: list of errors, empty if all went well
+        """
+        errors = []
+        proc = psutil.Process()
+        if self.cpus is not None:
+            try:
+                proc.cpu_affinity(self.cpus)
+            except (AttributeError, ValueError, psutil.Error) as err:  # AttributeError: unsupported platform
+                errors.append('cpus %s: %s' % (self.cpus, err or err.__class__.__name__))
+        if self.nice is not None:
+            try:
+                proc.nice(self.nice)
+            except psutil.Error as err:  # lowering niceness needs privileges
+                errors.append('nice %s: %s' % (self.nice, err or err.__class__.__name__))
+        return errors
+
+    @staticmethod
+    def placement() -> str:
+        """Effective placement of the calling process"""
+        proc = psutil.Process()
+        try:
+            cpus = proc.cpu_affinity()
+        except AttributeError:
+            cpus = 'any'
+        return 'pid %d, cpus %s, nice %d' % (proc.pid, cpus, proc.nice())
+
+
+def apply_policy(policy: Optional[SchedulingPolicy], name: str, log_queue: QueueType):
+    """
+    Apply a scheduling policy in a worker process and report the outcome to the main process
+    Usable as a Pool initializer.
+    :param policy: SchedulingPolicy or None
+    :param name: reported name
+    :param log_queue: main process log queue (not suppressible)
+    :return: None
+    """
+    errors = []
+    if policy:
+        errors = policy.apply()
+    if log_queue is not None:
+        logger = ProcessLogger(name, log_queue)
+        logger.info('Placement: %s' % SchedulingPolicy.placement())
+        for error in errors:
+            logger.warning('Placement failed, %s' % error)
+        logger.flush()
+
+
 class ProcessTracker(Mapping):
     default_filename = 'subsystems.yaml'
+    tasks = 'tasks'  # key for the task pool scheduling policy
 
     def __init__(self):
         #self.message = processes_pb2.ProcessTracker()
         self._classes = []
         self._registry = OrderedDict()
         self._order = []
+        self.policies: dict[str, SchedulingPolicy] = {}
 
     @property
     def classes(self):
         d = OrderedDict()
         for k, v in self._classes:
+            policy = self.policies.get(k)
+            if policy:
+                v = {'class': v, **policy.to_dict()}
             d[k] = v
+        if self.policies.get(self.tasks):
+            d[self.tasks] = self.policies[self.tasks].to_dict()
         return d
 
+    def policy(self, cfg_name: str) -> SchedulingPolicy:
+        """
+        Scheduling policy for a subsystem, or ProcessTracker.tasks
+        :param cfg_name: subsystem name
+        :return: SchedulingPolicy, default if not configured
+        """
+        return self.policies.get(cfg_name, SchedulingPolicy())
+
     @property
     def ordered(self):
         return self._order
@@ -60,7 +164,11 @@ class ProcessTracker(Mapping):
     def names(self):
         return self._registry
 
-    def register_subsystem(self, cfg_name, class_spec):
+    def register_subsystem(self, cfg_name, class_spec, policy: SchedulingPolicy = None):
+        if policy:
+            self.policies[cfg_name] = policy
+        if cfg_name == self.tasks:
+            return
         self._classes.append((cfg_name, class_spec))
         module_name, class_name = class_spec.rsplit('.', 1)
         try:
@@ -92,7 +200,11 @@ class ProcessTracker(Mapping):
     def from_yaml_string(self, yml):
         name_dict = yaml.load(yml)
         for cfg, proc in name_dict.items():
-            self.register_subsystem(cfg, proc)
+            policy = None
+            if isinstance(proc, dict):
+                policy = SchedulingPolicy.from_dict(proc)
+                proc = proc.get('class')
+            self.register_subsystem(cfg, proc, policy)
 
     def from_file(self, filename=None):
         with open(self._validate_path(filename), 'r') as spec:
@@ -101,6 +213,9 @@ class ProcessTracker(Mapping):
     def __getitem__(self, key):
         return self._registry[key]
 
+    def __contains__(self, key):
+        return key in self._registry
+
     def __len__(self):
         return len(self._registry)
 
@@ -139,6 +254,9 @@ class Process(metaclass=ProcMeta):
     cadence = cadence
     q_cadence = queue_cadence
     exit_timeout = 5
+    batch_size = 64  # messages handled per wakeup
+    stats_interval = 60  # seconds between dispatch statistics in the log
+    metrics_interval = 10  # seconds between metrics reports to the main process
 
     def __init__(self, configurations: dict[str, Any], subsystems: ProcessTracker, log_queue: QueueType,
                  dependencies: list[str] = None, log_level=LogLevel.INFO, suppress_log=False):
@@ -154,10 +272,17 @@ class Process(metaclass=ProcMeta):
         self.log_level = log_level
         if Process.level in self.configs:
             self.log_level = self.configs[Process.level]
-        self.logger = ProcessLogger(self.__class__.__name__, log_queue, suppress_log)
+        self.logger = ProcessLogger(self.__class__.__name__, log_queue, suppress_log, self.log_level)
         self.loop_start = None
         self.mocks = []  # list of Mockery objs
         self.package_hash = None
+        self.metrics = MetricsRegistry()
+        self.queue_depth = self.metrics.gauge('queue_depth')
+        self.messages_handled = self.metrics.counter('messages_handled')
+        self.handler_latency = self.metrics.histogram('handler_seconds')
+        self.log_dropped = self.metrics.counter('log_dropped')
+        self._stats_logged = None
+        self._metrics_reported = None
 
     def __getstate__(self):
         state = self.__dict__.copy()
@@ -182,6 +307,7 @@ class Process(metaclass=ProcMeta):
                 running = False
         except queue.Empty:
             pass
+        self.logger.flush(force=not running)
         self.loop_start = now()
         return running
 
@@ -190,6 +316,130 @@ class Process(metaclass=ProcMeta):
         if delta > 0:
             time.sleep(delta)
 
+    def dispatch_messages(self, queues: dict[str, QueueType], handler: Callable = None) -> int:
+        """
+        Handle incoming messages until this loop's cadence is up; takes the place of get() and sleep_until()
+        Sleeps only while the queue is empty, then drains up to batch_size messages at a time.
+        :param queues: IPC queues, this process's own is read
+        :param handler: callable(queues, message), default handle_message
+        :return: number of messages handled
+        """
+        if handler is None:
+            handler = self.handle_message
+        if self.loop_start is None:
+            self.loop_start = now()
+        q = queues[self.name]
+        handled = 0
+        while True:
+            remaining = self.cadence - (now() - self.loop_start).total_seconds()
+            if remaining <= 0 and handled > 0:
+                break
+            try:
+                batch = [q.get(block=remaining > 0, timeout=max(remaining, 0))]
+            except queue.Empty:
+                break
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                pass
+            self._track_backlog(q, len(batch))
+            for message in batch:
+                if message is None:
+                    continue
+                start = time.perf_counter()
+                try:
+                    handler(queues, message)
+                except Exception as err:
+                    self.report_exception(err, 'dispatch')
+                self.handler_latency.add(time.perf_counter() - start)
+            handled += len(batch)
+        self.messages_handled.inc(handled)
+        self._log_stats()
+        self.report_metrics(queues)
+        return handled
+
+    def handle_message(self, queues: dict[str, QueueType], message):
+        """
+        Override for messages that the protocol handlers do not cover
+        :param queues: IPC queues
+        :param message: from this process's queue
+        :return: None
+        """
+        if not self.protocol.run_message_handlers(queues, message):  # noqa
+            self.unhandled(message)
+
+    def unhandled(self, message):
+        if hasattr(message, 'function'):
+            self.logger.error('Unhandled message %s' % message.function)
+        else:
+            self.logger.error('Unhandled message of type %s' % message.__class__.__name__)
+
+    def _track_backlog(self, q: QueueType, taken: int):
+        backlog = taken
+        if taken == self.batch_size:
+            try:
+                backlog += q.qsize()
+            except NotImplementedError:  # multiprocessing.Queue on macOS
+                pass
+        self.queue_depth.set(backlog)
+
+    @property
+    def backlog(self):
+        return self.queue_depth.value
+
+    @property
+    def max_backlog(self):
+        return self.queue_depth.peak
+
+    @property
+    def handled(self):
+        return self.messages_handled.value
+
+    @property
+    def dispatch_stats(self):
+        """
+        Backlog (last, max), messages handled, histogram of handler latency, and log records dropped
+        :return: dict of name to tuple
+        """
+        return {'%s_backlog' % self.name: (self.backlog, self.max_backlog),
+                '%s_handled' % self.name: (self.handled,),
+                '%s_latency' % self.name: self.handler_latency.to_tuple(),
+                '%s_log_dropped' % self.name: (self.logger.dropped,)}
+
+    def _log_stats(self):
+        if self._stats_logged is None:
+            self._stats_logged = self.loop_start
+        if (now() - self._stats_logged).total_seconds() >= self.stats_interval:
+            self._stats_logged = now()
+            self.logger.debug('Dispatch: %s' % self.dispatch_stats)
+
+    def collect_metrics(self):
+        """
+        Override to bring metrics kept elsewhere up to date, just before a report
+        :return: None
+        """
+        self.log_dropped.value = self.logger.dropped
+
+    def report_metrics(self, queues: dict[str, QueueType]):
+        """
+        Send a snapshot of this process's metrics to the main process, at most every metrics_interval
+        Called by dispatch_messages(), loops that do not use it should call this themselves.
+        :param queues: IPC queues
+        :return: None
+        """
+        if CfgIds.main not in queues:
+            return
+        current = time.monotonic()
+        if self._metrics_reported is not None and current - self._metrics_reported < self.metrics_interval:
+            return
+        self._metrics_reported = current
+        self.collect_metrics()
+        try:
+            queues[CfgIds.main].put_nowait(MetricsReport(self.name, self.metrics.snapshot()))
+        except queue.Full:
+            pass
+
     def update(self, msg, queues):
         for name, q in queues.items():
             if name != self.name:
@@ -200,23 +450,71 @@ class Process(metaclass=ProcMeta):
 
 
 class ProcessLogger(object):
-    def __init__(self, name, log_q, suppress=False):
+    """
+    Logger for subsystems; records below the level are dropped at the source, the rest are shipped to the main
+    process log queue in batches, as lists of (level, name, msg)
+    A batch is shipped when full, when flush_interval has passed, or at once for warnings and above.
+    Records that cannot be shipped are counted in dropped rather than raising into the caller.
+    Safe to share between threads.
+    """
+    batch_size = 32
+    flush_interval = 0.5  # seconds
+
+    def __init__(self, name, log_q, suppress=False, level=LogLevel.VERBOSE):
         self.name = name
         self.log_queue = log_q
         self.logger = logging.getLogger(name)
         self.suppress = suppress
+        self.level = level
+        self.dropped = 0
+        self._buffer = []
+        self._shipped = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
 
-    def flush(self):
-        if self.logger.handlers:
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def enabled_for(self, level):
+        return not self.suppress and level >= self.level
+
+    def flush(self, force=True):
+        """
+        Ship buffered records
+        :param force: ship even if the batch is neither full nor due
+        :return: None
+        """
+        with self._lock:
+            if self._buffer and (force or len(self._buffer) >= self.batch_size or
+                                 time.monotonic() - self._shipped >= self.flush_interval):
+                self._ship()
+        if force and self.logger.handlers:
             self.logger.handlers[0].flush()
 
+    def _ship(self):  # with the lock held
+        batch, self._buffer = self._buffer, []
+        self._shipped = time.monotonic()
+        try:
+            self.log_queue.put_nowait(batch)
+        except (queue.Full, EOFError, OSError):  # full, or main process already gone
+            self.dropped += len(batch)
+
     def log(self, level, msg):
-        if self.suppress:
+        if not self.enabled_for(level):
             return
-        if self.log_queue is not None:
-            self.log_queue.put((level, self.name, msg), block=True, timeout=0.001)
-        else:
+        if self.log_queue is None:
             self.logger.log(level, msg)
+            return
+        with self._lock:
+            self._buffer.append((level, self.name, msg))
+            if level >= LogLevel.WARNING or len(self._buffer) >= self.batch_size or \
+                    time.monotonic() - self._shipped >= self.flush_interval:
+                self._ship()
 
     def verbose(self, msg):
         self.log(LogLevel.VERBOSE, msg)
@@ -27,6 +27,14 @@ from .capabilities import Capabilities, PeerCapabilities
 
 
 class Protocol(object, metaclass=ClassEnumMeta):
+    # configuration updates: type -> attribute it replaces
+    config_types = {Group: 'group', Peers: 'peers', Capabilities: 'capabilities', PeerCapabilities: 'peer_capabilities'}
+    _dispatch_types = {}  # message type -> attribute or None, including subclasses of config_types
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Message.intern(*[getattr(cls, attr) for attr in cls if isinstance(getattr(cls, attr), str)])
+
     def __init__(self, proc_name: str, logger: logging.Logger, configurations: Optional[dict[str, Any]]):
         self.proc_name = proc_name
         self.logger = logger
@@ -46,24 +54,42 @@ class Protocol(object, metaclass=ClassEnumMeta):
     def register_handler(self, func_name: str, handler):
         self.handlers[func_name] = handler
 
-    @icontract.require(lambda queues: len(queues) > 0)
-    @icontract.require(lambda message: message is not None)
+    @classmethod
+    def _config_attribute(cls, msg_type: type) -> Optional[str]:
+        try:
+            return cls._dispatch_types[msg_type]
+        except KeyError:
+            attr = None
+            for base in msg_type.__mro__:
+                if base in cls.config_types:
+                    attr = cls.config_types[base]
+                    break
+            cls._dispatch_types[msg_type] = attr
+            return attr
+
+    @icontract.require(lambda queues: len(queues) > 0, enabled=icontract.SLOW)
+    @icontract.require(lambda message: message is not None, enabled=icontract.SLOW)
     def run_message_handlers(self, queues: dict[str, QueueType], message: Message):
-        if isinstance(message, Group):
-            self.group = message
-            return True
-        if isinstance(message, Peers):
-            self.peers = message
-            return True
-        if isinstance(message, Capabilities):
-            self.capabilities = message
-            return True
-        if isinstance(message, PeerCapabilities):
-            self.peer_capabilities = message
+        """
+        Apply a configuration update, or pass a Message for this process to the handler for its function
+        Contracts are only checked with ICONTRACT_SLOW set (and not under python -O).
+        :param queues: IPC queues
+        :param message: Message or configuration object
+        :return: whether the message was handled
+        """
+        if type(message) is Message:
+            if message.process != self.proc_name:
+                return False
+            handler = self.handlers.get(message.function)
+            if handler is None:
+                return False
+            return handler(queues, message)
+        attr = self._config_attribute(type(message))
+        if attr is not None:
+            setattr(self, attr, message)
             return True
-        if isinstance(message, Message):
-            if message.process == self.proc_name:
-                for name, handler in self.handlers.items():
-                    if name == message.function:
-                        return self.handlers[name](queues, message)
+        if isinstance(message, Message) and message.process == self.proc_name:  # Message subclasses
+            handler = self.handlers.get(message.function)
+            if handler is not None:
+                return handler(queues, message)
         return False
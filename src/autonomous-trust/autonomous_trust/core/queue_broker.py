@@ -0,0 +1,96 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import queue
+import threading
+from multiprocessing.managers import SyncManager, BaseProxy
+
+
+class QueueBroker(object):
+    """
+    Hands out queues on demand, reusing released ones
+    Multiprocess: runs inside a BrokerManager, so that its proxy (picklable, unlike the manager)
+    can create queues from any process at any time. Threads: use directly.
+    """
+    max_idle = 16  # released queues kept for reuse, beyond that they are dropped
+
+    def __init__(self):
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.live = 0
+
+    def acquire(self):
+        """
+        An empty queue, reused if possible
+        :return: Queue (proxy)
+        """
+        with self._lock:
+            self.live += 1
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return queue.Queue()
+
+    def release(self, q):
+        """
+        Return a queue for reuse; leftover items are discarded
+        :param q: Queue from acquire()
+        :return: None
+        """
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            self.live -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(q)
+
+    def stats(self):
+        """Live queues, idle queues, queues ever created"""
+        with self._lock:
+            return self.live, len(self._idle), self.created
+
+
+class QueueBrokerProxy(BaseProxy):
+    """Proxy for a QueueBroker that can be passed to other processes"""
+    _exposed_ = ('acquire', 'release', 'stats')
+    _method_to_typeid_ = {'acquire': 'BrokeredQueue'}
+
+    def acquire(self):
+        if self._manager is None:  # unpickled in another process, but still needs a manager to build Queue proxies
+            manager = BrokerManager(address=self._token.address, authkey=self._authkey)
+            manager.connect()
+            self._manager = manager
+        return self._callmethod('acquire')
+
+    def release(self, q):
+        return self._callmethod('release', (q,))
+
+    def stats(self):
+        return self._callmethod('stats')
+
+
+class BrokerManager(SyncManager):
+    """Manager that also serves a QueueBroker"""
+    pass
+
+
+BrokerManager.register('QueueBroker', QueueBroker, QueueBrokerProxy)
+BrokerManager.register('BrokeredQueue', create_method=False)  # proxies queues the broker already made
+
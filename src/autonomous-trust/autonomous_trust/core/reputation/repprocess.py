@@ -18,13 +18,13 @@ import os
 import threading
 import time
 import traceback
-from queue import Empty, Full
+from queue import Full
 from uuid import UUID
 from dataclasses import dataclass
 
 from ..network import Message
 from ..processes import Process, ProcMeta
-from ..config import Configuration, from_yaml_string, to_yaml_string
+from ..config import Configuration, from_payload
 from .protocol import ReputationProtocol
 from .reputation import TransactionHistory, Reputation, Reputations, TransactionScore
 from ..system import CfgIds, now, encoding
@@ -85,15 +85,15 @@ class ReputationProcess(Process, metaclass=ProcMeta,
 
     def handle_request(self, queues, message):
         if message.function == ReputationProtocol.request:
-            id1, id2, peer_id = from_yaml_string(message.obj)
-            if peer_id in [p.uuid for p in self.peers.all]:
+            id1, id2, peer_id = from_payload(message.obj)
+            if self.peers.find_by_uuid(peer_id) is not None:
                 try:
                     if self.last_id is None or self.last_id < id1:
                         if len(self.history) + 1 == id2:
                             self.requests.append(self._paxos_id_index(id1, id2))
                             ack = ((id1, id2, peer_id), (self.last_id, len(self.history)), self.last_value)
                             msg = Message(self.name, ReputationProtocol.grant,
-                                          to_yaml_string(ack), message.from_whom)
+                                          ack, message.from_whom)
                             queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                             self.logger.debug('Request granted')
                         else:
@@ -128,7 +128,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
 
     def handle_grant(self, queues, message):
         if message.function == ReputationProtocol.grant:
-            (id1, id2, peer_id), (last_id, last_idx), last_val = from_yaml_string(message.obj)
+            (id1, id2, peer_id), (last_id, last_idx), last_val = from_payload(message.obj)
             if peer_id != self.identity.uuid:  # ignore not-mine
                 self.logger.debug('Grant not for me')
                 return True
@@ -142,7 +142,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
             if self.my_requests[idx].count >= len(self.peers.all) // 2:
                 try:
                     score = (id1, id2, peer_id), self.my_requests[idx].score
-                    msg = Message(self.name, ReputationProtocol.transaction, to_yaml_string(score), self.group)
+                    msg = Message(self.name, ReputationProtocol.transaction, score, self.group)
                     queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                     self.logger.debug('Submit transaction score')
                     if idx in self.backoff:
@@ -164,7 +164,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
 
     def handle_nack(self, queues, message):
         if message.function == ReputationProtocol.nack:
-            id1, id2, _ = from_yaml_string(message.obj)
+            id1, id2, _ = from_payload(message.obj)
             idx = self._paxos_id_index(id1, id2)
             if idx not in self.backoff:
                 self.backoff[idx] = 1
@@ -196,14 +196,14 @@ class ReputationProcess(Process, metaclass=ProcMeta,
         idx = self._paxos_id_index(id1, id2)
         pax_id = (id1, id2, self.identity.uuid)
         self.my_requests[idx] = TxCount(score, 0)
-        pax_msg = Message(self.name, ReputationProtocol.request, to_yaml_string(pax_id), self.group)
+        pax_msg = Message(self.name, ReputationProtocol.request, pax_id, self.group)
         queues[CfgIds.network].put(pax_msg, block=True, timeout=self.q_cadence)
         self.proposals[idx] = score
         self.logger.debug('Start a Paxos round')
 
     def handle_transaction(self, queues, message):
         if message.function == ReputationProtocol.transaction:
-            (id1, id2, peer_id), score = from_yaml_string(message.obj)
+            (id1, id2, peer_id), score = from_payload(message.obj)
             idx = self._paxos_id_index(id1, id2)
             if idx not in self.requests:
                 return True  # not granted, drop
@@ -213,7 +213,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
                 self.proposals[idx] = score
                 self.logger.debug("Tx to proposals ")
             msg = Message(self.name, ReputationProtocol.accepted,
-                          to_yaml_string((id1, id2, peer_id)), message.from_whom)
+                          (id1, id2, peer_id), message.from_whom)
             queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
             return True
         return False
@@ -230,7 +230,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
 
     def handle_accepted(self, _, message):
         if message.function == ReputationProtocol.accepted:
-            id1, id2, peer_id = from_yaml_string(message.obj)
+            id1, id2, peer_id = from_payload(message.obj)
             idx = self._paxos_id_index(id1, id2)
             score = self.proposals[idx]
             self.logger.debug('Tx accepted')
@@ -252,7 +252,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
                 if isinstance(length, bytes):
                     length = length.decode(encoding)
                 index = int(length)
-                chain = to_yaml_string(self.history.era(index))
+                chain = self.history.era(index)
                 msg = Message(self.name, ReputationProtocol.update, chain, message.from_whom)
                 queues[CfgIds.network].put(msg, block=True, timeout=self.q_cadence)
                 self.logger.debug('Sent update')
@@ -263,7 +263,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
 
     def handle_update(self, queues, message):
         if message.function == ReputationProtocol.update:
-            self.updates[message.from_whom.uuid] = from_yaml_string(message.obj)
+            self.updates[message.from_whom.uuid] = from_payload(message.obj)
             up_count = len(self.updates)
             if up_count >= self.num_updates:
                 grouping = []
@@ -343,10 +343,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
 
     def handle_reputation_request(self, _, message):
         if message.function == ReputationProtocol.rep_req:
-            if isinstance(message.obj, str):
-                ident, req_proc = from_yaml_string(message.obj)
-            else:
-                ident, req_proc = message.obj
+            ident, req_proc = from_payload(message.obj)
             threading.Thread(target=self._compute_reputation,
                              args=(ident, req_proc, message.from_whom), daemon=True).start()
             return True
@@ -362,20 +359,14 @@ class ReputationProcess(Process, metaclass=ProcMeta,
             except Full:
                 self.logger.error('forward_reputation: %s queue full' % req_proc)
 
+    def handle_message(self, queues, message):
+        if not self.protocol.run_message_handlers(queues, message):
+            if not self.forward_transaction(queues, message):
+                self.unhandled(message)
+
     def process(self, queues, signal):
         while self.keep_running(signal):
             try:
-                try:
-                    message = queues[self.name].get(block=True, timeout=self.q_cadence)
-                except Empty:
-                    message = None
-                if message:
-                    if not self.protocol.run_message_handlers(queues, message):
-                        if not self.forward_transaction(queues, message):
-                            if isinstance(message, Message):
-                                self.logger.error('Unhandled message %s' % message.function)
-                            else:
-                                self.logger.error('Unhandled message of type %s' % message.__class__.__name__)  # noqa
                 self.forward_reputation(queues)
 
                 present = now().timestamp()
@@ -386,7 +377,7 @@ class ReputationProcess(Process, metaclass=ProcMeta,
                     if present - int(prop) > self.expiration:
                         del self.proposals[prop]
 
-                self.sleep_until(self.cadence)
+                self.dispatch_messages(queues)
             except Exception as err:
                 self.logger.error(err)
                 self.logger.error(traceback.format_exc())
@@ -18,13 +18,24 @@ from collections.abc import Mapping
 from uuid import UUID
 
 from ..config import Configuration
+from ..config.wire import encode_uuid, decode_uuid
+from ..protobuf.reputation import reputation_pb2
 
 
 class TransactionScore(Configuration):
+    message_class = reputation_pb2.TransactionScore
+
     def __init__(self, task_id, score):
         self.task_id = task_id
         self.score = score
 
+    def sync_to_message(self):
+        self.message.task_id = encode_uuid(self.task_id)
+        self.message.score = self.score
+
+    def sync_from_message(self):
+        self.__init__(decode_uuid(self.message.task_id), self.message.score)
+
 
 class Transaction(Configuration):
     def __init__(self, task_id: UUID, p1_id: UUID = None, p1_score: float = None,
@@ -0,0 +1,178 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing
+import pickle
+import struct
+from multiprocessing.context import get_spawning_popen
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty, Full
+
+_inherited = {}  # name -> RingQueue, in this process
+
+
+class RingQueue(object):
+    """
+    Queue in a shared memory ring buffer, for use in place of Manager().Queue between subsystems
+    Any number of producers and consumers; puts and gets never leave the calling process.
+    Objects are pickled straight into shared memory, bytes are copied in without pickling.
+
+    Locks can only be inherited, so a RingQueue must be created before the processes that use it,
+    and handed to them when they start (Pool initializer=RingQueue.inherit); after that it pickles by name.
+
+    Layout:
+    ====================================================================
+    | write pos | read pos | count | length | kind | data | length | ...
+    ====================================================================
+    Positions only increase; a record that would straddle the end of the buffer starts over at the beginning.
+    """
+    header = struct.Struct('QQQ')
+    record = struct.Struct('IB')
+    wrap = 0xFFFFFFFF
+    PICKLED = 0
+    BYTES = 1
+    default_capacity = 4 * 1024 * 1024
+
+    def __init__(self, capacity=default_capacity, ctx=multiprocessing):
+        self.capacity = capacity
+        self._shm = SharedMemory(create=True, size=self.header.size + capacity)
+        self._cond = ctx.Condition(ctx.Lock())
+        self.header.pack_into(self._shm.buf, 0, 0, 0, 0)
+        _inherited[self.name] = self
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def __reduce__(self):
+        if get_spawning_popen() is not None:
+            return _attach, (self.name, self.capacity, self._cond)
+        return _lookup, (self.name,)
+
+    @staticmethod
+    def inherit(*queues):
+        """
+        Pool initializer: nothing to do, unpickling the arguments registered them
+        :param queues: RingQueues
+        :return: None
+        """
+        pass
+
+    def _counters(self):
+        return self.header.unpack_from(self._shm.buf, 0)
+
+    def qsize(self):
+        return self._counters()[2]
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def full(self):
+        return self._slot(self.record.size + 1) is None
+
+    def _slot(self, size):
+        """
+        Where a record of size bytes fits
+        :return: tuple of offset and bytes skipped to get there, or None if there is no room
+        """
+        write_pos, read_pos, count = self._counters()
+        offset = write_pos % self.capacity
+        skip = 0
+        if self.capacity - offset < size:
+            skip = self.capacity - offset
+            offset = 0
+        if count > 0 and write_pos + skip + size - read_pos > self.capacity:
+            return None
+        return offset, skip
+
+    def put(self, obj, block=True, timeout=None):
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            kind, data = self.BYTES, memoryview(obj).cast('B')
+        else:
+            kind, data = self.PICKLED, pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        size = self.record.size + len(data)
+        if size > self.capacity:
+            raise ValueError('%d bytes will not fit in a %d byte queue' % (size, self.capacity))
+        buf = self._shm.buf
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._slot(size) is not None, timeout if block else 0):
+                raise Full
+            offset, skip = self._slot(size)
+            write_pos, read_pos, count = self._counters()
+            if count == 0:  # start over, so that anything up to capacity fits
+                write_pos = read_pos = write_pos + skip
+                skip = 0
+            elif skip >= self.record.size:
+                self.record.pack_into(buf, self.header.size + self.capacity - skip, self.wrap, kind)
+            start = self.header.size + offset
+            self.record.pack_into(buf, start, len(data), kind)
+            buf[start + self.record.size:start + size] = data
+            self.header.pack_into(buf, 0, write_pos + skip + size, read_pos, count + 1)
+            self._cond.notify_all()
+
+    def put_nowait(self, obj):
+        self.put(obj, block=False)
+
+    def get(self, block=True, timeout=None):
+        buf = self._shm.buf
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.qsize() > 0, timeout if block else 0):
+                raise Empty
+            write_pos, read_pos, count = self._counters()
+            offset = read_pos % self.capacity
+            if self.capacity - offset < self.record.size or \
+                    self.record.unpack_from(buf, self.header.size + offset)[0] == self.wrap:
+                read_pos += self.capacity - offset
+                offset = 0
+            start = self.header.size + offset
+            length, kind = self.record.unpack_from(buf, start)
+            data = bytes(buf[start + self.record.size:start + self.record.size + length])
+            self.header.pack_into(buf, 0, write_pos, read_pos + self.record.size + length, count - 1)
+            self._cond.notify_all()
+        if kind == self.BYTES:
+            return data
+        return pickle.loads(data)
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def close(self):
+        """
+        Detach from the shared memory; the creator should also unlink() it
+        :return: None
+        """
+        _inherited.pop(self.name, None)
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
+
+
+def _attach(name, capacity, cond):
+    if name not in _inherited:
+        ring = RingQueue.__new__(RingQueue)
+        ring.capacity = capacity
+        ring._shm = SharedMemory(name=name)
+        ring._cond = cond
+        _inherited[name] = ring
+    return _inherited[name]
+
+
+def _lookup(name):
+    try:
+        return _inherited[name]
+    except KeyError:
+        raise RuntimeError('RingQueue %s was not inherited by this process' % name) from None
@@ -18,16 +18,17 @@ from abc import ABC, abstractmethod
 from uuid import UUID, uuid4
 from datetime import datetime
 from copy import deepcopy
-from collections import defaultdict
 import random
 import string
 
 from ..config import Configuration
+from ..config.wire import encode_value, decode_value, encode_uuid, decode_uuid, encode_datetime, decode_datetime
+from ..protobuf.structures import dag_pb2
 from ..system import now
 
 class Step(ABC):
-    def __init__(self, uuid):  # FIXME
-        self.uuid = None
+    def __init__(self, uuid):
+        self.uuid = uuid
 
 
 class GenesisType(Step):
@@ -53,6 +54,8 @@ class LinkedStep(Step, Configuration):
     A link in a DAG
     From any link, can only navigate in a chain back to the root
     """
+    message_class = dag_pb2.LinkedStep
+
     def __init__(self, payload=None, uuid: UUID = None, timestamp: datetime = None,
                  parent: Step = None, previous=None):
         if uuid is None:
@@ -62,6 +65,7 @@ class LinkedStep(Step, Configuration):
         if timestamp is None:
             self.timestamp = now()
         self.payload = payload
+        self._resolve = None
         self.parent = parent
         if parent is None:
             self.parent = Genesis
@@ -74,9 +78,39 @@ class LinkedStep(Step, Configuration):
     def __len__(self):
         return self._length
 
+    @property
+    def parent(self):
+        if self._resolve is not None:  # materialize on first use
+            self._parent, self._resolve = self._resolve(), None
+        return self._parent
+
+    @parent.setter
+    def parent(self, step):
+        self._parent = step
+        self._resolve = None
+
+    def lazy_parent(self, resolve):
+        """
+        Defer loading the parent (e.g. from a StepLog) until it is first used
+        :param resolve: callable returning the parent Step
+        :return: None
+        """
+        self._resolve = resolve
+
     def to_dict(self):
         return dict(payload=self.payload, uuid=self.uuid, timestamp=self.timestamp)
 
+    def sync_to_message(self):
+        msg = self.message
+        if self.uuid is not None:
+            msg.uuid = encode_uuid(self.uuid)
+        encode_value(self.payload, msg.payload)
+        encode_datetime(self.timestamp, msg.timestamp)
+
+    def sync_from_message(self):
+        msg = self.message
+        self.__init__(decode_value(msg.payload), decode_uuid(msg.uuid), decode_datetime(msg.timestamp))
+
 
 class InvalidBranchError(RuntimeError):
     pass
@@ -90,16 +124,122 @@ class StepDAG(ABC):
     """
     Directed Acyclic Graph of LinkedSteps
     if no branches, this is a chain
+    Steps are indexed by uuid, with their depth and skip pointers to ancestors 1, 2, 4, ... generations up,
+    so any ancestor or the common ancestor of two steps is found in O(logn)
     """
     main_branch = 'main'
     all_branches = 'all'
 
     def __init__(self):
         self.heads = dict({self.main_branch: Genesis})
-        self.__branch_lists = defaultdict(list[LinkedStep])  # cheating for merge
+        self._index = {Genesis.uuid: (Genesis, 0, ())}  # uuid -> step, depth, skip pointers
+        self.log = None
 
     def __len__(self):
-        return len(self.__branch_lists)
+        return len(self._index) - 1
+
+    def __contains__(self, uuid):
+        return uuid in self._index
+
+    def attach(self, log):
+        """
+        Persist every change to an append-only StepLog
+        If the log already holds history, it replaces what is in memory; its steps are loaded lazily
+        :param log: StepLog
+        :return: None
+        """
+        self.log = log
+        if len(log.heads) > 0:
+            self.heads = {name: log.step(uuid) for name, uuid in log.heads.items()}
+            self._index = {Genesis.uuid: self._index[Genesis.uuid]}
+        else:
+            for name in self.heads:
+                for step in reversed(self.recite(name)):
+                    log.append_step(step, name)
+
+    def find(self, uuid: UUID):
+        """
+        Step with the given uuid, O(1)
+        :param uuid: UUID
+        :return: LinkedStep or None
+        """
+        entry = self._index.get(uuid)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def _link(self, step):
+        parent = step.parent
+        _, depth, _ = self._entry(parent)
+        jumps = [parent]  # jumps[k] is 2**k generations up, and 2**k up from there is jumps[k + 1]
+        while True:
+            up = self._index[jumps[-1].uuid][2]
+            if len(up) < len(jumps):
+                break
+            jumps.append(up[len(jumps) - 1])
+        entry = step, depth + 1, tuple(jumps)
+        self._index[step.uuid] = entry
+        return entry
+
+    def _entry(self, step):
+        entry = self._index.get(step.uuid)
+        if entry is not None and entry[0] is step:
+            return entry
+        pending = []  # not yet indexed, e.g. loaded lazily from a log
+        while entry is None or entry[0] is not step:
+            pending.append(step)
+            step = step.parent
+            entry = self._index.get(step.uuid)
+        for step in reversed(pending):
+            entry = self._link(step)
+        return entry
+
+    def depth(self, step):
+        """
+        Number of steps from Genesis to this one, O(1)
+        :param step: Step
+        :return: int
+        """
+        return self._entry(step)[1]
+
+    def ancestor(self, step, depth):
+        """
+        Ancestor of a step at the given depth, O(logn)
+        :param step: Step
+        :param depth: int
+        :return: Step
+        """
+        _, current, jumps = self._entry(step)
+        if depth > current or depth < 0:
+            raise ValueError('No ancestor at depth %d' % depth)
+        distance = current - depth
+        while distance:
+            level = distance.bit_length() - 1
+            step = jumps[level]
+            jumps = self._index[step.uuid][2]
+            distance -= 1 << level
+        return step
+
+    def common_ancestor(self, step, other):
+        """
+        Lowest common ancestor of two steps, O(logn)
+        :param step: Step
+        :param other: Step
+        :return: Step (Genesis if unrelated)
+        """
+        depth, other_depth = self.depth(step), self.depth(other)
+        if depth > other_depth:
+            step = self.ancestor(step, other_depth)
+        elif other_depth > depth:
+            other = self.ancestor(other, depth)
+        if step is other:
+            return step
+        jumps, other_jumps = self._index[step.uuid][2], self._index[other.uuid][2]
+        for level in range(len(jumps) - 1, -1, -1):
+            if level < len(jumps) and jumps[level] is not other_jumps[level]:
+                step, other = jumps[level], other_jumps[level]
+                jumps, other_jumps = self._index[step.uuid][2], self._index[other.uuid][2]
+        return step.parent
 
     @property
     def main(self):  # longest chain head
@@ -126,7 +266,9 @@ class StepDAG(ABC):
             raise InvalidBranchError()
         step.parent = self.heads[branch]
         self.heads[branch] = step
-        self.__branch_lists[branch].append(step)
+        self._link(step)
+        if self.log is not None:
+            self.log.append_step(step, branch)
 
     def branch(self, name, step, source=None):
         """
@@ -148,28 +290,44 @@ class StepDAG(ABC):
             current = self.heads[source]
         self.heads[name] = step
         step.parent = current
-        self.__branch_lists[name].append(step)
+        self._link(step)
+        if self.log is not None:
+            self.log.append_step(step, name)
 
     def ingest_branch(self, steps, name=None):
         """
         Accept an external branch, as a list fom head to root
+        Steps already known (by uuid) are not added again; the branch diverges from the last known step before
+        the first new one
         :param steps: list of steps for branch
         :param name: optional name for branch
         :return: name of the branch
         """
         if name is None:
             name = self.temp_name
-        self.branch(name, steps[-1], Genesis)
-        for step in reversed(steps[:-1]):
+        if name in self.heads:
+            raise BranchExistsError(name)
+        source = Genesis
+        novel = []
+        for step in reversed(steps):
+            known = self.find(step.uuid)
+            if known is None:
+                novel.append(step)
+            elif not novel:
+                source = known
+        self.heads[name] = source
+        for step in novel:
             self.add_step(step, name)
+        if not novel and self.log is not None:
+            self.log.set_head(name, source)
         return name
 
     def diff(self, branch, target=None):
         """
-        Find the lowest common ancestor between one branch and another (which defaults to main)
+        Find the lowest common ancestor between one branch and another (which defaults to main), O(logn)
         :param branch:
         :param target:
-        :return: common root
+        :return: depth of the common root, common root
         """
         if target is None:
             target = self.main_branch
@@ -178,15 +336,8 @@ class StepDAG(ABC):
         if target not in self.heads:
             raise InvalidBranchError(target)
 
-        shorter = min(len(self.__branch_lists[branch]), len(self.__branch_lists[target]))
-        common_root = Genesis
-        idx = 0
-        for idx in range(0, shorter):
-            if self.__branch_lists[branch][idx] != self.__branch_lists[target][idx]:
-                if idx > 0:
-                    common_root = self.__branch_lists[branch][idx - 1]
-                break
-        return idx, common_root
+        common_root = self.common_ancestor(self.heads[branch], self.heads[target])
+        return self.depth(common_root), common_root
 
     @staticmethod
     def _sort_step_list(steps):
@@ -195,6 +346,7 @@ class StepDAG(ABC):
     def merge(self, branch, target=None, keep=False):
         """
         Merge two branches
+        Steps after the common root are interleaved by timestamp; O(k logk) in the number of those steps
         :param branch:
         :param target:
         :param keep:
@@ -207,17 +359,26 @@ class StepDAG(ABC):
         if target not in self.heads:
             raise InvalidBranchError(target)
 
-        idx, common_root = self.diff(branch, target)
-        temp = self.temp_name
-        self.heads[temp] = common_root
-        steps = self.__branch_lists[branch][idx:] + self.__branch_lists[target][idx:]  # noqa
-        steps = self._sort_step_list(steps)
-        for step in steps:
-            self.add_step(step, temp)
-        self.heads[target] = self.heads[temp]
-        del self.heads[temp]
+        _, common_root = self.diff(branch, target)
+        temp = None
+        if self.heads[branch] is not common_root:  # otherwise nothing new
+            temp = self.temp_name
+            self.heads[temp] = common_root
+            steps = self.recite(branch, common_root) + self.recite(target, common_root)
+            if common_root is not Genesis:
+                steps = [step for step in steps if step is not common_root]
+            for step in self._sort_step_list(steps):
+                self.add_step(step, temp)
+            self.heads[target] = self.heads[temp]
+            del self.heads[temp]
         if not keep:
             del self.heads[branch]
+        if self.log is not None:
+            if temp is not None:
+                self.log.set_head(target, self.heads[target])
+                self.log.drop(temp)
+            if not keep:
+                self.log.drop(branch)
 
     def fork(self, head=None):
         if head is None:
@@ -230,7 +391,7 @@ class StepDAG(ABC):
 
     def recite(self, branch=None, root=None):
         """
-        Prepare a step list for transmission
+        Prepare a step list for transmission, O(k) in the number of steps
         :param branch: branch name
         :param root: first node of sequence
         :return: list of steps
@@ -239,9 +400,13 @@ class StepDAG(ABC):
             branch = self.main_branch
         if root is None:
             root = Genesis
-        step_list = []
+        depth = self.depth(root)
         step = self.heads[branch]
-        while step != root:
+        count = self.depth(step) - depth
+        if count < 0 or self.ancestor(step, depth) is not root:
+            raise InvalidBranchError('%s is not on branch %s' % (root.uuid, branch))
+        step_list = []
+        for _ in range(count):
             step_list.append(step)
             step = step.parent
         if root is not Genesis:
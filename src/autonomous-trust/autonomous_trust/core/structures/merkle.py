@@ -14,17 +14,46 @@
 #   limitations under the License.
 # ******************
 
-from nacl.hash import blake2b
-from collections import defaultdict
+import hashlib
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from uuid import UUID, uuid4
-from typing import Union
+from typing import Optional, Union
 
-from .redblack import Node, Tree, EmptyNode
 from ..config import Configuration
+from ..config.wire import encode_value, decode_value
+from ..protobuf.structures import merkle_pb2
 from ..system import encoding
 
 
+def blake2b(data: bytes) -> bytes:
+    """
+    Same digest as nacl.hash.blake2b (32 bytes, hex-encoded) without its per-call wrapping overhead
+    :param data: bytes
+    :return: bytes
+    """
+    return hashlib.blake2b(data, digest_size=32).hexdigest().encode()
+
+
+def _index_add(index, key, pos):
+    found = index.get(key)
+    if found is None:
+        index[key] = pos  # the common, unique case costs no list
+    elif isinstance(found, list):
+        found.append(pos)
+    else:
+        index[key] = [found, pos]
+
+
+def _index_get(index, key):
+    found = index.get(key)
+    if found is None:
+        return ()
+    if isinstance(found, list):
+        return found
+    return found,
+
+
 class SimplestBlob(ABC):
     """
     Abstract object type contained in a MerkleTree
@@ -55,64 +84,100 @@ class SimplestBlob(ABC):
         return MerkleTree.get_hash(self.designation + nonce)
 
 
-class _MerkleNode(Node, Configuration):
-    def __init__(self, key, hash_val, blob=None, uuid=None, left=None, right=None, parent=None, red=False):
-        super().__init__(key, None, left, right, parent, red)
-        self.digest = hash_val
-        self.blob = blob  # only leaves
-        self.uuid = uuid
-        if uuid is None:
-            self.uuid = uuid4()
-
-
-class MerkleTree(Tree, Configuration):
+class MerkleTree(Configuration):
     """
-    Merkle tree
+    Append-optimized Merkle tree
     Assumes hashing is asymmetric
+    Digests are kept per level, leaves first, in fixed slots of a bytearray so that node i at one level
+    has children 2i and 2i+1 at the level below; an unpaired node is promoted unchanged to the level above
     """
-    node_class = _MerkleNode
     hash_func = blake2b
     byte_enc = encoding
+    message_class = merkle_pb2.MerkleTree
+    proof_cache = 4096  # memoized proof prefixes
+    slot = 64  # hex-encoded 32-byte blake2b digest
 
-    def __init__(self, root=None, blobs=None, super_hash=None):
-        super().__init__(root)
-        self.blobs = blobs
-        if blobs is None:
-            self.blobs = []
+    def __init__(self, blobs=None, super_hash=None):
+        self.blobs = []
         self.super_hash = super_hash
-        self.unique = defaultdict(list)
-        self.non_unique = []
+        self._levels = [bytearray()]
+        self._hashes = {}  # leaf digest prefix -> position(s)
+        self._uuids = {}  # blob uuid -> position(s)
+        self._proofs = {}  # position -> stable proof prefix
+        if blobs:
+            self.blobs = list(blobs)
+            self._rebuild()
 
     def to_dict(self):
-        return dict(root=self.root, blobs=self.blobs, super_hash=self.super_hash)
+        return dict(blobs=self.blobs, super_hash=self.super_hash)
+
+    def sync_to_message(self):
+        for blob in self.blobs:
+            encode_value(blob, self.message.blobs.add())
+        if self.super_hash is not None:
+            self.message.super_hash = self.super_hash
+
+    def sync_from_message(self):
+        self.__init__(blobs=[decode_value(blob) for blob in self.message.blobs],
+                      super_hash=self.message.super_hash or None)
 
     @classmethod
     def sort_key(cls, _):
         return 1  # unsorted, derived classes might override
 
+    @classmethod
+    def _is_sorted(cls):
+        return cls.sort_key.__func__ is not MerkleTree.sort_key.__func__
+
     @classmethod
     def get_hash(cls, x: Union[bytes, str]) -> bytes:
-        if not isinstance(x, bytes):
+        if isinstance(x, str):
             x = x.encode(cls.byte_enc)
         return cls.hash_func(x)
 
     @property
     def root_digest(self):
-        try:
-            return self.root.digest
-        except AttributeError:
+        if not self.blobs:
             return None
+        return bytes(self._levels[-1][:self.slot])
+
+    @property
+    def size(self):
+        return len(self.blobs)
+
+    @property
+    def depth(self):
+        return len(self._levels) - 1
+
+    def __len__(self):
+        return len(self.blobs)
+
+    def position(self, blob) -> Optional[int]:
+        """
+        Leaf index of a blob, O(1)
+        :param blob: SimplestBlob
+        :return: int or None
+        """
+        return self._find(blob, blob.get_hash())
+
+    def lookup(self, uuid: UUID) -> list:
+        """
+        All blobs with the given uuid, O(1)
+        :param uuid: UUID
+        :return: list of SimplestBlob
+        """
+        return [self.blobs[pos] for pos in _index_get(self._uuids, uuid)]
 
     def insert(self, blob):  # noqa
         """
-        Add an object as a sub-leaf, invokes a rehash of the tree
-        O(nlogn) in the number of blobs
+        Append an object as a sub-leaf, rehashing only its path to the root
+        O(logn) in the number of blobs
         :param blob: SimplestBlob
         :return: None
         """
-        if blob not in self.blobs:
-            self.blobs.append(blob)
-            self._rehash()
+        digest = blob.get_hash()
+        if self._find(blob, digest) is None:
+            self._append(blob, digest)
 
     def merge(self, blob_list):
         """
@@ -124,86 +189,128 @@ class MerkleTree(Tree, Configuration):
             blob_list = blob_list.blobs
         count = 0
         for blob in blob_list:
-            if blob not in self.blobs:
-                self.blobs.append(blob)
+            digest = blob.get_hash()
+            if self._find(blob, digest) is None:
+                self._append(blob, digest)
                 count += 1
-        self.blobs.sort(key=self.sort_key)
-        if count > 0:
-            self._rehash()
+        if count > 0 and self._is_sorted():
+            self.blobs.sort(key=self.sort_key)
+            self._rebuild()
 
     def delete(self, blob):  # noqa
         """
-        Remove an object as a sub-leaf, invokes a rehash of the tree
-        O(nlogn) in the number of blobs
+        Remove an object as a sub-leaf, rehashing the inner nodes
+        O(n) in the number of blobs
         :param blob: SimplestBlob
         :return: None
         """
-        if blob in self.blobs:
-            self.blobs.remove(blob)
-            self._rehash()
-
-    def _rehash(self):
-        while len(self.leaves) > len(self.blobs):
-            super().delete(self.last)
-        while len(self.leaves) < len(self.blobs):
-            super().insert(None)
-        for idx, blob in enumerate(self.blobs):
-            leaf = self.leaves[idx]
-            leaf.blob = blob
-            leaf.digest = blob.get_hash()
-            self.unique[leaf.uuid].append(leaf)
-            if len(self.unique[leaf.uuid]) > 1:
-                self.non_unique += [node.key for node in self.unique[leaf.uuid]]
-        for level in range(len(self), -1, -1):
-            level_nodes = []  # get nodes at level
-            for node in level_nodes:
-                if node.is_leaf():
-                    continue
-                self._hash_inner_node(node)
-
-    def _hash_inner_node(self, node, left=None, right=None):
-        if left is None:
-            left = node.left
-        if right is None:
-            right = node.right
-        if not isinstance(left, self.node_class) and not isinstance(right, self.node_class):
-            raise RuntimeError('Unexpected leaf node in Merkle tree')
-        elif not isinstance(left, self.node_class):
-            node.digest = right.digest  # do not rehash (avoid CVE-2012-2459)
-        elif not isinstance(right, self.node_class):
-            node.digest = left.digest  # ditto
-        else:
-            node.digest = self.get_hash(left.digest + right.digest)
-        self.unique[node.uuid].append(node)
-        if len(self.unique[node.uuid]) > 1:
-            self.non_unique += [n.key for n in self.unique[node.uuid]]
+        pos = self.position(blob)
+        if pos is not None:
+            del self.blobs[pos]
+            leaves = self._levels[0]
+            del leaves[pos * self.slot:(pos + 1) * self.slot]
+            self._rebuild(leaves)
+
+    @staticmethod
+    def _key(digest):
+        return int(digest[:16], 16)  # plain int, stable across processes unlike hash()
+
+    def _find(self, blob, digest):
+        for pos in _index_get(self._hashes, self._key(digest)):
+            if self.blobs[pos] == blob:
+                return pos
+        return None
+
+    def _append(self, blob, digest):
+        slot = self.slot
+        levels = self._levels
+        idx = len(self.blobs)
+        self.blobs.append(blob)
+        _index_add(self._hashes, self._key(digest), idx)
+        _index_add(self._uuids, blob.uuid, idx)
+        levels[0] += digest
+        level = 0
+        while len(levels[level]) > slot:
+            nodes = levels[level]
+            idx >>= 1
+            left = idx * 2 * slot
+            if left + slot < len(nodes):
+                digest = self.get_hash(nodes[left:left + 2 * slot])  # siblings are adjacent
+            else:
+                digest = nodes[left:left + slot]  # do not rehash (avoid CVE-2012-2459)
+            level += 1
+            if level == len(levels):
+                levels.append(bytearray())
+            offset = idx * slot
+            if offset < len(levels[level]):
+                levels[level][offset:offset + slot] = digest
+            else:
+                levels[level] += digest
+
+    def _rebuild(self, leaves=None):
+        slot = self.slot
+        if leaves is None:
+            leaves = bytearray(b''.join(blob.get_hash() for blob in self.blobs))
+        self._hashes.clear()
+        self._uuids.clear()
+        self._proofs.clear()
+        for pos, blob in enumerate(self.blobs):
+            _index_add(self._hashes, self._key(leaves[pos * slot:(pos + 1) * slot]), pos)
+            _index_add(self._uuids, blob.uuid, pos)
+        self._levels = [leaves]
+        while len(self._levels[-1]) > slot:
+            nodes = self._levels[-1]
+            above = bytearray()
+            for offset in range(0, len(nodes), 2 * slot):
+                if offset + slot < len(nodes):
+                    above += self.get_hash(nodes[offset:offset + 2 * slot])
+                else:
+                    above += nodes[offset:offset + slot]
+            self._levels.append(above)
+
+    def _path(self, pos, level=0, stable=False):
+        """
+        Sibling digests from the given level up to the root
+        If stable, stop at the first sibling subtree that later inserts could still change
+        """
+        chain = []
+        slot = self.slot
+        count = len(self.blobs)
+        top = len(self._levels) - 1
+        idx = pos >> level
+        while level < top:
+            sibling = idx ^ 1
+            if stable and (sibling + 1) << level > count:
+                break
+            nodes = self._levels[level]
+            offset = sibling * slot
+            if offset >= len(nodes):
+                chain.append((None, None))
+            elif sibling < idx:
+                chain.append((bytes(nodes[offset:offset + slot]), None))
+            else:
+                chain.append((None, bytes(nodes[offset:offset + slot])))
+            idx >>= 1
+            level += 1
+        return chain
 
     def inclusion_proof(self, blob):
         """
-        Subtree chain from the root to the given blob
+        Subtree chain from the given blob to the root
+        Sibling subtrees that are already full never change, so that part of the chain is memoized
         :param blob: SimplestBlob
         :return: list of tuples of digest|None from siblings along the path from leaf to root
         """
-        nodes = []
-        if self.root is None:
-            return nodes
-        key = None
-        for leaf in self.leaves:
-            if leaf.blob == blob:
-                key = blob.key
-                break
-        if key is None:
+        pos = self.position(blob)
+        if pos is None:
             return None
-        node = self.find(key)
-        while node != self.root:
-            if node.sibling is EmptyNode:
-                nodes.append((None, None))
-            elif node == node.parent.left:
-                nodes.append((None, node.right.digest))
-            else:
-                nodes.append((node.left.digest, None))
-            node = node.parent
-        return nodes
+        prefix = self._proofs.get(pos)
+        if prefix is None:
+            prefix = self._path(pos, stable=True)
+            if len(self._proofs) >= self.proof_cache:
+                del self._proofs[next(iter(self._proofs))]
+            self._proofs[pos] = prefix
+        return prefix + self._path(pos, len(prefix))
 
     def audit(self, blob, chain=None):
         """
@@ -216,41 +323,46 @@ class MerkleTree(Tree, Configuration):
         """
         if chain is None:
             chain = self.inclusion_proof(blob)  # my own
-        if chain[-1].digest != self.root.digest:  # noqa
-            chain = self.inclusion_proof(blob) + chain  # append local to super-chain
-        digest = self.get_hash(blob.sig)
-        for hash_tpl in chain:
-            if hash_tpl == (None, None):
-                digest = self.get_hash(digest)
-            elif hash_tpl[0] is None:  # i.e. digest was from the right
-                digest = self.get_hash(digest + hash_tpl[1])  # noqa
-            else:
-                digest = self.get_hash(hash_tpl[1] + digest)  # noqa
-        return digest == self.super_hash
+            if chain is None:
+                return False
+        digest = blob.get_hash()
+        for left, right in chain:
+            if left is not None:
+                digest = self.get_hash(left + digest)
+            elif right is not None:
+                digest = self.get_hash(digest + right)
+        if self.super_hash is not None and digest == self.super_hash:
+            return True
+        return digest == self.root_digest
 
     def __contains__(self, blob):
         """
-        Membership test, assumes we usually want to test a non-local blob
+        Membership test, O(1)
         :param blob: SimplestBlob
         :return: bool
         """
-        root_hash = self.root.digest
-        if self.super_hash is not None:
-            root_hash = self.super_hash
-        return self.audit(blob, root_hash)
+        return self.position(blob) is not None
 
     def consistent_trees(self, other_size, other_root_hash):
         """
         Verify that two Merkle trees match
-        :param other_size:
-        :param other_root_hash:
-        :return:
+        :param other_size: number of leaves
+        :param other_root_hash: bytes
+        :return: bool
         """
-        return self.size == other_size and self.root.digest == other_root_hash
+        return self.size == other_size and self.root_digest == other_root_hash
 
     def subtree_duplications(self):
         """
         Locate any subtrees with duplicate hashes (and thus a duplicate data sequence)
-        :return: list of roots of duplicated subtrees
+        :return: list of (level, index) of roots of duplicated subtrees
         """
-        return [self.find(key) for key in set(self.non_unique)]
+        duplicates = []
+        for level, nodes in enumerate(self._levels):
+            seen = defaultdict(list)
+            for idx, offset in enumerate(range(0, len(nodes), self.slot)):
+                seen[bytes(nodes[offset:offset + self.slot])].append(idx)
+            for indices in seen.values():
+                if len(indices) > 1:
+                    duplicates += [(level, idx) for idx in indices]
+        return duplicates
@@ -39,6 +39,7 @@ class Node(object):
     """
     Red/Black tree node
     """
+    __slots__ = ('key', 'data', 'parent', 'left', 'right', 'red')
 
     def __init__(self, key, data, left=None, right=None, parent=None, red=False):
         self.key = key
@@ -100,19 +101,35 @@ class Node(object):
 
     def leaves(self):
         """
-        Dynamically finds leaf nodes (have no children)
-        Warning: recursive
+        Dynamically finds leaf nodes (have no children), left to right
         :return: list of Nodes
         """
-        if self.is_leaf():
-            return [self]
         leaves = []
-        if isinstance(self.left, Node):
-            leaves += self.left.leaves()
-        if isinstance(self.right, Node):
-            leaves += self.right.leaves()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf():
+                leaves.append(node)
+                continue
+            if isinstance(node.right, Node):
+                stack.append(node.right)
+            if isinstance(node.left, Node):
+                stack.append(node.left)
         return leaves
 
+    def nodes(self):
+        """
+        All nodes of this subtree with their depth below it, in no particular order
+        :return: generator of (Node, int)
+        """
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            for child in (node.left, node.right):
+                if isinstance(child, Node):
+                    stack.append((child, depth + 1))
+
     def to_tuple(self):
         """
         Encode structure (but not data) as a nested tuple
@@ -176,40 +193,35 @@ class Tree(object):
 
     def __init__(self, root=None):
         self.root = root
+        self.leaves = {}  # insertion-ordered set of leaf nodes
         if root is None:
             self.root = EmptyNode
-            self.leaves = []
             self.first = None
             self.last = None
+            self.node_count = 0
         else:
-            self.leaves = self.root.leaves()
-            keys = sorted(list(_flatten(self.to_tuple())))
-            self.first = self.find(keys[0])
-            self.last = self.find(keys[-1])
-        self.node_count = 0
+            self.leaves = dict.fromkeys(self.root.leaves())
+            nodes = [node for node, _ in self.root.nodes()]
+            self.first = min(nodes, key=lambda n: n.key)
+            self.last = max(nodes, key=lambda n: n.key)
+            self.node_count = len(nodes)
 
     @property
     def size(self):
         """
         Total number of nodes
-        Warning: recursive
         :return: int
         """
-        tpl = self.to_tuple()
-        if len(tpl) > 0:
-            return len(list(_flatten(self.to_tuple())))
-        return 0
+        return self.node_count
 
     def __len__(self):
         """
         Depth of tree
         :return: int
         """
-        depth = 0
-        for leaf in self.leaves:
-            if leaf.level > depth:
-                depth = leaf.level
-        return depth
+        if self.root is EmptyNode:
+            return 0
+        return max(depth for _, depth in self.root.nodes())
 
     def insert(self, data, key=None):
         """
@@ -227,7 +239,7 @@ class Tree(object):
             self.first = node
         if self.last is None or self.last.key < key:
             self.last = node
-        self.leaves.append(node)
+        self.leaves[node] = None
         parent = None
         current = self.root
         while current is not EmptyNode:
@@ -246,8 +258,7 @@ class Tree(object):
             parent.left = node
         else:
             parent.right = node
-        if parent in self.leaves:
-            self.leaves.remove(parent)
+        self.leaves.pop(parent, None)
         self._recolor_insert(node)
 
     def _rotate(self, d_enum, node):
@@ -258,7 +269,7 @@ class Tree(object):
         if pivot.get_child(direction) is not EmptyNode:
             pivot.get_child(direction).parent = node
         if node.left is EmptyNode and node.right is EmptyNode:
-            self.leaves.append(node)
+            self.leaves[node] = None
 
         pivot.parent = node.parent
         if node.parent is None:
@@ -269,8 +280,7 @@ class Tree(object):
             node.parent.set_child(counter, pivot)
         pivot.set_child(direction, node)
         node.parent = pivot
-        if pivot in self.leaves:
-            self.leaves.remove(pivot)
+        self.leaves.pop(pivot, None)
 
     def _recolor_insert(self, node):  # TODO reduce verbosity (duplication)
         while node != self.root and node.parent.red:
@@ -340,9 +350,9 @@ class Tree(object):
 
     @staticmethod
     def _min_leaf(node):
-        all_leaves = node.leaves()
-        min_key = min([leaf.key for leaf in all_leaves])
-        return [leaf for leaf in all_leaves if leaf.key == min_key][0]
+        while isinstance(node.left, Node):
+            node = node.left
+        return node
 
     def _transplant(self, u, v):
         if u.parent is None:
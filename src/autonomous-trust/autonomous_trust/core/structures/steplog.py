@@ -0,0 +1,287 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import mmap
+import os
+import struct
+import threading
+from functools import partial
+from typing import Union
+from uuid import UUID
+
+from .dag import LinkedStep, Genesis
+
+
+class StepLog(object):
+    """
+    Append-only, memory-mapped record of StepDAG changes
+    Each record is a fixed header plus an encoded LinkedStep (or branch name); an index of step uuid to the offset
+    of its latest record lives in memory. Checkpoints hold the heads and the index entries added since the
+    previous checkpoint, so opening a long log reads the checkpoint chain rather than every record.
+    Steps are decoded only when used. Safe to share between threads, not between processes.
+    """
+    magic = b'ATSL'
+    version = 1
+    header = struct.Struct('<4sHQ')  # magic, version, offset of the latest checkpoint (0 if none)
+    record = struct.Struct('<BI16s16s')  # kind, payload length, step uuid, parent uuid
+    checkpoint_header = struct.Struct('<QI')  # offset of the previous checkpoint, number of heads
+    entry = struct.Struct('<16sQ')  # step uuid, record offset
+    STEP, HEAD, DROP, CHECKPOINT = range(1, 5)
+    checkpoint_every = 4096  # step records
+    genesis = bytes(16)
+
+    def __init__(self, path, checkpoint_every=None):
+        self.path = path
+        if checkpoint_every is not None:
+            self.checkpoint_every = checkpoint_every
+        self.index = {}  # step uuid bytes -> offset of its latest record
+        self.heads = {}  # branch name -> step uuid bytes
+        self._steps = {}  # materialized
+        self._delta = []  # index entries since the latest checkpoint
+        self._latest = 0
+        self._file = None
+        self._map = None
+        self._size = 0
+        self._lock = threading.RLock()
+        self._open()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, uuid):
+        return self._key(uuid) in self.index
+
+    def __getstate__(self):
+        self.flush()
+        return dict(path=self.path, checkpoint_every=self.checkpoint_every)
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['checkpoint_every'])
+
+    def __deepcopy__(self, memo):
+        return self  # shared, like the file
+
+    @classmethod
+    def _key(cls, uuid: Union[UUID, bytes, None]) -> bytes:
+        if uuid is None:
+            return cls.genesis
+        if isinstance(uuid, UUID):
+            return uuid.bytes
+        return uuid
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as log:
+                log.write(self.header.pack(self.magic, self.version, 0))
+        self._file = open(self.path, 'r+b')
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._remap()
+        if self._size < self.header.size:
+            raise ValueError('Truncated step log: %s' % self.path)
+        magic, version, self._latest = self.header.unpack_from(self._map, 0)
+        if magic != self.magic or version != self.version:
+            raise ValueError('Not a step log (version %d): %s' % (self.version, self.path))
+        self._load()
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _view(self, end):
+        if end > len(self._map):
+            self._file.flush()
+            self._remap()
+        return self._map
+
+    def _load(self):
+        chain = []
+        offset = self._latest
+        while offset:
+            _, length, _, _ = self.record.unpack_from(self._map, offset)
+            chain.append((offset, length))
+            offset = self.checkpoint_header.unpack_from(self._map, offset + self.record.size)[0]
+        for offset, length in reversed(chain):
+            start = offset + self.record.size
+            count = self.checkpoint_header.unpack_from(self._map, start)[1]
+            self.heads, pos = self._unpack_heads(start + self.checkpoint_header.size, count)
+            for uuid, step_offset in self.entry.iter_unpack(self._map[pos:start + length]):
+                self.index[uuid] = step_offset
+        offset = self.header.size
+        if chain:
+            offset = chain[0][0] + self.record.size + chain[0][1]
+        self._replay(offset)
+
+    def _unpack_heads(self, pos, count):
+        heads = {}
+        for _ in range(count):
+            name_len = self._map[pos]
+            name = self._map[pos + 1:pos + 1 + name_len].decode()
+            heads[name] = self._map[pos + 1 + name_len:pos + 17 + name_len]
+            pos += 17 + name_len
+        return heads, pos
+
+    def _replay(self, offset):
+        while offset < self._size:
+            end = offset + self.record.size
+            if end > self._size:
+                break
+            kind, length, uuid, _ = self.record.unpack_from(self._map, offset)
+            if kind not in (self.STEP, self.HEAD, self.DROP, self.CHECKPOINT) or end + length > self._size:
+                break
+            if kind == self.STEP:
+                name_len = self._map[end]
+                self._index(uuid, offset, self._map[end + 1:end + 1 + name_len].decode())
+            elif kind == self.HEAD:
+                self.heads[self._map[end:end + length].decode()] = uuid
+            elif kind == self.DROP:
+                self.heads.pop(self._map[end:end + length].decode(), None)
+            else:  # written, but the header was not updated
+                self._latest = offset
+                self._delta = []
+            offset = end + length
+        if offset < self._size:  # torn write at the tail
+            self._map.close()
+            self._map = None
+            self._file.truncate(offset)
+            self._size = offset
+            self._remap()
+
+    def _index(self, uuid, offset, branch):
+        self.index[uuid] = offset
+        self.heads[branch] = uuid
+        self._delta.append((uuid, offset))
+
+    def _append(self, kind, uuid, parent, payload):
+        offset = self._size
+        self._file.seek(offset)
+        self._file.write(self.record.pack(kind, len(payload), uuid, parent))
+        self._file.write(payload)
+        self._size += self.record.size + len(payload)
+        return offset
+
+    @staticmethod
+    def _name(branch):
+        name = branch.encode()
+        if len(name) > 255:
+            raise ValueError('Branch name too long: %s' % branch)
+        return name
+
+    def append_step(self, step: LinkedStep, branch: str):
+        """
+        Record a step as the new head of a branch
+        :param step: LinkedStep
+        :param branch: branch name
+        :return: None
+        """
+        name = self._name(branch)
+        uuid = self._key(step.uuid)
+        payload = bytes([len(name)]) + name + step.to_bytes()
+        with self._lock:
+            self._steps[uuid] = step
+            offset = self._append(self.STEP, uuid, self._key(step.parent.uuid), payload)
+            self._index(uuid, offset, branch)
+            if len(self._delta) >= self.checkpoint_every:
+                self.checkpoint()
+
+    def set_head(self, branch: str, step):
+        """
+        Record a branch head moving to an existing step (or Genesis)
+        :param branch: branch name
+        :param step: Step
+        :return: None
+        """
+        uuid = self._key(step.uuid)
+        with self._lock:
+            self._append(self.HEAD, uuid, self.genesis, self._name(branch))
+            self.heads[branch] = uuid
+
+    def drop(self, branch: str):
+        """
+        Record a branch's removal
+        :param branch: branch name
+        :return: None
+        """
+        with self._lock:
+            if self.heads.pop(branch, None) is not None:
+                self._append(self.DROP, self.genesis, self.genesis, self._name(branch))
+
+    def step(self, uuid: Union[UUID, bytes]):
+        """
+        Step with the given uuid, decoded on first use; its parent is in turn loaded lazily
+        :param uuid: UUID or its bytes
+        :return: LinkedStep (or Genesis)
+        """
+        key = self._key(uuid)
+        if key == self.genesis:
+            return Genesis
+        with self._lock:
+            step = self._steps.get(key)
+            if step is None:
+                offset = self.index[key]
+                start = offset + self.record.size
+                view = self._view(start)
+                _, length, _, parent = self.record.unpack_from(view, offset)
+                view = self._view(start + length)
+                name_len = view[start]
+                step = LinkedStep.from_bytes(view[start + 1 + name_len:start + length])
+                step.lazy_parent(partial(self.step, parent))
+                self._steps[key] = step
+            return step
+
+    def checkpoint(self):
+        """
+        Write the heads and recent index entries, then point the header at them
+        :return: None
+        """
+        with self._lock:
+            heads = b''.join(bytes([len(name)]) + name + uuid
+                             for name, uuid in ((self._name(branch), uuid) for branch, uuid in self.heads.items()))
+            payload = self.checkpoint_header.pack(self._latest, len(self.heads)) + heads + \
+                b''.join(self.entry.pack(uuid, offset) for uuid, offset in self._delta)
+            offset = self._append(self.CHECKPOINT, self.genesis, self.genesis, payload)
+            self.flush(sync=True)
+            self._file.seek(0)
+            self._file.write(self.header.pack(self.magic, self.version, offset))
+            self.flush(sync=True)
+            self._latest = offset
+            self._delta = []
+
+    def flush(self, sync=False):
+        """
+        Push appended records to the operating system (and to disk, if sync)
+        :param sync: bool
+        :return: None
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                if sync:
+                    os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            if self._delta:
+                self.checkpoint()
+            self._map.close()
+            self._file.close()
+            self._map = None
+            self._file = None
@@ -14,6 +14,7 @@
 #   limitations under the License.
 # ******************
 
+import json
 import logging
 import multiprocessing
 import os
@@ -22,13 +23,16 @@ import queue
 import sys
 import traceback
 from datetime import datetime
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from nacl.hash import blake2b
 
 from .algorithms.impl import AgreementImpl
 from .util import ClassEnumMeta
 
+if TYPE_CHECKING:
+    from .ring_queue import RingQueue
+
 pkg = __name__.rsplit('.', 1)[0]
 
 
@@ -44,7 +48,8 @@ class CfgIds(object, metaclass=ClassEnumMeta):
 
 
 # Constants for system tweaking
-# communications = pkg + '.network.TCPNetworkProcess'  # FIXME not working
+# communications = pkg + '.network.TCPNetworkProcess'
+# communications = pkg + '.network.AsyncUDPNetworkProcess'
 communications = pkg + '.network.UDPNetworkProcess'
 comm_port = 27787
 ping_rcv_port = comm_port + 2
@@ -66,7 +71,7 @@ max_concurrency = os.cpu_count() * 2
 base_system_deps = core_system.keys()
 
 
-QueueType = Union[queue.Queue, multiprocessing.Queue]
+QueueType = Union[queue.Queue, multiprocessing.Queue, 'RingQueue']
 
 
 def now():  # FIXME NTP sourced
@@ -74,33 +79,72 @@ def now():  # FIXME NTP sourced
 
 
 class PackageHash(object):
+    """
+    Digest of the package source, module by module
+    With a cache_file, a module is only read and hashed again if its size or modification time has changed.
+    """
     key = 'package_hash'
+    cache_name = 'package_hash.json'  # in the data dir
     excludes = ['viz']
 
-    def __init__(self, pkg_path=None, pkg_name=None, debug=False):
+    def __init__(self, pkg_path=None, pkg_name=None, debug=False, cache_file=None):
         self.logger = logging.getLogger()
         self.debug = debug
         self.modules = {}
+        self.hashed = 0  # modules read, rather than found in the cache
         if pkg_path is None or pkg_name is None:
             package = sys.modules[__name__.split('.')[0]]
             if pkg_path is None:
                 pkg_path = package.__path__
             if pkg_name is None:
                 pkg_name = package.__name__
+        cache = self._load_cache(cache_file)
+        entries = {}
         for loader, name, is_pkg in pkgutil.walk_packages(pkg_path, pkg_name + '.'):
-            for ex in self.excludes:
-                if name.endswith('.' + ex) or '.%s.' % ex in name:
-                    continue
+            if self.excluded(name):
+                continue
             try:
                 module_path = loader.find_spec(name).origin
-                with open(module_path, 'r') as src:
-                    source = src.read()
-                module_hash = blake2b(source.encode(encoding))
+                info = os.stat(module_path)
+                entry = cache.get(name)
+                if entry is not None and entry[:3] == [module_path, info.st_mtime_ns, info.st_size]:
+                    module_hash = entry[3].encode()
+                else:
+                    with open(module_path, 'r') as src:
+                        source = src.read()
+                    module_hash = blake2b(source.encode(encoding))
+                    self.hashed += 1
                 self.modules[name] = module_hash
+                entries[name] = [module_path, info.st_mtime_ns, info.st_size, module_hash.decode()]
             except (OSError, TypeError):
                 if self.debug:
                     self.logger.error('Skipping ', name)
         self.digest = blake2b(b''.join([dig for dig in self.modules.values()]))
+        if cache_file is not None and entries != cache:
+            self._save_cache(cache_file, entries)
+
+    @classmethod
+    def excluded(cls, name):
+        return any(name.endswith('.' + ex) or '.%s.' % ex in name for ex in cls.excludes)
+
+    @staticmethod
+    def _load_cache(cache_file):
+        if cache_file is None:
+            return {}
+        try:
+            with open(cache_file, 'r') as cache:
+                return json.load(cache)
+        except (OSError, ValueError):  # none yet, or garbled
+            return {}
+
+    def _save_cache(self, cache_file, entries):
+        try:
+            with open(cache_file + '.tmp', 'w') as cache:
+                json.dump(entries, cache)
+            os.replace(cache_file + '.tmp', cache_file)
+        except OSError as err:
+            if self.debug:
+                self.logger.error('Package hash cache not saved: %s' % err)
 
     def onerror(self, name):
         if self.debug:
@@ -0,0 +1,38 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import time
+
+
+def timed(func, *args, repeat=1, **kwargs):
+    """
+    Best-of-n wall clock time of a call
+    :return: tuple of seconds, last result
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def report(name, count, elapsed, unit='ops'):
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    print('  %-40s %10d %s in %8.4fs  %12.1f %s/sec' % (name, count, unit, elapsed, rate, unit))
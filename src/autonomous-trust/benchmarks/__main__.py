@@ -0,0 +1,34 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import pkgutil
+import sys
+from importlib import import_module
+
+
+def main(selected=None):
+    package = import_module(__package__)
+    for _, name, _ in pkgutil.iter_modules(package.__path__):
+        if not name.startswith('bench_'):
+            continue
+        if selected and name.removeprefix('bench_') not in selected:
+            continue
+        print(name.removeprefix('bench_'))
+        import_module('%s.%s' % (__package__, name)).main()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
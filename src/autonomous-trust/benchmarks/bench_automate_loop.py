@@ -0,0 +1,82 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import threading
+import time
+from operator import mul
+
+from autonomous_trust.core import AutonomousTrust, Process, CfgIds
+from autonomous_trust.core.automate import max_concurrency
+from autonomous_trust.core.capabilities import Capability
+from autonomous_trust.core.config import Configuration
+from autonomous_trust.core.negotiation import Task, TaskParameters
+
+round_trips = 10
+burst = 200
+
+
+class PollingTrust(AutonomousTrust):
+    """The fixed-cadence main loop, for comparison"""
+    def autonomous_loop(self, results, queues, signals):
+        self.autonomous_ability(queues)
+        self.init_tasking(queues)
+        with self._pool_type(max_concurrency) as pool:
+            while True:
+                self._monitor_processes(results)
+                if not self._handle_messages(queues, pool, results):
+                    break
+                self._handle_results(queues, results)
+                self.autonomous_tasking(queues)
+                time.sleep(Process.cadence)
+
+
+def _task(idx):
+    return Task(TaskParameters(Capability('mult'), args=(idx, 2)), None)
+
+
+def _run(name, at_type, multiproc):
+    at = at_type(multiproc=multiproc, logfile=Configuration.log_stdout)
+    at.capabilities.register_ability('mult', mul)
+    queues = {at.proc_name: at.queue_type(), CfgIds.negotiation: at.queue_type(),
+              CfgIds.reputation: at.queue_type(), at.external_control: at.queue_type()}
+    loop = threading.Thread(target=at.autonomous_loop, args=({}, queues, {}))
+    loop.start()
+    start = time.perf_counter()
+    for idx in range(round_trips):
+        queues[at.proc_name].put(_task(idx))
+        queues[CfgIds.negotiation].get(timeout=10)
+    latency = (time.perf_counter() - start) / round_trips
+    count = burst if at_type is AutonomousTrust else round_trips
+    start = time.perf_counter()
+    for idx in range(count):
+        queues[at.proc_name].put(_task(idx))
+    for _ in range(count):
+        queues[CfgIds.negotiation].get(timeout=10)
+    elapsed = time.perf_counter() - start
+    queues[at.external_control].put(Process.sig_quit)
+    loop.join()
+    print('  %-40s %10.1f ms round trip  %10.1f tasks/sec' % (name, latency * 1e3, count / elapsed))
+
+
+def main():
+    for multiproc in (False, True):
+        mode = 'processes' if multiproc else 'threads'
+        _run('polling loop (%s)' % mode, PollingTrust, multiproc)
+        _run('event loop (%s)' % mode, AutonomousTrust, multiproc)
+
+
+if __name__ == '__main__':
+    main()
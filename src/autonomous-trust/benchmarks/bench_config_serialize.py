@@ -0,0 +1,59 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+from autonomous_trust.core.capabilities import Capability
+from autonomous_trust.core.config import to_wire, from_wire, to_yaml_string, from_yaml_string
+from autonomous_trust.core.identity import Identity, Peers
+from autonomous_trust.core.negotiation.negotiation import Task, TaskParameters
+
+from . import timed, report
+
+count = 500
+
+
+def _codec(encode, decode, obj):
+    for _ in range(count):
+        decode(encode(obj))
+
+
+def _encode(encode, obj):
+    for _ in range(count):
+        encode(obj)
+
+
+def _run(name, obj):
+    for codec, encode, decode in (('yaml', to_yaml_string, from_yaml_string), ('protobuf', to_wire, from_wire)):
+        size = len(encode(obj))
+        elapsed, _ = timed(_encode, encode, obj, repeat=3)
+        report('%s %s encode (%d B)' % (name, codec, size), count, elapsed, 'objs')
+        elapsed, _ = timed(_codec, encode, decode, obj, repeat=3)
+        report('%s %s round trip (%d B)' % (name, codec, size), count, elapsed, 'objs')
+
+
+def main():
+    me = Identity.initialize('bench.me@example.com', 'me', '10.0.0.1')
+    peers = Peers()
+    for idx in range(10):
+        peers.add(Identity.initialize('bench.%d@example.com' % idx, 'p%d' % idx, '10.0.0.%d' % (idx + 2)).publish())
+    task = Task(TaskParameters(Capability('bench'), args=(1, 2.5, 'x')), me.publish())
+    _run('identity', me.publish())
+    _run('task', task)
+    _run('peers', peers)
+    _run('tuple', (me.uuid, 0.75, [task.uuid, 'accepted']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+from nacl.public import Box
+
+from autonomous_trust.core.identity import Identity, boxes
+
+from . import timed, report
+
+sizes = (64, 1024, 16384)
+count = 2000
+fan_out = 8
+
+
+def _uncached(me, peers, msg):
+    for idx in range(count):
+        peer = peers[idx % len(peers)]
+        cipher = Box(me.encryptor.private, peer.encryptor.public).encrypt(msg)
+        Box(peer.encryptor.private, me.encryptor.public).decrypt(cipher)
+
+
+def _cached(me, peers, msg):
+    for idx in range(count):
+        peer = peers[idx % len(peers)]
+        peer.decrypt(me.encrypt(msg, peer), me)
+
+
+def main():
+    me = Identity.initialize('bench.me@example.com', 'me', '10.0.0.1')
+    peers = [Identity.initialize('bench.%d@example.com' % idx, 'p%d' % idx, '10.0.0.%d' % (idx + 2))
+             for idx in range(fan_out)]
+    for size in sizes:
+        msg = bytes(size)
+        elapsed, _ = timed(_uncached, me, peers, msg, repeat=3)
+        report('Box per message (%d B)' % size, count, elapsed, 'msgs')
+        elapsed, _ = timed(_cached, me, peers, msg, repeat=3)
+        report('cached Box (%d B)' % size, count, elapsed, 'msgs')
+    hits, misses, size = boxes.to_tuple()
+    print('  cache hits %d, misses %d, entries %d' % (hits, misses, size))
+
+
+if __name__ == '__main__':
+    main()
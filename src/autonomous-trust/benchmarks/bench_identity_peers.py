@@ -0,0 +1,90 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import ipaddress
+import uuid as uuid_mod
+
+from autonomous_trust.core.identity import Identity, Peers, Signature, Encryptor
+
+from . import timed, report
+
+sizes = (10, 100, 1000, 10000)
+count = 10000
+
+
+def _identities(size):
+    signature, encryptor = Signature.generate(), Encryptor.generate()  # keys are irrelevant here
+    base = int(ipaddress.IPv4Address('10.0.0.0'))
+    return [Identity(uuid_mod.uuid4(), str(ipaddress.IPv4Address(base + idx)), 'peer%d' % idx, 'p%d' % idx,
+                     signature, encryptor) for idx in range(size)]
+
+
+def _scan_uuid(peers, uuids):
+    for idx in range(count):
+        {p.uuid: p for p in peers.all}.get(uuids[idx % len(uuids)])  # as find_by_uuid used to
+
+
+def _find_uuid(peers, uuids):
+    for idx in range(count):
+        peers.find_by_uuid(uuids[idx % len(uuids)])
+
+
+def _find_address(peers, addresses):
+    for idx in range(count):
+        peers.find_by_address(addresses[idx % len(addresses)])
+
+
+def _churn(peers, identities):
+    for idx in range(count):
+        who = identities[idx % len(identities)]
+        peers.promote(who)
+        peers.demote(who)
+
+
+def _delete(peers, identities):
+    for who in identities:
+        peers.delete(who)
+
+
+def _fill(identities):
+    peers = Peers()
+    for who in identities:
+        peers.add(who)
+    return peers
+
+
+def main():
+    for size in sizes:
+        identities = _identities(size)
+        elapsed, peers = timed(_fill, identities)
+        report('add (%d peers)' % size, size, elapsed, 'peers')
+        uuids = [who.uuid for who in identities]
+        addresses = [who.address for who in identities]
+        if size <= 1000:
+            elapsed, _ = timed(_scan_uuid, peers, uuids, repeat=3)
+            report('uuid rebuild+lookup (%d peers)' % size, count, elapsed, 'finds')
+        elapsed, _ = timed(_find_uuid, peers, uuids, repeat=3)
+        report('find_by_uuid (%d peers)' % size, count, elapsed, 'finds')
+        elapsed, _ = timed(_find_address, peers, addresses, repeat=3)
+        report('find_by_address (%d peers)' % size, count, elapsed, 'finds')
+        elapsed, _ = timed(_churn, peers, identities, repeat=3)
+        report('promote+demote (%d peers)' % size, count, elapsed, 'ops')
+        elapsed, _ = timed(_delete, peers, identities, repeat=1)
+        report('delete (%d peers)' % size, size, elapsed, 'peers')
+
+
+if __name__ == '__main__':
+    main()
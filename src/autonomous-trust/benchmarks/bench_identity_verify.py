@@ -0,0 +1,72 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+
+from nacl.exceptions import BadSignatureError
+
+from autonomous_trust.core.identity import Signature, BatchVerifier
+
+from . import timed, report
+
+voters = 48  # a group voting on a newcomer
+rounds = 20
+
+
+def _votes():
+    keys = [Signature.generate() for _ in range(voters)]
+    jobs = []
+    for idx, key in enumerate(keys):
+        message = b'proof of newcomer by voter %d' % idx
+        jobs.append((key.public, message, key.private.sign(message).signature))
+    return jobs
+
+
+def _one_at_a_time(jobs):
+    for _ in range(rounds):
+        for key, message, signature in jobs:
+            try:
+                key.verify(message, signature)
+            except BadSignatureError:
+                pass
+
+
+def _batched(verifier, jobs):
+    for _ in range(rounds):
+        verifier.clear()  # every signature is new
+        verifier.verify_batch(jobs)
+
+
+def _cached(verifier, jobs):
+    for _ in range(rounds):
+        verifier.verify_batch(jobs)
+
+
+def main():
+    jobs = _votes()
+    total = voters * rounds
+    elapsed, _ = timed(_one_at_a_time, jobs, repeat=3)
+    report('one at a time', total, elapsed, 'sigs')
+    for workers in (1, 4):
+        elapsed, _ = timed(_batched, BatchVerifier(workers), jobs, repeat=3)
+        report('batch, %d workers' % workers, total, elapsed, 'sigs')
+    verifier = BatchVerifier()
+    verifier.verify_batch(jobs)
+    elapsed, _ = timed(_cached, verifier, jobs, repeat=3)
+    report('batch, cached', total, elapsed, 'sigs')
+
+
+if __name__ == '__main__':
+    main()
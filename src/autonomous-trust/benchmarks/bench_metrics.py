@@ -0,0 +1,62 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import time
+
+from autonomous_trust.core.metrics import MetricsRegistry, MetricsCollector, MetricsReport
+
+from . import timed, report
+
+count = 100000
+processes = 8
+
+
+def _histogram(histogram, num):
+    for _ in range(num):
+        start = time.perf_counter()
+        histogram.add(time.perf_counter() - start)
+
+
+def _counter(counter, num):
+    for _ in range(num):
+        counter.inc()
+
+
+def _export(collector, num):
+    for _ in range(num):
+        collector.to_prometheus()
+
+
+def main():
+    registry = MetricsRegistry()
+    elapsed, _ = timed(_counter, registry.counter('messages_handled'), count)
+    report('counter inc', count, elapsed, 'updates')
+    elapsed, _ = timed(_histogram, registry.histogram('handler_seconds'), count)
+    report('timed histogram add', count, elapsed, 'updates')
+
+    registry.gauge('queue_depth')
+    registry.counter('log_dropped')
+    for name in ('encrypt_seconds', 'serialize_seconds'):
+        registry.histogram(name)
+    collector = MetricsCollector()
+    for idx in range(processes):
+        collector.update(MetricsReport('proc%d' % idx, registry.snapshot()))
+    elapsed, _ = timed(_export, collector, 100)
+    report('prometheus export (%d procs)' % processes, 100, elapsed, 'scrapes')
+
+
+if __name__ == '__main__':
+    main()
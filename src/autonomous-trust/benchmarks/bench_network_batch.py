@@ -0,0 +1,110 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import socket
+import threading
+import time
+
+from autonomous_trust.core.network.batch import BatchFrame, Outbox, recv_all
+from autonomous_trust.core.network.sockets import SendSocketPool, SocketPurpose
+
+from . import report
+
+host = '127.0.0.1'
+packet_size = 65507
+num_packets = 20000
+tick_size = 32  # messages queued per cadence tick
+sizes = (100, 1000)
+recv_buffer = 4 * 1024 * 1024
+
+
+class _Receiver(threading.Thread):
+    def __init__(self, batched):
+        super().__init__(daemon=True)
+        self.batched = batched
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer)
+        self.sock.bind((host, 0))
+        self.sock.settimeout(0.1)
+        self.address = self.sock.getsockname()
+        self.count = 0
+        self.wakeups = 0
+        self.done = False
+
+    def run(self):
+        while not self.done:
+            try:
+                if self.batched:
+                    packets = recv_all(self.sock, packet_size, 64)
+                else:
+                    packets = [self.sock.recvfrom(packet_size)]
+            except TimeoutError:
+                continue
+            self.wakeups += 1
+            for data, _ in packets:
+                self.count += len(BatchFrame.unpack(data)) if self.batched else 1
+
+    def stop(self):
+        self.done = True
+        self.join()
+        self.sock.close()
+
+
+def _legacy_send(msg, address):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as sock:
+        sock.sendto(msg, address)
+
+
+def _run(name, msg, batched, pooled):
+    receiver = _Receiver(batched)
+    receiver.start()
+    pool = SendSocketPool(host)
+    outbox = Outbox(packet_size)
+    start = time.perf_counter()
+    for idx in range(0, num_packets, tick_size):
+        for _ in range(min(tick_size, num_packets - idx)):
+            if batched:
+                outbox.add(receiver.address, msg)
+            elif pooled:
+                pool.sendto(msg, receiver.address, SocketPurpose.PEER)
+            else:
+                _legacy_send(msg, receiver.address)
+        if batched:
+            for destination, datagram, _ in outbox.drain():
+                pool.sendto(datagram, destination, SocketPurpose.PEER)
+        time.sleep(0)  # yield to the receiver, as the cadence would
+    deadline = time.perf_counter() + 2.0
+    while receiver.count < num_packets and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    receiver.stop()
+    pool.close()
+    opened = pool.stats.opened if batched or pooled else num_packets
+    report('%s (%d B)' % (name, len(msg)), receiver.count, elapsed, 'pkts')
+    print('  %-40s %10d wakeups, %d send sockets opened, %d lost' %
+          ('', receiver.wakeups, opened, num_packets - receiver.count))
+
+
+def main():
+    for size in sizes:
+        msg = b'x' * size
+        _run('socket per send, recv per packet', msg, False, False)
+        _run('pooled socket, recv per packet', msg, False, True)
+        _run('pooled, coalesced, drain-all', msg, True, True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+from autonomous_trust.core.network.buffer import MessageBuffer
+
+from . import timed, report
+
+backlog = 50000  # a flood that the main loop has fallen behind on
+senders = 16
+
+
+def _fill(buf):
+    for seq in range(backlog):
+        buf.append((b'x' * 64, '10.0.0.%d' % (seq % senders)))
+
+
+def _list():
+    buf = []
+    _fill(buf)
+    while buf:
+        buf.pop(0)
+
+
+def _buffer(policy):
+    buf = MessageBuffer(backlog, policy)
+    _fill(buf)
+    while buf:
+        buf.popleft()
+
+
+def _flood(count):  # a full buffer, every append evicts from the longest of many senders
+    buf = MessageBuffer(count, MessageBuffer.FAIR_SHARE)
+    for seq in range(2 * count):
+        buf.append((b'x' * 64, '10.0.%d.%d' % divmod(seq % count, 256)))
+
+
+def main():
+    for name, func, args in (('list, pop(0)', _list, ()),
+                             ('MessageBuffer, oldest', _buffer, (MessageBuffer.DROP_OLDEST,)),
+                             ('MessageBuffer, fair', _buffer, (MessageBuffer.FAIR_SHARE,))):
+        elapsed, _ = timed(func, *args, repeat=3)
+        report(name, backlog, elapsed, 'msgs')
+    for count in (1000, 10000):
+        elapsed, _ = timed(_flood, count, repeat=3)
+        report('MessageBuffer, fair, full with %d senders' % count, 2 * count, elapsed, 'msgs')
+
+
+if __name__ == '__main__':
+    main()
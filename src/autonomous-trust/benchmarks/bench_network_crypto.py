@@ -0,0 +1,59 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import logging
+
+from autonomous_trust.core.identity import Identity
+from autonomous_trust.core.network.crypto import CryptoPool
+
+from . import timed, report
+
+sizes = (1024, 65536)
+count = 2000
+senders = 8
+
+
+def _serial(me, ciphertexts):
+    for peer, cipher in ciphertexts:
+        me.decrypt(cipher, peer)
+
+
+def _pooled(me, ciphertexts, workers):
+    pool = CryptoPool(workers, logging.getLogger(__name__), max_depth=count)
+    pool.start()
+    for peer, cipher in ciphertexts:
+        pool.submit(peer.address, 'peer', me.decrypt, cipher, peer)
+    pool.stop()
+    return pool
+
+
+def main():
+    me = Identity.initialize('bench.me@example.com', 'me', '10.0.0.1')
+    peers = [Identity.initialize('bench.%d@example.com' % idx, 'p%d' % idx, '10.0.0.%d' % (idx + 2))
+             for idx in range(senders)]
+    for size in sizes:
+        msg = bytes(size)
+        ciphertexts = [(peer, peer.encrypt(msg, me)) for peer in peers] * (count // senders)
+        elapsed, _ = timed(_serial, me, ciphertexts, repeat=3)
+        report('serial decrypt (%d B)' % size, count, elapsed, 'msgs')
+        for workers in (1, 2, 4):
+            elapsed, pool = timed(_pooled, me, ciphertexts, workers, repeat=3)
+            report('%d worker(s) decrypt (%d B)' % (workers, size), count, elapsed, 'msgs')
+        print('  wait histogram %s' % (pool.stats['crypto_wait_peer'],))
+
+
+if __name__ == '__main__':
+    main()
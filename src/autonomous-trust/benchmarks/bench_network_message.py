@@ -0,0 +1,61 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+from autonomous_trust.core.network.message import Message
+from autonomous_trust.core.system import CfgIds
+
+from . import timed, report
+
+sizes = (64, 1024, 65536, 1024 * 1024)
+count = 2000
+function = 'video_frame'
+
+
+def _round_trip(messages):
+    for message in messages:
+        Message.parse(bytes(message), None)
+
+
+def _encode(messages):
+    for message in messages:
+        bytes(message)
+
+
+def _run(name, obj, binary):
+    Message.binary_wire = binary
+    try:
+        messages = [Message(CfgIds.network, function, obj) for _ in range(count)]
+        raw = bytes(messages[0])
+        elapsed, _ = timed(_encode, messages, repeat=3)
+        report('%s encode (%d B)' % (name, len(raw)), count, elapsed, 'msgs')
+        elapsed, _ = timed(_round_trip, messages, repeat=3)
+        report('%s round trip (%d B)' % (name, len(raw)), count, elapsed, 'msgs')
+    finally:
+        Message.binary_wire = True
+
+
+def main():
+    Message.intern(function)  # as a Protocol subclass would
+    for size in sizes:
+        text = 'x' * size
+        frame = (bytes(range(256)) * (size // 256 + 1))[:size]
+        _run('legacy, text', text, False)
+        _run('binary, text', text, True)
+        _run('binary, bytes', frame, True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import socket
+import threading
+import time
+
+from autonomous_trust.core.network.stream import ConnectionPool, StreamReceiver
+
+from . import report
+
+host = '127.0.0.1'
+sizes = ((1000, 5000), (1024 * 1024, 200))  # (bytes, count)
+
+
+def _legacy_send(msg, address):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        sock.send(('%d|' % len(msg)).encode())
+        sock.sendall(msg)
+
+
+def _legacy_recv(listener, count, rcvd):
+    for _ in range(count):
+        sock, _ = listener.accept()
+        with sock:
+            byte = b''
+            size_bytes = byte
+            while byte != b'|':
+                size_bytes += byte
+                byte = sock.recv(1)
+            msg_len = int(size_bytes.decode())
+            chunks = []
+            bytes_recvd = 0
+            while bytes_recvd < msg_len:
+                chunk = sock.recv(min(msg_len - bytes_recvd, 2048))
+                chunks.append(chunk)
+                bytes_recvd += len(chunk)
+            b''.join(chunks)
+        rcvd[0] += 1
+
+
+def _pooled_recv(listener, count, rcvd):
+    receiver = StreamReceiver(listener)
+    while rcvd[0] < count:
+        rcvd[0] += len(receiver.poll(0.1))
+    receiver.close()
+
+
+def _run(name, size, count, pooled):
+    msg = b'x' * size
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind((host, 0))
+        listener.listen(128)
+        rcvd = [0]
+        thread = threading.Thread(target=_pooled_recv if pooled else _legacy_recv,
+                                  args=(listener, count, rcvd), daemon=True)
+        thread.start()
+        pool = ConnectionPool()
+        start = time.perf_counter()
+        for _ in range(count):
+            if pooled:
+                pool.send(msg, listener.getsockname())
+            else:
+                _legacy_send(msg, listener.getsockname())
+        thread.join()
+        elapsed = time.perf_counter() - start
+        pool.close()
+    report('%s (%d B)' % (name, size), count, elapsed, 'msgs')
+    print('  %-40s %10.1f MB/s' % ('', size * count / elapsed / 1e6))
+
+
+def main():
+    for size, count in sizes:
+        _run('connect per message, ascii length', size, count, False)
+        _run('pooled connection, binary frame', size, count, True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+import queue
+
+from autonomous_trust.core import Process, ProcMeta
+from autonomous_trust.core.network import Message
+from autonomous_trust.core.protocol import Protocol
+
+from . import timed, report
+
+count = 20000
+polled = 10  # the one-per-cadence loop is far too slow for more
+
+
+class EchoProtocol(Protocol):
+    echo = 'echo'
+
+
+class Echo(Process, metaclass=ProcMeta, proc_name='echo'):
+    def __init__(self):
+        super().__init__({}, None, None, suppress_log=True)
+        self.protocol = EchoProtocol(self.name, self.logger, None)
+        self.protocol.register_handler(EchoProtocol.echo, self.handle_echo)
+
+    def handle_echo(self, queues, message):
+        queues['out'].put(message.obj)
+        return True
+
+    def poll(self, queues, signal):
+        """The loop subsystems used before dispatch_messages()"""
+        while self.keep_running(signal):
+            try:
+                message = queues[self.name].get(block=True, timeout=self.q_cadence)
+            except queue.Empty:
+                message = None
+            if message:
+                self.protocol.run_message_handlers(queues, message)
+            self.sleep_until(self.cadence)
+
+    def process(self, queues, signal):
+        while self.keep_running(signal):
+            self.dispatch_messages(queues)
+
+
+def _run(queues, num):
+    for idx in range(num):
+        queues['echo'].put(Message('echo', EchoProtocol.echo, idx))
+    for _ in range(num):
+        queues['out'].get()
+
+
+def main():
+    with mp.Manager() as manager:
+        for name, loop, num in (('get+sleep_until', Echo.poll, polled), ('dispatch_messages', Echo.process, count)):
+            proc = Echo()
+            queues = {'echo': manager.Queue(), 'out': manager.Queue()}
+            signal = manager.Queue()
+            with mp.Pool(1) as pool:
+                result = pool.apply_async(loop, (proc, queues, signal))
+                elapsed, _ = timed(_run, queues, num)
+                signal.put(Process.sig_quit)
+                result.get()
+            report(name, num, elapsed, 'msgs')
+
+
+if __name__ == '__main__':
+    main()
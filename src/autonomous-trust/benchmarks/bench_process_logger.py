@@ -0,0 +1,58 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+
+from autonomous_trust.core.processes import ProcessLogger, LogLevel
+
+from . import timed, report
+
+count = 5000  # half of them debug
+
+
+def _per_record(log_q, num):
+    """What ProcessLogger.log() did before: one blocking put per record, whatever the level"""
+    for idx in range(num):
+        level = LogLevel.DEBUG if idx % 2 else LogLevel.INFO
+        log_q.put((level, 'bench', idx), block=True, timeout=0.001)
+
+
+def _batched(log_q, num):
+    logger = ProcessLogger('bench', log_q, level=LogLevel.INFO)
+    for idx in range(num):
+        logger.log(LogLevel.DEBUG if idx % 2 else LogLevel.INFO, idx)
+    logger.flush()
+
+
+def _drain(log_q):
+    try:
+        while True:
+            log_q.get_nowait()
+    except Exception:  # noqa
+        pass
+
+
+def main():
+    with mp.Manager() as manager:
+        log_q = manager.Queue()
+        for name, func in (('per-record put', _per_record), ('ProcessLogger', _batched)):
+            elapsed, _ = timed(func, log_q, count)
+            _drain(log_q)
+            report(name, count, elapsed, 'records')
+
+
+if __name__ == '__main__':
+    main()
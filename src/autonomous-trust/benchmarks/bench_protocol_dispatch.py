@@ -0,0 +1,79 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import logging
+
+import icontract
+
+from autonomous_trust.core.capabilities import Capabilities, PeerCapabilities
+from autonomous_trust.core.identity import Group, Peers
+from autonomous_trust.core.network import Message
+from autonomous_trust.core.protocol import Protocol
+
+from . import timed, report
+
+count = 200000
+functions = ['f%d' % idx for idx in range(20)]
+
+
+class BenchProtocol(Protocol):
+    pass
+
+
+class ScanningProtocol(BenchProtocol):
+    """Dispatch as run_message_handlers used to"""
+    @icontract.require(lambda queues: len(queues) > 0)
+    @icontract.require(lambda message: message is not None)
+    def run_message_handlers(self, queues, message):
+        if isinstance(message, Group):
+            self.group = message
+            return True
+        if isinstance(message, Peers):
+            self.peers = message
+            return True
+        if isinstance(message, Capabilities):
+            self.capabilities = message
+            return True
+        if isinstance(message, PeerCapabilities):
+            self.peer_capabilities = message
+            return True
+        if isinstance(message, Message):
+            if message.process == self.proc_name:
+                for name, handler in self.handlers.items():
+                    if name == message.function:
+                        return self.handlers[name](queues, message)
+        return False
+
+
+def _dispatch(proto, queues, messages):
+    for idx in range(count):
+        proto.run_message_handlers(queues, messages[idx % len(messages)])
+
+
+def main():
+    messages = [Message('bench', func, None) for func in functions]
+    queues = {'bench': None}
+    for proto_type in (ScanningProtocol, BenchProtocol):
+        proto = proto_type('bench', logging.getLogger('bench'), None)
+        for func in functions:
+            proto.register_handler(func, lambda q, m: True)
+        elapsed, _ = timed(_dispatch, proto, queues, messages, repeat=3)
+        report('%s (%d handlers)' % (proto_type.__name__, len(functions)), count, elapsed, 'msgs')
+        print('  %-40s %10.2f us/msg' % ('', elapsed / count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
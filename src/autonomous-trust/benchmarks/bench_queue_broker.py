@@ -0,0 +1,54 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+
+from autonomous_trust.core.queue_broker import QueueBroker, BrokerManager
+
+from . import timed, report
+
+count = 2000
+live = 500  # queues held at once, i.e. two per peer of a 250 peer cohort
+
+
+def _create(queue_type):
+    for _ in range(count):
+        queue_type()
+
+
+def _churn(broker):
+    held = [broker.acquire() for _ in range(live)]
+    for idx in range(count):
+        broker.release(held[idx % live])
+        held[idx % live] = broker.acquire()
+    for q in held:
+        broker.release(q)
+
+
+def main():
+    elapsed, _ = timed(_churn, QueueBroker(), repeat=3)
+    report('threads: acquire+release', count + live, elapsed, 'ops')
+    with BrokerManager(ctx=mp.get_context()) as manager:
+        elapsed, _ = timed(_create, manager.Queue)
+        report('processes: new manager queue', count, elapsed, 'queues')
+        broker = manager.QueueBroker()
+        elapsed, _ = timed(_churn, broker)
+        report('processes: acquire+release', count + live, elapsed, 'ops')
+        print('  broker live/idle/created: %d/%d/%d' % broker.stats())
+
+
+if __name__ == '__main__':
+    main()
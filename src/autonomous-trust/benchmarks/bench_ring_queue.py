@@ -0,0 +1,85 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+import time
+
+from autonomous_trust.core.processes import Process, ProcMeta
+from autonomous_trust.core.ring_queue import RingQueue
+
+round_trips = 2000
+stream = 20000
+sizes = (64, 65536)
+
+
+class Pinger(Process, metaclass=ProcMeta, proc_name='pinger'):
+    """Measures round trips to Ponger, then streams to it"""
+    def process(self, queues, signal):
+        payload = self.configs['payload']
+        start = time.perf_counter()
+        for _ in range(round_trips):
+            queues['ponger'].put(payload)
+            queues[self.name].get()
+        latency = (time.perf_counter() - start) / round_trips
+        start = time.perf_counter()
+        for _ in range(stream):
+            queues['ponger'].put(payload)
+        queues['ponger'].put(None)
+        queues[self.name].get()
+        return latency, time.perf_counter() - start
+
+
+class Ponger(Process, metaclass=ProcMeta, proc_name='ponger'):
+    """Echoes round trips, then counts streamed messages"""
+    def process(self, queues, signal):
+        for _ in range(round_trips):
+            queues['pinger'].put(queues[self.name].get())
+        while queues[self.name].get() is not None:
+            pass
+        queues['pinger'].put(True)
+
+
+def _run(name, queue_type, payload, size):
+    ctx = mp.get_context()
+    configs = {'payload': payload}
+    procs = [Pinger(configs, None, None, suppress_log=True), Ponger(configs, None, None, suppress_log=True)]
+    queues = {proc.name: queue_type() for proc in procs}
+    rings = [q for q in queues.values() if isinstance(q, RingQueue)]
+    inherit = {}
+    if rings:
+        inherit = dict(initializer=RingQueue.inherit, initargs=tuple(rings))
+    with ctx.Pool(len(procs), **inherit) as pool:
+        results = [pool.apply_async(proc.process, (queues, None)) for proc in procs]
+        latency, elapsed = results[0].get()
+        results[1].get()
+    for ring in rings:
+        ring.close()
+        ring.unlink()
+    print('  %-40s %8.1f us round trip  %10.1f msgs/sec' % ('%s (%d B)' % (name, size),
+                                                            latency * 1e6, stream / elapsed))
+
+
+def main():
+    with mp.Manager() as manager:
+        for size in sizes:
+            payload = bytes(size)
+            _run('manager queue', manager.Queue, payload, size)
+            _run('ring queue', RingQueue, payload, size)
+            _run('ring queue, pickled', RingQueue, {'payload': payload}, size)
+
+
+if __name__ == '__main__':
+    main()
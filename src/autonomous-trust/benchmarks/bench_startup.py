@@ -0,0 +1,78 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from autonomous_trust.core.system import PackageHash
+
+from . import timed, report
+
+budget = 1.0  # seconds, for 'python -m autonomous_trust --help', which imports everything a node needs
+repeat = 5
+
+
+def _run(*args):
+    """
+    Run python with -X importtime
+    :return: wall seconds, dict of top-level module to cumulative import seconds
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    modules = {}
+    for line in proc.stderr.splitlines():  # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative) / 1e6
+    return elapsed, modules
+
+
+def _best(*args):
+    return min((_run(*args) for _ in range(repeat)), key=lambda result: result[0])
+
+
+def _package_hash(cache_file):
+    return PackageHash(cache_file=cache_file)
+
+
+def main():
+    elapsed, modules = _best('-c', 'import autonomous_trust.core')
+    report('import autonomous_trust.core', 1, modules['autonomous_trust.core'], 'imports')
+
+    elapsed, modules = _best('-m', 'autonomous_trust', '--help')
+    report('python -m autonomous_trust --help', 1, elapsed, 'starts')
+    report('  of which imports', 1, modules['autonomous_trust.core.__main__'], 'imports')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, PackageHash.cache_name)
+        cold, _ = timed(_package_hash, None)
+        _package_hash(cache_file)
+        cached, _ = timed(_package_hash, cache_file)
+    report('PackageHash', 1, cold, 'hashes')
+    report('PackageHash, cached', 1, cached, 'hashes')
+
+    if elapsed > budget:
+        raise SystemExit('Startup took %.3fs, over the %.3fs budget' % (elapsed, budget))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+
+import random
+from datetime import datetime, timedelta
+
+from autonomous_trust.core.structures.dag import StepDAG, LinkedStep
+
+from . import timed, report
+
+shared = 100000
+diverged = 1000  # per peer, since the last exchange
+lookups = 10000
+
+start = datetime(2024, 1, 1)
+
+
+class History(StepDAG):
+    def _validate(self, branch):
+        return True
+
+
+def _histories():
+    mine, theirs = History(), History()
+    for tick in range(shared):
+        mine.add_step(LinkedStep(tick, timestamp=start + timedelta(seconds=tick)))
+    for step in reversed(mine.recite()):
+        theirs.add_step(LinkedStep.from_bytes(step.to_bytes()))
+    for tick in range(shared, shared + diverged):
+        mine.add_step(LinkedStep(tick, timestamp=start + timedelta(seconds=tick, milliseconds=1)))
+        theirs.add_step(LinkedStep(tick, timestamp=start + timedelta(seconds=tick, milliseconds=2)))
+    return mine, [LinkedStep.from_bytes(step.to_bytes()) for step in theirs.recite()]  # as received
+
+
+def _list_diff(mine, theirs):  # element by element, root to head, as before
+    mine, theirs = list(reversed(mine)), list(reversed(theirs))
+    for idx in range(min(len(mine), len(theirs))):
+        if mine[idx].uuid != theirs[idx].uuid:
+            return idx
+    return None
+
+
+def _ancestors(dag, depths):
+    for depth in depths:
+        dag.ancestor(dag.main, depth)
+
+
+def main():
+    mine, theirs = _histories()
+    elapsed, _ = timed(_list_diff, mine.recite(), theirs, repeat=3)
+    report('diff, list compare', 1, elapsed, 'merges')
+
+    name = mine.ingest_branch(theirs)
+    elapsed, _ = timed(mine.diff, name, repeat=3)
+    report('diff, common ancestor', 1, elapsed, 'merges')
+    depths = [random.randrange(shared) for _ in range(lookups)]
+    elapsed, _ = timed(_ancestors, mine, depths, repeat=3)
+    report('ancestor at depth', lookups, elapsed, 'lookups')
+    elapsed, _ = timed(mine.recite, mine.main_branch, mine.ancestor(mine.main, shared), repeat=3)
+    report('recite since divergence', diverged, elapsed, 'steps')
+    mine.merge(name)
+
+    mine, theirs = _histories()
+    elapsed, diff = timed(mine.catch_up, theirs, repeat=1)
+    assert len(diff) == diverged + 1
+    assert len(mine.recite()) == shared + 2 * diverged
+    report('catch up, %dk shared' % (shared // 1000), 1, elapsed, 'merges')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+
+import random
+import tracemalloc
+from uuid import uuid4
+
+from autonomous_trust.core.structures.merkle import MerkleTree, SimplestBlob
+
+from . import timed, report
+
+leaves = 1000000
+queries = MerkleTree.proof_cache
+traced = 100000  # tracemalloc is too slow for the full tree
+
+
+class Blob(SimplestBlob):
+    @property
+    def designation(self) -> bytes:
+        return self.uuid.bytes
+
+
+def _insert(tree, blobs):
+    for blob in blobs:
+        tree.insert(blob)
+
+
+def _prove(tree, sample):
+    return [tree.inclusion_proof(blob) for blob in sample]
+
+
+def _audit(tree, sample, proofs):
+    return all(tree.audit(blob, proof) for blob, proof in zip(sample, proofs))
+
+
+def _memory(blobs):
+    tracemalloc.start()
+    try:
+        tree = MerkleTree()
+        _insert(tree, blobs)
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    blobs = [Blob(None, uuid4()) for _ in range(leaves)]
+    tree = MerkleTree()
+    elapsed, _ = timed(_insert, tree, blobs)
+    report('insert', leaves, elapsed, 'leaves')
+
+    sample = random.sample(blobs, queries)
+    elapsed, _ = timed(_prove, tree, sample)
+    report('inclusion_proof, cold', queries, elapsed, 'proofs')
+    elapsed, proofs = timed(_prove, tree, sample, repeat=3)
+    report('inclusion_proof, memoized', queries, elapsed, 'proofs')
+
+    elapsed, valid = timed(_audit, tree, sample, proofs, repeat=3)
+    assert valid
+    report('audit', queries, elapsed, 'proofs')
+
+    used = _memory(blobs[:traced])
+    print('  %-40s %10d leaves %12.1f bytes/leaf' % ('memory, excluding blobs', traced, used / traced))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+
+import os
+import tempfile
+
+from autonomous_trust.core.config import to_yaml_string, from_yaml_string
+from autonomous_trust.core.structures.dag import StepDAG, LinkedStep
+from autonomous_trust.core.structures.steplog import StepLog
+
+from . import timed, report
+
+appended = 300  # rewriting the whole history per step is quadratic, keep it short
+restored = 10000
+
+
+class History(StepDAG):
+    def _validate(self, branch):
+        return True
+
+
+def _steps(count):
+    return [LinkedStep(os.urandom(32)) for _ in range(count)]
+
+
+def _rewrite_yaml(path, steps):
+    dag = History()
+    for step in steps:
+        dag.add_step(step)
+        with open(path, 'w') as out:
+            out.write(to_yaml_string(dag.recite()))
+
+
+def _append_log(path, steps):
+    if os.path.exists(path):
+        os.remove(path)
+    dag = History()
+    dag.attach(StepLog(path))
+    for step in steps:
+        dag.add_step(step)
+    dag.log.close()
+
+
+def _load_yaml(path):
+    dag = History()
+    with open(path, 'r') as src:
+        dag.ingest_branch(from_yaml_string(src.read()), 'loaded')
+    return dag
+
+
+def _open_log(path):
+    dag = History()
+    dag.attach(StepLog(path))
+    dag.main.payload  # noqa
+    return dag
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        yaml_path = os.path.join(tmp, 'history.cfg.yaml')
+        log_path = os.path.join(tmp, 'history.log')
+
+        steps = _steps(appended)
+        elapsed, _ = timed(_rewrite_yaml, yaml_path, steps, repeat=1)
+        report('add, yaml rewrite', appended, elapsed, 'steps')
+        elapsed, _ = timed(_append_log, log_path, steps, repeat=3)
+        report('add, log append', appended, elapsed, 'steps')
+
+        steps = _steps(restored)
+        dag = History()
+        for step in steps:
+            dag.add_step(step)
+        with open(yaml_path, 'w') as out:
+            out.write(to_yaml_string(dag.recite()))
+        _append_log(log_path, steps)
+        elapsed, _ = timed(_load_yaml, yaml_path, repeat=1)
+        report('open, yaml', restored, elapsed, 'steps')
+        elapsed, _ = timed(_open_log, log_path, repeat=3)
+        report('open, log', restored, elapsed, 'steps')
+        dag = _open_log(log_path)
+        elapsed, _ = timed(dag.recite, repeat=1)
+        report('recite after open, log', restored, elapsed, 'steps')
+
+
+if __name__ == '__main__':
+    main()
@@ -15,10 +15,17 @@
 # ******************
 
 import os
+import queue
+import threading
+import time
+from operator import mul
 
+from autonomous_trust.core import Process, CfgIds
+from autonomous_trust.core.capabilities import Capability
 from autonomous_trust.core.config import Configuration
 from autonomous_trust.core.config.generate import generate_identity
 from autonomous_trust.core.automate import AutonomousTrust
+from autonomous_trust.core.negotiation import Task, TaskParameters
 
 
 def test_configure(setup_teardown):
@@ -28,3 +35,67 @@ def test_configure(setup_teardown):
     assert 'network' in cfgs.keys()
     assert 'identity' in cfgs.keys()
     assert 'peers' in cfgs.keys()
+
+
+def test_event_loop():
+    at = AutonomousTrust(multiproc=False, logfile=Configuration.log_stdout)
+    at.capabilities.register_ability('mult', mul)
+    queues = {at.proc_name: at._my_queue, CfgIds.negotiation: queue.Queue(), CfgIds.reputation: queue.Queue(),
+              at.external_control: queue.Queue()}
+    ticked = threading.Event()
+    at.init_tasking = lambda _: at.schedule(0.01, ticked.set)
+    loop = threading.Thread(target=at.autonomous_loop, args=({}, queues, {}))
+    loop.start()
+    try:
+        tasks = [Task(TaskParameters(Capability('mult'), args=(idx, 2)), None) for idx in range(10)]
+        for task in tasks:  # well beyond the old one message per cadence
+            queues[at.proc_name].put(task)
+        results = [queues[CfgIds.negotiation].get(timeout=2) for _ in tasks]
+        assert sorted(idx * 2 for idx in range(10)) == sorted(result.result for result in results)
+        assert {} == at.active_tasks
+        assert ticked.wait(2)
+    finally:
+        queues[at.external_control].put(Process.sig_quit)
+        loop.join(5)
+    assert not loop.is_alive()
+
+
+class _SaturatedPool(object):  # tasks start only when told to
+    def __init__(self):
+        self.waiting = []
+        self.value = None
+
+    def apply_async(self, func, args, callback=None, error_callback=None):
+        self.waiting.append((func, args))
+        return self
+
+    def run(self):
+        func, args = self.waiting.pop()
+        self.value = func(*args)
+
+    def ready(self):
+        return not self.waiting
+
+    def get(self):
+        return self.value
+
+
+def test_late_pid():
+    at = AutonomousTrust(multiproc=False, logfile=Configuration.log_stdout)
+    at.capabilities.register_ability('mult', mul)
+    queues = {CfgIds.negotiation: queue.Queue(), CfgIds.reputation: queue.Queue()}
+    pool, results = _SaturatedPool(), {}
+    task = Task(TaskParameters(Capability('mult'), args=(3, 2)), None)
+    start = time.monotonic()
+    at._handle_message(queues, pool, results, task)
+    assert time.monotonic() - start < 0.5  # does not wait for the task to start
+    assert str(task.uuid) not in at.active_pids
+
+    pool.run()  # reports its pid late, as an event
+    assert at._handle_events([(at._pid_source, at.pid_queue.get_nowait())], queues, pool, results)
+    assert os.getpid() == at.active_pids[str(task.uuid)]
+    at._handle_results(queues, results)
+    assert 6 == queues[CfgIds.negotiation].get_nowait().result
+    assert {} == at.active_pids
+    at._record_pid((str(task.uuid), os.getpid()))  # reported after completion
+    assert {} == at.active_pids
@@ -0,0 +1,58 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from autonomous_trust.core.config import to_wire, from_wire, from_payload, WireFormatError
+from autonomous_trust.core.capabilities import Capability
+from autonomous_trust.core.identity import Identity
+from autonomous_trust.core.negotiation.negotiation import Task, TaskParameters, TaskResult
+from autonomous_trust.core.network.message import Message
+from autonomous_trust.core.reputation.reputation import Transaction
+
+
+def test_values():
+    aware = datetime(2024, 2, 29, 12, 30, 15, 1234, tzinfo=timezone(timedelta(hours=-5)))
+    items = ((1, -2, 2 ** 70), [None, True, 0.5, 'text', b'\x00raw'],
+             {'when': aware, 'naive': aware.replace(tzinfo=None), 'delta': timedelta(0), 'dec': Decimal('1.25')},
+             uuid4())
+    assert items == from_wire(to_wire(items))
+    assert [1, 2] == from_payload('- 1\n- 2\n')
+    with pytest.raises(WireFormatError):
+        from_wire(b'\xff\xff\xff')
+
+
+def test_configurations(setup_teardown):
+    me = Identity.initialize('a.b@example.com', 'b', '10.0.0.1')
+    public = me.publish()
+    for ident in (me, public):
+        assert ident == from_wire(to_wire(ident))
+    assert from_wire(to_wire(public))._public_only
+
+    task = Task(TaskParameters(Capability('pi'), args=(3, 'x'), kwargs={'k': b'v'}), public)
+    other = from_wire(to_wire(task))
+    assert (task.uuid, task.requestor, task.size) == (other.uuid, other.requestor, other.size)
+    assert task.parameters.to_dict() == other.parameters.to_dict()
+    result = from_wire(to_wire(TaskResult(task, 3.14)))
+    assert (task.uuid, 3.14) == (result.uuid, result.result)
+
+    message = Message.parse(bytes(Message('reputation', 'grant', (task.uuid, Transaction(task.uuid)))), None)
+    assert task.uuid == message.obj[1].task_id
+    assert len(to_wire(task)) < len(task.to_yaml_string())
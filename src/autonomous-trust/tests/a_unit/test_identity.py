@@ -15,9 +15,15 @@
 # ******************
 
 import os
+import queue
 import uuid as uuid_mod
+from types import SimpleNamespace
 from autonomous_trust.core.config import Configuration
-from autonomous_trust.core.identity import Identity, Peers, Signature, Encryptor
+from autonomous_trust.core.identity import Identity, Peers, Signature, Encryptor, BatchVerifier, boxes
+from autonomous_trust.core.identity import IdentityProcess
+from autonomous_trust.core.identity.protocol import IdentityProtocol
+from autonomous_trust.core.network import Message
+from autonomous_trust.core.system import CfgIds
 
 from .. import TEST_DIR
 
@@ -58,3 +64,88 @@ def test_peers(setup_teardown):
     print(t3.listing)
     print(t4.listing)
     assert repr(t3) == repr(t4)
+
+
+def test_box_cache(setup_teardown):
+    me = Identity.initialize('me.myself.i', 'myself', '127.0.0.1')
+    peer = Identity.initialize('peer.one', 'p1', '127.0.0.2')
+    peers = Peers()
+    peers.add(peer.publish())
+    boxes.invalidate()
+    hits, misses, _ = boxes.to_tuple()
+    for idx in range(3):
+        assert b'msg%d' % idx == peer.decrypt(me.encrypt(b'msg%d' % idx, peer), me)
+    assert (hits + 4, misses + 2, 2) == boxes.to_tuple()
+
+    rotated = Identity(peer.uuid, peer.address, peer.fullname, peer.nickname, peer.signature, Encryptor.generate())
+    peers.add(rotated.publish())
+    assert 0 == len(boxes)  # both directions used the old key
+    assert b'new key' == rotated.decrypt(me.encrypt(b'new key', rotated), me)
+
+
+def test_peer_indexes(setup_teardown):
+    peers = Peers()
+    p1 = Identity(uuid_mod.uuid4(), '123.4.5.67', 'peer1', 'p1', Signature.generate(), Encryptor.generate())
+    p2 = Identity(uuid_mod.uuid4(), '123.5.6.78', 'peer2', 'p2', Signature.generate(), Encryptor.generate())
+    peers.add(p1)
+    peers.add(p2, 0)
+    assert p1 is peers.find_by_uuid(p1.uuid) is peers.find_by_address('123.4.5.67/24') is peers.find_by_index('p1')
+    assert (0, Peers.VALUES - 1) == (peers._find('p2'), peers._find_v('p2'))
+    peers.promote(p2)
+    peers.move(p2, 2)
+    assert (2, Peers.VALUES - 2) == (peers._find('p2'), peers._find_v('p2'))
+
+    moved = Identity(p2.uuid, '123.9.9.99', 'peer2', 'p2', p2.signature, p2.encryptor)
+    peers.add(moved)  # same peer, new address
+    assert 2 == len(peers) == len(peers.all)
+    assert peers.find_by_address('123.5.6.78') is None
+    assert (1, Peers.VALUES - 2) == (peers._find('p2'), peers._find_v('p2'))
+
+    for _ in range(Peers.VALUES):
+        peers.demote(p1)
+    assert p1 not in peers
+    assert [moved] == list(peers.all)
+    assert (None, None) == (peers.find_by_uuid(p1.uuid), peers.find_by_address(p1.address))
+    assert [{}, {'p2': moved}, {}] == peers.hierarchy
+    assert repr(peers) == repr(Configuration.from_yaml_string(peers.to_yaml_string()))
+
+
+def test_batch_verifier():
+    keys = [Signature.generate() for _ in range(8)]
+    jobs = []
+    for idx, key in enumerate(keys):
+        message = b'vote %d' % idx
+        jobs.append((key.public, message, key.private.sign(message).signature))
+    forged = (keys[0].public, b'vote 1', jobs[1][2])
+    malformed = (keys[0].public, b'vote 0', b'too short')
+
+    verifier = BatchVerifier(workers=3)
+    assert [True] * 8 + [False, False] == verifier.verify_batch(jobs + [forged, malformed])
+    assert (0, 10, 8) == verifier.to_tuple()
+    assert [True, False] == verifier.verify_batch([jobs[2], forged])  # failures are never cached
+    assert (1, 11, 8) == verifier.to_tuple()
+    assert verifier.verify(*jobs[5])
+
+
+def test_phase_gated_messages():
+    me = Identity(uuid_mod.uuid4(), '127.0.0.1', 'full name', 'nick', Signature.generate(), None,
+                  _public_only=False)
+    configs = {CfgIds.identity: me, 'processes': [SimpleNamespace(name=CfgIds.network)], 'package_hash': b'ours'}
+    log_q = queue.Queue()
+    proc = IdentityProcess(configs, None, log_q)
+    queues = {proc.name: queue.Queue()}
+    proc.phase = 1
+    stranger = Identity(uuid_mod.uuid4(), '127.0.0.2', 'full name', 'other', Signature.generate(), None)
+    queues[proc.name].put(Message(proc.name, IdentityProtocol.accept, (stranger, b'theirs', [])))
+    proc.keep_running(queue.Queue())
+    assert 1 == proc.dispatch_messages(queues)
+    assert 1 == len(proc.messages)  # too early, kept rather than dropped
+
+    proc.phase = 2
+    proc.retry_messages(queues)
+    assert [] == proc.messages
+    proc.logger.flush(force=True)
+    records = []
+    while not log_q.empty():
+        records += log_q.get_nowait()
+    assert "Counterfeit 'peer'" in [msg for _, _, msg in records]  # handled once the phase allows
@@ -18,7 +18,8 @@ from uuid import uuid4
 import secrets
 
 from autonomous_trust.core.identity import Identity, Peers, Signature
-from autonomous_trust.core.identity.history import IdentityByAuthority
+from autonomous_trust.core.identity.history import IdentityByAuthority, IdentityObj
+from autonomous_trust.core.identity.history.history import IdentityHistory
 
 
 def _random_identity():
@@ -33,3 +34,55 @@ def test_add_peer():
     for _ in range(10):
         ident = _random_identity()
         peers.promote(ident)
+
+
+def _signing_identity(nickname='nick'):
+    return Identity(uuid4(), '127.0.0.1', 'full name', nickname, Signature.generate(), None, _public_only=False)
+
+
+def test_finalize_checks_signatures():
+    me = _signing_identity()
+    peers = Peers()
+    voters = [_signing_identity('voter%d' % idx) for idx in range(3)]
+    for voter in voters:
+        peers.add(voter)
+    hist = IdentityByAuthority(me, peers, None, 5)
+    assert 4 == len(hist.voters)
+    newbie = IdentityObj(_random_identity(), uuid4())
+    counted = []
+    count_vote = hist._count_vote
+    hist._count_vote = lambda blob, proof, voter: counted.append(voter.uuid) or count_vote(blob, proof, voter)
+
+    def vote(voter, approval, signer=None, signed_approval=None):
+        proof = hist.prove(newbie)
+        proof.uuid, proof.approval = voter.uuid, approval
+        if signed_approval is not None:
+            proof.approval = signed_approval
+        signed = (signer or voter).sign(proof)
+        proof.approval = approval
+        return newbie, proof, (signed.message, signed.signature)
+
+    for voter in voters:
+        assert hist.verify(*vote(voter, True))
+    assert hist.verify(*vote(voters[0], False, signer=me))  # forged rejection, counted last if unchecked
+    assert hist.verify(*vote(voters[1], False, signed_approval=True))  # not what the voter signed
+    assert hist.finalize(newbie)
+    assert [voter.uuid for voter in voters] == counted  # every valid vote, and only those
+
+    assert hist.verify(*vote(voters[1], True, signer=me))
+    assert not hist.finalize(newbie)  # no valid votes
+
+
+def test_pre_verify_signed_tuple():
+    me, voter = _signing_identity('me'), _signing_identity('voter')
+    peers = Peers()
+    peers.add(voter)
+    hist = IdentityByAuthority(me, peers, None, 5)
+    pre_verify = IdentityHistory._pre_verify  # the default, as for proof of work
+    newbie = IdentityObj(_random_identity(), uuid4())
+    proof = hist.prove(newbie)
+    proof.uuid = voter.uuid
+    signed = voter.sign(proof)
+    assert pre_verify(hist, newbie, proof, (signed.message, signed.signature))  # as count_vote passes it
+    forged = me.sign(proof)
+    assert not pre_verify(hist, newbie, proof, (forged.message, forged.signature))
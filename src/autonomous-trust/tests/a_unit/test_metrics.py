@@ -0,0 +1,71 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import queue
+from urllib.request import urlopen
+
+from autonomous_trust.core import Process, ProcMeta, CfgIds
+from autonomous_trust.core.metrics import MetricsRegistry, MetricsCollector, MetricsServer, MetricsReport
+
+
+class Idle(Process, metaclass=ProcMeta, proc_name='idle'):
+    def __init__(self):
+        super().__init__({}, None, None, suppress_log=True)
+
+
+def test_registry():
+    registry = MetricsRegistry()
+    registry.counter('sent').inc(3)
+    registry.gauge('depth').set(5)
+    registry.gauge('depth').set(2)
+    with registry.timer('work'):
+        pass
+    snapshot = registry.snapshot()
+    assert ('counter', 3) == snapshot['sent']
+    assert ('gauge', (2, 5)) == snapshot['depth']
+    kind, (counts, total) = snapshot['work']
+    assert 'histogram' == kind and 1 == sum(counts) and total >= 0
+
+
+def test_report_and_export():
+    proc = Idle()
+    queues = {proc.name: queue.Queue(), CfgIds.main: queue.Queue()}
+    proc.keep_running(queue.Queue())
+    proc.dispatch_messages(queues)
+    report = queues[CfgIds.main].get_nowait()
+    assert isinstance(report, MetricsReport) and proc.name == report.source
+    proc.report_metrics(queues)
+    assert queues[CfgIds.main].empty()  # not before metrics_interval
+
+    collector = MetricsCollector()
+    collector.update(report)
+    main = MetricsRegistry()
+    main.counter('messages_handled').inc(7)
+    collector.attach(CfgIds.main, main)
+    assert {proc.name, CfgIds.main} == set(collector.snapshot())
+
+    text = collector.to_prometheus()
+    assert 'autonomous_trust_messages_handled_total{process="main"} 7\n' in text
+    assert '# TYPE autonomous_trust_handler_seconds histogram' in text
+    assert 'autonomous_trust_handler_seconds_bucket{process="idle",le="+Inf"} 0' in text
+
+    server = MetricsServer(collector, 0)
+    server.start()
+    try:
+        with urlopen('http://127.0.0.1:%d/metrics' % server.port, timeout=5) as response:
+            assert text == response.read().decode()
+    finally:
+        server.stop()
@@ -0,0 +1,92 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import asyncio
+import logging
+import queue
+import socket
+from collections import defaultdict, deque
+
+from autonomous_trust.core.network.async_udp import AsyncUDPNetworkProcess, DatagramChannel
+from autonomous_trust.core.network.fragment import Reassembler
+from autonomous_trust.core.network.message import Message
+from autonomous_trust.core.network.udp import UDPNetworkProcess
+from autonomous_trust.core.system import cadence, net_cadence
+
+
+def test_no_busy_cadence():
+    assert net_cadence == UDPNetworkProcess.cadence
+    assert cadence == AsyncUDPNetworkProcess.cadence
+    assert UDPNetworkProcess.name == AsyncUDPNetworkProcess.name
+
+
+def test_channel():
+    async def receive(count):
+        loop = asyncio.get_running_loop()
+        rcvd = []
+        done = loop.create_future()
+
+        def on_datagram(data, addr):
+            rcvd.append((data, addr))
+            if len(rcvd) == count:
+                done.set_result(True)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.bind(('127.0.0.1', 0))
+        transport, _ = await loop.create_datagram_endpoint(lambda: DatagramChannel(on_datagram), sock=sock)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as send_sock:
+            for idx in range(count):
+                send_sock.sendto(b'test%d' % idx, sock.getsockname())
+            await asyncio.wait_for(done, 1)
+            transport.close()
+            return rcvd, send_sock.getsockname()[1]
+
+    msgs, sender_port = asyncio.run(receive(5))
+    assert [b'test%d' % idx for idx in range(5)] == [data for data, _ in msgs]
+    assert all([('127.0.0.1', sender_port) == addr for _, addr in msgs])
+
+
+def test_route_datagram():
+    net = AsyncUDPNetworkProcess.__new__(AsyncUDPNetworkProcess)  # receive path only, without config or bound sockets
+    net.my_address, net.reassembler, net._unread = '10.0.0.1', Reassembler(), defaultdict(deque)
+    net.subsystems, net.logger, net.route_dropped = ['reputation', 'identity'], logging.getLogger(), 0
+    queues = {'reputation': queue.Queue(maxsize=1), 'identity': queue.Queue()}
+
+    async def receive(count):
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        on_datagram = net._on_datagram(queues, net._handle_unknown, False)
+
+        def on_route(data, addr):
+            on_datagram(data, addr)
+            if queues['identity'].qsize() == count:
+                done.set_result(True)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.bind(('127.0.0.1', 0))
+        transport, _ = await loop.create_datagram_endpoint(lambda: DatagramChannel(on_route), sock=sock)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as send_sock:
+            for idx in range(2):
+                send_sock.sendto(bytes(Message('reputation', 'test', 'rep%d' % idx)), sock.getsockname())
+            for idx in range(count):
+                send_sock.sendto(bytes(Message('identity', 'test', 'id%d' % idx)), sock.getsockname())
+            await asyncio.wait_for(done, 1)
+            transport.close()
+
+    asyncio.run(receive(3))
+    assert ['id0', 'id1', 'id2'] == [queues['identity'].get_nowait().obj for _ in range(3)]
+    assert 'rep0' == queues['reputation'].get_nowait().obj
+    assert 1 == net.route_dropped  # a full queue drops instead of stalling the loop
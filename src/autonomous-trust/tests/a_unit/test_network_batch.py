@@ -0,0 +1,71 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import socket
+from collections import defaultdict, deque
+
+from autonomous_trust.core.network.batch import BatchFrame, Outbox, recv_all
+from autonomous_trust.core.network.fragment import Fragmenter, Reassembler
+from autonomous_trust.core.network.udp import UDPNetworkProcess
+
+
+def test_frame():
+    msgs = [b'test1', b'', b'test3', BatchFrame.magic]
+    assert msgs == BatchFrame.unpack(BatchFrame.pack(msgs))
+    assert [b'test'] == BatchFrame.unpack(b'test')
+    malformed = BatchFrame.magic + b'\x00\x02test'
+    assert [malformed] == BatchFrame.unpack(malformed)
+
+
+def test_coalesce():
+    outbox = Outbox(64)
+    for idx in range(10):
+        outbox.add(('127.0.0.1', 1), b'test%d' % idx)
+    outbox.add(('127.0.0.1', 2), b'solo')
+    sent = list(outbox.drain())
+    assert 0 == len(outbox)
+    assert 10 == sum([count for dest, _, count in sent if dest[1] == 1])
+    assert all([len(datagram) <= 64 for _, datagram, _ in sent])
+    assert (('127.0.0.1', 2), b'solo', 1) == sent[-1]
+    msgs = []
+    for dest, datagram, _ in sent[:-1]:
+        msgs += BatchFrame.unpack(datagram)
+    assert [b'test%d' % idx for idx in range(10)] == msgs
+
+
+def test_recv_all():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as recv_sock, \
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as send_sock:
+        recv_sock.bind(('127.0.0.1', 0))
+        recv_sock.settimeout(0.1)
+        for idx in range(10):
+            send_sock.sendto(b'test%d' % idx, recv_sock.getsockname())
+        assert 10 == len(recv_all(recv_sock, 64, 64))
+        assert 0.1 == recv_sock.gettimeout()
+
+
+def test_recv_one():
+    udp = UDPNetworkProcess.__new__(UDPNetworkProcess)  # receive path only, without config or bound sockets
+    udp.my_address, udp.reassembler, udp._unread = '10.0.0.1', Reassembler(), defaultdict(deque)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as recv_sock, \
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as send_sock:
+        recv_sock.bind(('127.0.0.1', 0))
+        recv_sock.settimeout(0.1)
+        send_sock.sendto(BatchFrame.pack([b'test1', b'test2']), recv_sock.getsockname())
+        large = bytes(range(256)) * 10
+        for fragment in Fragmenter(1000).split(large):
+            send_sock.sendto(fragment, recv_sock.getsockname())
+        assert [b'test1', b'test2', large] == [udp._recv_udp(recv_sock, 2048)[0] for _ in range(3)]
@@ -0,0 +1,84 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import logging
+import pickle
+import random
+from types import SimpleNamespace
+
+from autonomous_trust.core.network import NetworkProcess
+from autonomous_trust.core.network.buffer import MessageBuffer
+
+
+def test_drop_oldest():
+    buf = MessageBuffer(3)
+    for seq in range(5):
+        buf.append((seq, 'addr%d' % (seq % 2)))
+    assert 3 == len(buf) and 2 == buf.dropped
+    assert [2, 3, 4] == [buf.popleft()[0] for _ in range(3)]
+    assert not buf
+
+
+def test_fair_share():
+    buf = MessageBuffer(4, MessageBuffer.FAIR_SHARE)
+    buf.append((0, 'quiet'))
+    for seq in range(1, 10):
+        buf.append((seq, 'flood'))
+    assert 4 == len(buf) and 6 == buf.dropped
+    assert [(0, 'quiet'), (7, 'flood'), (8, 'flood'), (9, 'flood')] == [buf.popleft() for _ in range(4)]
+
+    for sender in ('a', 'a', 'b', 'c'):
+        buf.append((sender, sender))
+    assert ['a', 'b', 'c', 'a'] == [buf.popleft()[0] for _ in range(4)]  # round robin
+
+    buf.append((1, 'a'))
+    copy = pickle.loads(pickle.dumps(buf))
+    assert (1, 'a') == copy.popleft()
+
+
+def test_fair_share_evicts_longest():
+    rng = random.Random(0)
+    buf = MessageBuffer(50, MessageBuffer.FAIR_SHARE)
+    for seq in range(2000):
+        if rng.random() < 0.3 and buf:
+            buf.popleft()
+            continue
+        longest = max((len(pending) for pending in buf._senders.values()), default=0)
+        before = {sender: len(pending) for sender, pending in buf._senders.items()}
+        peer = 'peer%d' % rng.randrange(20)
+        if buf.append((seq, peer)):
+            before[peer] = before.get(peer, 0) + 1
+            victims = [sender for sender in before if len(buf._senders.get(sender, ())) < before[sender]]
+            assert 1 == len(victims) and longest == before[victims[0]] - (victims[0] == peer)
+        assert len(buf) == sum(len(pending) for pending in buf._senders.values()) <= 50
+
+
+def test_retry_encrypted():
+    delivered = []
+    peer = SimpleNamespace(nickname='peer')
+    net = SimpleNamespace(encrypted_messages=MessageBuffer(8), mystery_max_retries=1, logger=logging.getLogger(),
+                          peers=SimpleNamespace(find_by_address=lambda addr: peer if addr == 'known' else None),
+                          _decrypt=lambda sender, stage, handler, queues, raw_msg, peer: delivered.append(raw_msg),
+                          _deliver_peer=None)
+    for item in ((b'1', 'known'), (b'2', 'stranger'), (b'3', 'known')):
+        net.encrypted_messages.append(item)
+    try_count = {}
+    NetworkProcess._retry_encrypted(net, {}, try_count)  # used to skip entries while removing from the list
+    assert [b'1', b'3'] == delivered
+    assert [(b'2', 'stranger')] == [net.encrypted_messages.popleft()] and not net.encrypted_messages
+    net.encrypted_messages.append((b'2', 'stranger'))
+    NetworkProcess._retry_encrypted(net, {}, try_count)
+    assert not net.encrypted_messages  # retries used up
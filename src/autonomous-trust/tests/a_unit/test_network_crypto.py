@@ -0,0 +1,51 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import logging
+import random
+import threading
+import time
+
+from autonomous_trust.core.network.crypto import CryptoPool
+
+
+def test_ordering():
+    pool = CryptoPool(4, logging.getLogger(__name__))
+    pool.start()
+    received = {}
+    lock = threading.Lock()
+
+    def handle(sender, seq):
+        time.sleep(random.random() / 10000)
+        with lock:
+            received.setdefault(sender, []).append(seq)
+
+    for seq in range(200):
+        for sender in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            assert pool.submit(sender, 'peer', handle, sender, seq)
+    pool.submit('10.0.0.1', 'group', lambda: 1 / 0)  # logged, does not kill the worker
+    pool.stop()
+    assert {sender: list(range(200)) for sender in ('10.0.0.1', '10.0.0.2', '10.0.0.3')} == received
+    stats = pool.stats
+    assert (0, 0) == stats['crypto_queue']
+    assert 600 == sum(stats['crypto_wait_peer']) == sum(stats['crypto_work_peer'])
+    assert 1 == sum(stats['crypto_work_group'])
+
+
+def test_backlog():
+    pool = CryptoPool(1, logging.getLogger(__name__), max_depth=2)  # not started
+    assert [True, True, False] == [pool.submit('addr', 'peer', print) for _ in range(3)]
+    assert (2, 1) == pool.stats['crypto_queue']
@@ -0,0 +1,56 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import os
+import random
+
+import pytest
+
+from autonomous_trust.core.network.fragment import Fragment, Fragmenter, Reassembler
+
+
+def test_reassembly():
+    fragmenter = Fragmenter(1472)
+    reassembler = Reassembler(stats=fragmenter.stats)
+    msg = os.urandom(100000)
+    fragments = fragmenter.split(msg)
+    assert 69 == len(fragments)
+    assert all([len(fragment) <= 1472 for fragment in fragments])
+    random.shuffle(fragments)
+    fragments.append(fragments[0])  # duplicate after completion starts a new partial
+    results = [reassembler.add('addr', fragment, 0.) for fragment in fragments]
+    assert [msg] == [result for result in results if result is not None]
+    assert 1 == len(reassembler)
+    assert b'tiny' == reassembler.add('addr', fragmenter.split(b'tiny')[0], 0.)
+    assert None is reassembler.add('addr', Fragment.magic + b'junk', 0.)
+    split, sent, received, reassembled, expired, evicted, malformed = fragmenter.stats.to_tuple()
+    assert (2, 70, 71, 2, 1) == (split, sent, received, reassembled, malformed)
+
+
+def test_bounds():
+    fragmenter = Fragmenter(100)
+    reassembler = Reassembler(timeout=1., max_messages=2)
+    for idx in range(3):
+        reassembler.add('addr', fragmenter.split(b'x' * 500)[0], idx * 0.1)
+    assert 2 == len(reassembler)
+    assert 1 == reassembler.stats.evicted
+    reassembler.add('other', fragmenter.split(b'x' * 500)[0], 5.)
+    assert 1 == len(reassembler)
+    assert 2 == reassembler.stats.expired
+
+    assert Fragmenter(1472).max_bytes == Reassembler().max_bytes  # never split what cannot be reassembled
+    with pytest.raises(ValueError):
+        Fragmenter(100, max_bytes=1000).split(b'x' * 1001)
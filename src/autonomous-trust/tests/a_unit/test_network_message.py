@@ -0,0 +1,52 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import struct
+
+import pytest
+
+from autonomous_trust.core.network.message import Message, MessageFormatError
+from autonomous_trust.core.system import CfgIds
+
+
+def test_binary():
+    frame = struct.pack('!dII', 1.5, 640, 480) + bytes(range(256))
+    raw = bytes(Message(CfgIds.network, 'video_frame', frame))
+    assert raw.startswith(Message.magic)
+    message = Message.parse(raw, None)
+    assert CfgIds.network == message.process
+    assert 'video_frame' == message.function
+    assert frame == message.obj
+
+    interned = bytes(Message(CfgIds.network, 'stats_req', 'text|with|bars'))
+    named = bytes(Message('unknown-proc', 'unknown-func', 'text|with|bars'))
+    assert len(interned) < len(named)
+    for raw in (interned, named, memoryview(named)):
+        assert 'text|with|bars' == Message.parse(raw, None).obj
+
+    with pytest.raises(MessageFormatError):
+        Message.parse(interned[:-1], None)
+
+
+def test_legacy():
+    message = Message.parse(b'identity|request_access|some|data', None)
+    assert ('identity', 'request_access', 'some|data') == (message.process, message.function, message.obj)
+    Message.binary_wire = False
+    try:
+        raw = bytes(Message(CfgIds.network, 'stats_req', 'data'))
+    finally:
+        Message.binary_wire = True
+    assert b'network|stats_req|data' == raw
@@ -0,0 +1,34 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import socket
+
+from autonomous_trust.core.network.sockets import SendSocketPool, SocketPurpose
+
+
+def test_reuse():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as recv_sock:
+        recv_sock.bind(('127.0.0.1', 0))
+        pool = SendSocketPool('127.0.0.1')
+        for idx in range(10):
+            pool.sendto(b'test%d' % idx, recv_sock.getsockname(), SocketPurpose.PEER)
+        pool.sendto(b'test', recv_sock.getsockname(), SocketPurpose.GROUP)
+        assert b'test0' == recv_sock.recvfrom(16)[0]
+        assert 2 == pool.stats.opened
+        assert 11 == pool.stats.sends
+        assert 9 == pool.stats.churn_saved
+        pool.close()
+        assert 2 == pool.stats.closed
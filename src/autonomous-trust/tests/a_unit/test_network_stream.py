@@ -0,0 +1,73 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import pickle
+import socket
+
+import pytest
+
+from autonomous_trust.core.network.stream import StreamFrame, FramingError, ConnectionPool, StreamReceiver
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(5)
+    yield sock
+    sock.close()
+
+
+def test_frame():
+    header = StreamFrame.pack_header(1234)
+    assert StreamFrame.header.size == len(header)
+    assert 1234 == StreamFrame.unpack_header(header)
+    with pytest.raises(FramingError):
+        StreamFrame.unpack_header(b'XX' + header[2:])
+    with pytest.raises(FramingError):
+        StreamFrame.pack_header(StreamFrame.max_size + 1)
+
+
+def test_pool_and_receiver(listener):
+    pool = ConnectionPool(idle_timeout=60)
+    receiver = StreamReceiver(listener)
+    big = bytes(range(256)) * 1024  # larger than the receive buffer
+    msgs = [b'test%d' % idx for idx in range(10)] + [b'', big]
+    for msg in msgs:
+        pool.send(msg, listener.getsockname())
+    rcvd = []
+    while len(rcvd) < len(msgs):
+        batch = receiver.poll(1)
+        assert 0 < len(batch)
+        rcvd += batch
+    assert msgs == [msg for msg, _, _ in rcvd]
+    assert '127.0.0.1' == rcvd[0][1]
+    assert (1, len(msgs) - 1, 0, 0) == pool.stats.to_tuple()
+    assert 1 == len(receiver)
+
+    assert 0 == pool.evict_idle()
+    assert 1 == pool.evict_idle(float('inf'))
+    assert 0 == len(pool)
+    assert [] == receiver.poll(0.1)  # closed by sender
+    assert 0 == len(receiver)
+    pool.send(b'again', listener.getsockname())
+    assert b'again' == receiver.poll(1, 1)[0][0]
+    assert 2 == pool.stats.opened
+
+    clone = pickle.loads(pickle.dumps(pool))
+    assert 0 == len(clone)
+    pool.close()
+    receiver.close()
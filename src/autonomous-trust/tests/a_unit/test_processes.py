@@ -0,0 +1,149 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+import pickle
+import queue
+import threading
+import time
+from datetime import timedelta
+
+import psutil
+
+from autonomous_trust.core import Process, ProcMeta
+from autonomous_trust.core.processes import ProcessTracker, SchedulingPolicy, ProcessLogger, LogLevel, apply_policy
+from autonomous_trust.core.network import Message
+from autonomous_trust.core.protocol import Protocol
+
+
+class CountProtocol(Protocol):
+    count = 'count'
+
+
+class Counter(Process, metaclass=ProcMeta, proc_name='counter'):
+    cadence = 0.2
+
+    def __init__(self):
+        super().__init__({}, None, None, suppress_log=True)
+        self.protocol = CountProtocol(self.name, self.logger, None)
+        self.protocol.register_handler(CountProtocol.count, self.handle_count)
+        self.counted = []
+
+    def handle_count(self, _, message):
+        self.counted.append(message.obj)
+        return True
+
+
+def test_dispatch_batches():
+    proc = Counter()
+    queues = {proc.name: queue.Queue()}
+    for idx in range(200):
+        queues[proc.name].put(Message(proc.name, CountProtocol.count, idx))
+    assert proc.keep_running(queue.Queue())
+    assert 200 == proc.dispatch_messages(queues)  # all in one cadence, well beyond one per cadence
+    assert list(range(200)) == proc.counted
+    assert proc.max_backlog == 200
+    assert 200 == sum(proc.handler_latency.counts)
+
+    start = time.perf_counter()
+    proc.keep_running(queue.Queue())
+    assert 0 == proc.dispatch_messages(queues)  # idle, so waits out the cadence
+    assert time.perf_counter() - start >= proc.cadence * 0.9
+
+    proc.loop_start -= timedelta(seconds=proc.cadence * 2)  # cadence already spent, still gets one batch
+    queues[proc.name].put(Message(proc.name, CountProtocol.count, 200))
+    assert 1 == proc.dispatch_messages(queues)
+    assert {'counter_backlog': (1, 200), 'counter_handled': (201,)}.items() <= proc.dispatch_stats.items()
+
+
+subsystems_yaml = """
+identity: autonomous_trust.core.identity.IdentityProcess
+network: {class: autonomous_trust.core.network.UDPNetworkProcess, cpus: [0], nice: 2, pool: dedicated}
+tasks: {nice: 5}
+"""
+
+
+def _niceness():
+    return psutil.Process().nice()
+
+
+def test_scheduling_policy():
+    tracker = ProcessTracker()
+    tracker.from_yaml_string(subsystems_yaml)
+    assert ['identity', 'network'] == list(tracker)
+    assert not tracker.policy('identity')
+    assert tracker.policy('network').dedicated
+    assert [0] == tracker.policy('network').cpus
+    assert 5 == tracker.policy(ProcessTracker.tasks).nice
+
+    copy = ProcessTracker()
+    copy.from_yaml_string(tracker.to_yaml_string())
+    assert tracker.classes == copy.classes
+
+    ctx = mp.get_context('fork')
+    log_q = ctx.Queue()
+    policy = SchedulingPolicy(cpus=[0], nice=psutil.Process().nice() + 3)
+    with ctx.Pool(1, initializer=apply_policy, initargs=(policy, 'test', log_q)) as pool:
+        assert policy.nice == pool.apply(_niceness)
+    [(level, name, msg)] = log_q.get(timeout=5)
+    assert 'test' == name
+    assert 'Placement: pid' in msg
+
+
+def test_process_logger():
+    log_q = queue.Queue(maxsize=1)
+    logger = ProcessLogger('test', log_q, level=LogLevel.INFO)
+    logger.debug('filtered at the source')
+    for idx in range(ProcessLogger.batch_size - 1):
+        logger.info(idx)
+    assert log_q.empty()  # buffered until the batch fills
+    logger.info('last')
+    batch = log_q.get_nowait()
+    assert ProcessLogger.batch_size == len(batch)
+    assert (LogLevel.INFO, 'test', 0) == batch[0]
+
+    logger.error('shipped at once')
+    assert [(LogLevel.ERROR, 'test', 'shipped at once')] == log_q.get_nowait()
+    logger.error('fills the queue')
+    logger.error('dropped, not raised')
+    assert 1 == logger.dropped
+
+    quiet = ProcessLogger('quiet', queue.Queue(), suppress=True)
+    quiet.error('suppressed')
+    quiet.flush()
+    assert quiet.log_queue.empty()
+
+
+def test_process_logger_threads():
+    log_q = queue.Queue()
+    logger = ProcessLogger('threads', log_q, level=LogLevel.INFO)
+    workers = [threading.Thread(target=lambda: [logger.info(idx) for idx in range(1000)]) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    logger.flush()
+    records = []
+    while not log_q.empty():
+        records += log_q.get_nowait()
+    assert 8000 == len(records)  # none shipped twice, none lost
+    assert 0 == logger.dropped
+
+    copy = pickle.loads(pickle.dumps(ProcessLogger('threads', None, level=LogLevel.INFO)))  # as sent to a child
+    copy.log_queue = log_q
+    copy.info('after unpickling')
+    copy.flush()
+    assert [(LogLevel.INFO, 'threads', 'after unpickling')] == log_q.get_nowait()
@@ -0,0 +1,50 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import logging
+
+from autonomous_trust.core.capabilities import Capabilities
+from autonomous_trust.core.identity import Peers
+from autonomous_trust.core.network import Message
+from autonomous_trust.core.protocol import Protocol
+
+
+class EchoProtocol(Protocol):
+    ping = 'ping'
+    pong = 'pong'
+
+
+class SubPeers(Peers):
+    pass
+
+
+def test_dispatch():
+    proto = EchoProtocol('tester', logging.getLogger('tester'), None)
+    seen = []
+    proto.register_handler(EchoProtocol.ping, lambda _, msg: seen.append(msg.obj) is None)
+    queues = {'tester': None}
+
+    assert proto.run_message_handlers(queues, Message('tester', EchoProtocol.ping, 1))
+    assert not proto.run_message_handlers(queues, Message('tester', EchoProtocol.pong, 2))  # no handler
+    assert not proto.run_message_handlers(queues, Message('other', EchoProtocol.ping, 3))  # not for us
+    assert [1] == seen
+
+    peers, capabilities = SubPeers(), Capabilities()
+    assert proto.run_message_handlers(queues, peers)
+    assert proto.run_message_handlers(queues, capabilities)
+    assert proto.peers is peers
+    assert proto.capabilities is capabilities
+    assert not proto.run_message_handlers(queues, 'anything else')
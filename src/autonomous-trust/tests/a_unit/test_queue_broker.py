@@ -0,0 +1,60 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+
+from autonomous_trust.core.queue_broker import QueueBroker, BrokerManager
+
+
+def _open_channels(broker, count):
+    queues = [broker.acquire() for _ in range(count)]
+    for idx, q in enumerate(queues):
+        q.put(idx)
+    result = [q.get(timeout=5) for q in queues]
+    for q in queues:
+        broker.release(q)
+    return result
+
+
+def test_reuse():
+    broker = QueueBroker()
+    queues = [broker.acquire() for _ in range(200)]  # no fixed limit
+    assert (200, 0, 200) == broker.stats()
+    queues[0].put('leftover')
+    for q in queues:
+        broker.release(q)
+    assert (0, QueueBroker.max_idle, 200) == broker.stats()  # idle queues are bounded
+    q = broker.acquire()
+    assert q.empty()
+    assert (1, QueueBroker.max_idle - 1, 200) == broker.stats()
+
+
+def test_processes():
+    ctx = mp.get_context('fork')
+    with BrokerManager(ctx=ctx) as manager:
+        broker = manager.QueueBroker()
+        with ctx.Pool(2) as pool:  # queues are created after the workers start
+            results = [pool.apply_async(_open_channels, (broker, 10)) for _ in range(2)]
+            assert [list(range(10))] * 2 == [result.get(10) for result in results]
+        live, idle, created = broker.stats()
+        assert 0 == live
+        assert created <= 20
+        assert idle == min(created, QueueBroker.max_idle)
+        q = broker.acquire()
+        q.put('here')
+        assert 'here' == q.get()
+        broker.release(q)
+        assert created == broker.stats()[2]
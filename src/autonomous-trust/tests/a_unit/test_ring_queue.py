@@ -0,0 +1,71 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import multiprocessing as mp
+from queue import Empty, Full
+
+import pytest
+
+from autonomous_trust.core.ring_queue import RingQueue
+
+
+def _echo(q_in, q_out):
+    while True:
+        item = q_in.get(timeout=5)
+        if item is None:
+            return q_in.name
+        q_out.put(item)
+
+
+@pytest.fixture
+def rings():
+    rings = []
+    yield rings
+    for ring in rings:
+        ring.close()
+        ring.unlink()
+
+
+def test_wrap(rings):
+    ring = RingQueue(256)
+    rings.append(ring)
+    for idx in range(100):  # several times around the buffer, records of varying size
+        ring.put(b'x' * (idx % 50))
+        ring.put(('obj', idx))
+        assert 2 == ring.qsize()
+        assert b'x' * (idx % 50) == ring.get()
+        assert ('obj', idx) == ring.get_nowait()
+    assert ring.empty()
+    with pytest.raises(Empty):
+        ring.get(timeout=0.01)
+    ring.put(bytes(240))  # fits when empty, wherever the last record ended
+    with pytest.raises(Full):
+        ring.put_nowait(bytes(10))
+    with pytest.raises(ValueError):
+        ring.put(bytes(300))
+
+
+def test_processes(rings):
+    ctx = mp.get_context('fork')
+    q_in, q_out = RingQueue(65536, ctx), RingQueue(65536, ctx)
+    rings.extend([q_in, q_out])
+    with ctx.Pool(1, initializer=RingQueue.inherit, initargs=(q_in, q_out)) as pool:
+        result = pool.apply_async(_echo, (q_in, q_out))
+        for idx in range(100):
+            q_in.put({'idx': idx, 'data': bytes(idx)})
+        assert [{'idx': idx, 'data': bytes(idx)} for idx in range(100)] == [q_out.get(timeout=5) for _ in range(100)]
+        q_in.put(None)
+        assert q_in.name == result.get(5)
@@ -0,0 +1,78 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from autonomous_trust.core.structures.dag import StepDAG, LinkedStep, Genesis, InvalidBranchError
+
+start = datetime(2024, 1, 1)
+
+
+class SimpleDAG(StepDAG):
+    def _validate(self, branch):
+        return True
+
+
+def _step(tick):
+    return LinkedStep(tick, timestamp=start + timedelta(seconds=tick))
+
+
+def _copy(steps):  # as if received from a peer
+    return [LinkedStep.from_bytes(step.to_bytes()) for step in steps]
+
+
+def test_ancestors():
+    dag = SimpleDAG()
+    for tick in range(100):
+        dag.add_step(_step(tick))
+    chain = list(reversed(dag.recite()))  # root to head
+    assert 100 == len(dag) == dag.depth(dag.main)
+    for depth in (0, 1, 37, 64, 99, 100):
+        assert (chain[depth - 1] if depth else Genesis) is dag.ancestor(dag.main, depth)
+    with pytest.raises(ValueError):
+        dag.ancestor(chain[10], 12)
+    assert chain[50] is dag.find(chain[50].uuid)
+
+    dag.branch('side', _step(1000), source=Genesis)
+    dag.heads['fork'] = chain[70]
+    dag.add_step(_step(2000), 'fork')
+    assert (71, chain[70]) == dag.diff('fork')
+    assert (0, Genesis) == dag.diff('side')
+    assert [chain[72], chain[71], chain[70]] == dag.recite(dag.main_branch, chain[70])[-3:]
+    assert 30 == len(dag.recite(dag.main_branch, chain[70]))
+    with pytest.raises(InvalidBranchError):
+        dag.recite('side', chain[70])
+
+
+def test_catch_up():
+    dag, peer = SimpleDAG(), SimpleDAG()
+    for tick in range(0, 20, 2):
+        dag.add_step(_step(tick))
+    for step in _copy(reversed(dag.recite()[4:])):  # shares the first six
+        peer.add_step(step)
+    for tick in range(11, 20, 2):
+        peer.add_step(_step(tick))
+
+    diff = dag.catch_up(_copy(peer.recite()))
+    assert [19, 17, 15, 13, 11, 10] == [step.payload for step in diff]  # new to us, from the common root
+    assert [19, 18, 17, 16, 15, 14, 13, 12, 11, 10, 8, 6, 4, 2, 0] == [step.payload for step in dag.recite()]
+    assert {dag.main_branch} == set(dag.heads)
+
+    assert [dag.main] == dag.catch_up(_copy(peer.recite()))  # nothing new
+    assert 15 == len(dag.recite())
@@ -46,3 +46,70 @@ def test_merge():
         ident = uuid4()
         mt.insert(ABlob(mt.root_digest, ident))
     mt.merge(list(mt.blobs))
+
+
+def _tree(count):
+    mt = MerkleTree()
+    for _ in range(count):
+        mt.insert(ABlob(mt.root_digest, uuid4()))
+    return mt
+
+
+def test_incremental_matches_rebuild():
+    for count in (1, 2, 3, 5, 8, 13, 64, 100):
+        mt = _tree(count)
+        assert MerkleTree(blobs=mt.blobs).root_digest == mt.root_digest
+        assert count == mt.size
+    assert MerkleTree().root_digest is None
+
+    mt = _tree(3)
+    a, b, c = (blob.get_hash() for blob in mt.blobs)
+    assert MerkleTree.get_hash(MerkleTree.get_hash(a + b) + c) == mt.root_digest  # c promoted, not rehashed
+    assert 2 == mt.depth
+
+
+def test_inclusion_proof():
+    mt = _tree(13)
+    early = mt.blobs[2]
+    stale = mt.inclusion_proof(early)
+    for blob in mt.blobs:
+        assert mt.audit(blob, mt.inclusion_proof(blob))
+        assert mt.audit(blob)
+    assert not mt.audit(ABlob(None, uuid4()))
+    assert mt.inclusion_proof(ABlob(None, uuid4())) is None
+
+    for _ in range(20):  # memoized prefixes must track a growing tree
+        mt.insert(ABlob(mt.root_digest, uuid4()))
+        assert mt.audit(early, mt.inclusion_proof(early))
+        assert mt.audit(mt.blobs[-1])
+    assert not mt.audit(early, stale)
+    other = mt.blobs[5]
+    assert not mt.audit(early, mt.inclusion_proof(other))
+
+
+def test_lookup_and_delete():
+    mt = _tree(10)
+    blob = mt.blobs[4]
+    assert blob in mt
+    assert 4 == mt.position(blob)
+    assert [blob] == mt.lookup(blob.uuid)
+
+    mt.delete(blob)
+    assert blob not in mt
+    assert [] == mt.lookup(blob.uuid)
+    assert 9 == mt.size
+    assert MerkleTree(blobs=mt.blobs).root_digest == mt.root_digest
+    for remaining in mt.blobs:
+        assert mt.audit(remaining)
+
+
+def test_duplicates():
+    mt = MerkleTree()
+    ident = uuid4()
+    first = ABlob(None, ident)
+    mt.insert(first)
+    mt.insert(first)  # same object, ignored
+    assert 1 == mt.size
+    mt.insert(ABlob(None, ident))  # equal data, distinct object
+    assert 2 == len(mt.lookup(ident))
+    assert [(0, 0), (0, 1)] == mt.subtree_duplications()
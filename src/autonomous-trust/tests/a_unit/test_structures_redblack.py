@@ -103,3 +103,21 @@ def test_levels():
         tree.insert(None)
     expected = [2, 1, 2, 0, 2, 1, 3, 2, 3, 4]
     assert [tree.find(x).level for x in range(1, 11)] == expected
+
+
+def test_size_and_depth():
+    tree = Tree.from_tuple((4, (2, (1, (), ()), (3, (), ())), (6, (5, (), ()), (7, (), (8, (), ())))))
+    assert 8 == tree.size
+    assert 3 == len(tree)
+    assert (1, 8) == (tree.first.key, tree.last.key)
+
+    tree = Tree()
+    assert 0 == len(tree)
+    for _ in range(1000):
+        tree.insert(None)
+    assert 1000 == tree.size
+    assert len(tree) == max(leaf.level for leaf in tree.leaves)
+    assert sorted(tree.leaves, key=lambda n: n.key) == sorted(tree.root.leaves(), key=lambda n: n.key)
+    tree.delete(500)
+    assert 999 == tree.size
+    assert tree.find(500) is None
@@ -0,0 +1,74 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+
+import os
+
+from autonomous_trust.core.structures.dag import StepDAG, LinkedStep, Genesis
+from autonomous_trust.core.structures.steplog import StepLog
+
+
+class SimpleDAG(StepDAG):
+    def _validate(self, branch):
+        return True
+
+
+def _payloads(dag, branch=None):
+    return [step.payload for step in dag.recite(branch)]
+
+
+def test_reopen(tmp_path):
+    path = os.path.join(tmp_path, 'history.log')
+    dag = SimpleDAG()
+    dag.add_step(LinkedStep(b'before'))  # already in memory, written on attach
+    dag.attach(StepLog(path, checkpoint_every=4))
+    for idx in range(10):
+        dag.add_step(LinkedStep(b'%d' % idx))
+    dag.ingest_branch([LinkedStep(b'theirs')], 'other')
+    dag.merge('other')
+    expected = _payloads(dag)
+    dag.log.flush()
+
+    log = StepLog(path, checkpoint_every=4)  # still open elsewhere, reads up to the last record
+    assert 12 == len(log)
+    assert {StepDAG.main_branch} == set(log.heads)
+    restored = SimpleDAG()
+    restored.attach(log)
+    assert 1 == len(log._steps)  # only the head is decoded
+    assert expected == _payloads(restored)
+    restored.add_step(LinkedStep(b'after'))
+    restored.log.close()
+
+    reopened = SimpleDAG()
+    reopened.attach(StepLog(path))
+    assert [b'after'] + expected == _payloads(reopened)
+    assert reopened.recite()[-1].parent is Genesis
+
+
+def test_torn_tail(tmp_path):
+    path = os.path.join(tmp_path, 'history.log')
+    dag = SimpleDAG()
+    dag.attach(StepLog(path))
+    for idx in range(3):
+        dag.add_step(LinkedStep(b'%d' % idx))
+    dag.log.close()
+    size = os.path.getsize(path)
+    with open(path, 'ab') as log:
+        log.write(b'\x01partial record')
+    log = StepLog(path)
+    assert size == os.path.getsize(path)
+    assert 3 == len(log)
+    assert b'2' == log.step(log.heads[StepDAG.main_branch]).payload
@@ -0,0 +1,64 @@
+# ******************
+#  Copyright 2024 TekFive, Inc. and contributors
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+# ******************
+
+import os
+import subprocess
+import sys
+
+from autonomous_trust.core import system
+from autonomous_trust.core.system import PackageHash
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as out:
+        out.write(text)
+
+
+def test_package_hash(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pkg = os.path.join(tmp_path, 'hashed_pkg')
+    for name in ('__init__.py', 'a.py', 'viz.py', os.path.join('sub', '__init__.py'),
+                 os.path.join('sub', 'viz', '__init__.py'), os.path.join('sub', 'viz', 'plot.py')):
+        _write(os.path.join(pkg, name), '# %s\n' % name)
+    cache_file = os.path.join(tmp_path, PackageHash.cache_name)
+
+    first = PackageHash([pkg], 'hashed_pkg', cache_file=cache_file)
+    assert ['hashed_pkg.a', 'hashed_pkg.sub'] == sorted(first.modules)  # excludes work at any depth
+    assert 2 == first.hashed
+
+    cached = PackageHash([pkg], 'hashed_pkg', cache_file=cache_file)
+    assert 0 == cached.hashed
+    assert first.digest == cached.digest
+    assert first.digest == PackageHash([pkg], 'hashed_pkg').digest
+
+    _write(os.path.join(pkg, 'a.py'), '# changed\n')
+    changed = PackageHash([pkg], 'hashed_pkg', cache_file=cache_file)
+    assert 1 == changed.hashed
+    assert first.digest != changed.digest
+
+
+def test_lazy_imports():
+    code = 'import sys, autonomous_trust.core; print(sorted(m for m in ("autonomous_trust.core.automate", ' \
+           '"psutil", "nacl", "ruamel.yaml", "importlib.metadata") if m in sys.modules))'
+    root = os.path.dirname(os.path.dirname(os.path.dirname(system.__file__)))  # where autonomous_trust is importable
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=root)
+    assert '[]' == out.stdout.strip()
+    for module in ('network', 'protocol', 'identity'):  # first import in a fresh (e.g. forkserver) process
+        subprocess.run([sys.executable, '-c', 'import autonomous_trust.core.' + module], check=True, cwd=root)
+    code = 'import sys, autonomous_trust.core.automate; print("autonomous_trust.core.ring_queue" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=root)
+    assert 'False' == out.stdout.strip()  # only with shared_memory